@@ -0,0 +1,192 @@
+import contextlib
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from procesador import iterar_partidos
+
+# Directorio donde se guardan los almacenes binarios de partidos
+DIRECTORIO_ALMACEN = 'almacen'
+# Cambiar si se modifica el formato del archivo, para no abrir almacenes viejos
+VERSION_ALMACEN = 1
+
+# Encabezado: marca, versión, cantidad de partidos, posición y largo de los metadatos (JSON)
+_ENCABEZADO = struct.Struct('<8sIIQQ')
+_MARCA = b'LIGAPART'
+
+# Columnas de ancho fijo, en el orden en que se guardan, con su tipo de `array` (q = int64, i = int32, h = int16).
+# 'ronda' y 'fecha' son posiciones en las tablas de textos de los metadatos; los equipos van por ID.
+COLUMNAS = (
+    ('id', 'q'),
+    ('ronda', 'i'),
+    ('fecha', 'i'),
+    ('local', 'i'),
+    ('entretiempo_local', 'h'),
+    ('total_local', 'h'),
+    ('visitante', 'i'),
+    ('entretiempo_visitante', 'h'),
+    ('total_visitante', 'h'),
+)
+
+
+def _alinear(posicion):
+    """Siguiente múltiplo de 8 (cada columna empieza alineada para poder leerla sin copiar)."""
+    return (posicion + 7) // 8 * 8
+
+
+class AlmacenPartidos:
+    """
+    Partidos de una temporada en un archivo binario de columnas de ancho fijo, abierto con mmap
+    de sólo lectura. Cada columna se lee como un memoryview sobre el mapa, sin copiar: varios
+    procesos (p.ej. workers de gunicorn) que abren el mismo archivo comparten las mismas páginas
+    de memoria en lugar de parsear y guardar cada uno su copia del JSON.
+
+    Los textos (rondas, fechas, nombres y logos de los equipos) van en un bloque JSON chico al
+    final del archivo; las columnas guardan posiciones en esas tablas o IDs enteros.
+    """
+
+    def __init__(self, ruta):
+        """
+        Args:
+            ruta (string): archivo generado con `construir_almacen`
+
+        Raises:
+            ValueError: si el archivo no es un almacen de partidos de esta versión
+        """
+        self.ruta = ruta
+        with open(ruta, 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        marca, version, cantidad, inicio_meta, largo_meta = _ENCABEZADO.unpack_from(self._mapa, 0)
+        if marca != _MARCA or version != VERSION_ALMACEN:
+            raise ValueError(f"'{ruta}' no es un almacen de partidos (versión {VERSION_ALMACEN})")
+        self.cantidad = cantidad
+
+        vista = memoryview(self._mapa)
+        self._columnas = {}
+        posicion = _ENCABEZADO.size
+        for nombre, tipo in COLUMNAS:
+            posicion = _alinear(posicion)
+            largo = cantidad * array(tipo).itemsize
+            self._columnas[nombre] = vista[posicion:posicion + largo].cast(tipo)
+            posicion += largo
+
+        meta = json.loads(self._mapa[inicio_meta:inicio_meta + largo_meta].decode('utf-8'))
+        self.rondas = meta['rondas']
+        self.fechas = meta['fechas']
+        # Las claves JSON son textos: se vuelven a pasar a IDs enteros
+        self.equipos = {int(equipo_id): nombre for equipo_id, nombre in meta['equipos'].items()}
+        self.logos = {int(equipo_id): logo for equipo_id, logo in meta['logos'].items()}
+
+    def __len__(self):
+        return self.cantidad
+
+    def columna(self, nombre):
+        """Columna como memoryview de sólo lectura sobre el archivo (sin copia; ver COLUMNAS)."""
+        return self._columnas[nombre]
+
+    def partidos(self):
+        """Generador de partidos con las claves de `procesador.normalizar_partido` que usan los cargadores."""
+        c = self._columnas
+        for i in range(self.cantidad):
+            local, visitante = c['local'][i], c['visitante'][i]
+            yield {
+                'partido_id': c['id'][i],
+                'ronda': self.rondas[c['ronda'][i]],
+                'fecha': self.fechas[c['fecha'][i]],
+                'local': self.equipos.get(local),
+                'visitante': self.equipos.get(visitante),
+                'local_id': local,
+                'visitante_id': visitante,
+                'entretiempo_local': c['entretiempo_local'][i],
+                'total_local': c['total_local'][i],
+                'entretiempo_visitante': c['entretiempo_visitante'][i],
+                'total_visitante': c['total_visitante'][i],
+            }
+
+
+def construir_almacen(archivo_json, ruta, tiempos=None):
+    """
+    Lee un JSON de partidos (una sola pasada, ver procesador.iterar_partidos) y lo guarda como almacen
+    binario en `ruta`. El archivo se escribe con otro nombre y se renombra al final, así un proceso
+    que lo abre al mismo tiempo nunca ve un almacen a medio escribir.
+
+    Args:
+        archivo_json (string): ruta del archivo de API-Football
+        ruta (string): archivo a generar
+        tiempos (dict, opcional): se completa con los segundos de parseo y normalización
+    """
+    logos, equipos = {}, {}
+    rondas, fechas = {}, {}
+    columnas = {nombre: array(tipo) for nombre, tipo in COLUMNAS}
+    for p in iterar_partidos(archivo_json, logos, tiempos, equipos):
+        columnas['id'].append(p['partido_id'])
+        columnas['ronda'].append(rondas.setdefault(p['ronda'], len(rondas)))
+        columnas['fecha'].append(fechas.setdefault(p['fecha'], len(fechas)))
+        columnas['local'].append(p['local_id'])
+        columnas['visitante'].append(p['visitante_id'])
+        for nombre in ('entretiempo_local', 'total_local', 'entretiempo_visitante', 'total_visitante'):
+            columnas[nombre].append(p[nombre])
+
+    cantidad = len(columnas['id'])
+    bloques = []
+    posicion = _ENCABEZADO.size
+    for nombre, _ in COLUMNAS:
+        relleno = _alinear(posicion) - posicion
+        datos = columnas[nombre].tobytes()
+        bloques.append(b'\0' * relleno + datos)
+        posicion += relleno + len(datos)
+    meta = json.dumps({
+        'origen': os.path.basename(archivo_json),
+        'rondas': list(rondas),
+        'fechas': list(fechas),
+        'equipos': equipos,
+        'logos': logos,
+    }, ensure_ascii=False).encode('utf-8')
+
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(_ENCABEZADO.pack(_MARCA, VERSION_ALMACEN, cantidad, posicion, len(meta)))
+        for bloque in bloques:
+            f.write(bloque)
+        f.write(meta)
+    os.replace(temporal, ruta)
+    print(f'Almacen de partidos guardado en {ruta} ({cantidad} partidos)')
+
+
+def ruta_almacen(archivo_json):
+    """Ruta del almacen que corresponde al contenido actual del JSON (si el JSON cambia, cambia la ruta)."""
+    huella = hashlib.sha256(f'{VERSION_ALMACEN}'.encode())
+    with open(archivo_json, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 16), b''):
+            huella.update(bloque)
+    nombre = os.path.splitext(os.path.basename(archivo_json))[0]
+    return os.path.join(DIRECTORIO_ALMACEN, f'{nombre}_{huella.hexdigest()[:16]}.bin')
+
+
+def preparar_almacen(archivo_json, tiempos=None):
+    """
+    Genera el almacen de un JSON de partidos si todavía no existe (la primera vez, o si el JSON
+    cambió; los almacenes viejos del mismo archivo se borran) y devuelve su ruta.
+
+    Raises:
+        OSError, json.JSONDecodeError: si no se puede leer el JSON
+    """
+    ruta = ruta_almacen(archivo_json)
+    if not os.path.exists(ruta):
+        os.makedirs(DIRECTORIO_ALMACEN, exist_ok=True)
+        construir_almacen(archivo_json, ruta, tiempos)
+        prefijo = ruta.rsplit('_', 1)[0]
+        for vieja in glob.glob(f'{prefijo}_*.bin'):
+            # Otro proceso que generó el mismo almacen pudo haberlo borrado antes
+            if vieja != ruta:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(vieja)
+    return ruta
+
+
+def obtener_almacen(archivo_json, tiempos=None):
+    """Abre el almacen de un JSON de partidos (ver `preparar_almacen`)."""
+    return AlmacenPartidos(preparar_almacen(archivo_json, tiempos))
@@ -0,0 +1,67 @@
+"""
+Benchmark del almacen binario de partidos (almacen_partidos.py).
+
+Arranca un proceso nuevo por variante, como lo haría cada worker, y carga las temporadas
+leyendo los JSON o abriendo los almacenes mapeados en memoria (que se generan antes, una vez).
+Muestra el tiempo de carga y la memoria máxima (RSS) de cada proceso.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_almacen.py [--motor columnar|prolog] [archivo.json ...]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+
+from resultados import ARCHIVOS, RAIZ, relanzar
+
+
+def medir_proceso(archivos, motor, usar_almacen):
+    """Carga las temporadas en este proceso e imprime (JSON) el tiempo de carga y la memoria máxima."""
+    from setup import SetUp
+
+    os.chdir(RAIZ)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Sin snapshot ni procesos auxiliares: se mide lo que hace cada worker con los datos
+        setup = SetUp({i: archivo for i, archivo in enumerate(archivos)}, tipo_motor=motor,
+                      usar_snapshot=False, paralelo=False, usar_almacen=usar_almacen)
+    duracion = time.perf_counter() - inicio
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'ms': duracion * 1000, 'rss_kb': rss, 'temporadas': len(setup.motores)}))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Carga desde JSON contra carga desde el almacen binario')
+    parser.add_argument('archivos', nargs='*', default=ARCHIVOS)
+    parser.add_argument('--motor', default='columnar', choices=('columnar', 'prolog'))
+    # Uso interno: variante a medir en este proceso
+    parser.add_argument('--hijo', choices=('json', 'almacen'), help=argparse.SUPPRESS)
+    opciones = parser.parse_args()
+
+    if opciones.hijo:
+        medir_proceso(opciones.archivos, opciones.motor, opciones.hijo == 'almacen')
+        sys.exit(0)
+
+    from almacen_partidos import preparar_almacen
+
+    os.chdir(RAIZ)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for archivo in opciones.archivos:
+            preparar_almacen(archivo)
+
+    medidas = {}
+    for variante in ('json', 'almacen'):
+        salida = relanzar(__file__, *opciones.archivos, '--motor', opciones.motor, '--hijo', variante,
+                          capture_output=True, text=True).stdout
+        medidas[variante] = json.loads(salida.strip().splitlines()[-1])
+
+    print(f'{len(opciones.archivos)} temporadas, motor {opciones.motor}')
+    for variante, medida in medidas.items():
+        print(f'  {variante.ljust(8)} carga {medida["ms"]:8.1f} ms | RSS máximo {medida["rss_kb"] / 1024:7.1f} MB')
+    print(f'  carga x{medidas["json"]["ms"] / medidas["almacen"]["ms"]:.1f} | '
+          f'RSS -{(medidas["json"]["rss_kb"] - medidas["almacen"]["rss_kb"]) / 1024:.1f} MB')
@@ -0,0 +1,44 @@
+"""
+Benchmark de la carga de hechos.
+
+Compara `MotorLogico.generar_hechos` con un assertz por hecho (masivo=False)
+contra la carga por lotes (masivo=True) y verifica que ambas dejen la misma
+base de conocimiento.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_carga.py [archivo.json ...]
+"""
+import sys
+import time
+
+from resultados import por_temporada
+
+def cargar(motor, lista_prolog, masivo):
+    motor.prolog.retractall('partido(_, _, _, _, _, _, _, _, _)')
+    inicio = time.perf_counter()
+    motor.generar_hechos('partido', lista_prolog, masivo=masivo)
+    duracion = time.perf_counter() - inicio
+    return motor.listar_hechos('partido', 9), duracion
+
+
+def medir_archivo(archivo):
+    from motor_logico import MotorLogico
+    from procesador import procesar_partidos, establecer_formato_partidos
+
+    lista_prolog = establecer_formato_partidos(procesar_partidos(archivo))
+    motor = MotorLogico(comentarios=False)
+    motor.prolog.dynamic('partido/9')
+
+    hechos_uno_a_uno, t_uno_a_uno = cargar(motor, lista_prolog, masivo=False)
+    hechos_masivo, t_masivo = cargar(motor, lista_prolog, masivo=True)
+
+    if hechos_uno_a_uno != hechos_masivo:
+        print(f'❌ {archivo}: las bases de conocimiento no coinciden')
+        sys.exit(1)
+
+    print(f'{archivo}: {len(hechos_masivo)} hechos | assertz uno a uno {t_uno_a_uno * 1000:.1f} ms '
+          f'| por lotes {t_masivo * 1000:.1f} ms | x{t_uno_a_uno / t_masivo:.1f}')
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
@@ -0,0 +1,55 @@
+"""
+Benchmark de consultas concurrentes.
+
+Ejecuta la consulta de la tabla de posiciones (`fila_posiciones/9`) desde varios
+hilos a la vez, primero con un único motor protegido por el lock y luego con un
+pool de réplicas, y muestra las consultas por segundo de cada variante.
+`tabla_completa` no sirve para esto: sale de los resúmenes materializados.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_concurrencia.py [hilos] [consultas_por_hilo]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from resultados import RAIZ
+
+
+def tabla_desde_el_motor(consultas):
+    return consultas._consultar_filas('fila_posiciones', ('Equipo', *consultas.CAMPOS_TABLA))
+
+
+def rendimiento(consultas, hilos, por_hilo):
+    def trabajo(_):
+        for _ in range(por_hilo):
+            tabla_desde_el_motor(consultas)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        list(ejecutor.map(trabajo, range(hilos)))
+    return hilos * por_hilo / (time.perf_counter() - inicio)
+
+
+if __name__ == '__main__':
+    from setup import SetUp
+    from pool_motores import PoolMotores
+
+    os.chdir(RAIZ)
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    por_hilo = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    setup = SetUp({2021: 'json/primera2021.json'})
+    con_lock = setup.obtener_acceso_consultas(2021)
+    pool = PoolMotores(setup.archivos, cantidad=hilos)
+    con_replicas = setup.obtener_acceso_consultas(2021, pool)
+
+    if sorted(tabla_desde_el_motor(con_lock)) != sorted(tabla_desde_el_motor(con_replicas)):
+        print('❌ Las réplicas devuelven una tabla distinta')
+        sys.exit(1)
+
+    print(f'{hilos} hilos x {por_hilo} consultas de fila_posiciones')
+    print(f'Un motor con lock: {rendimiento(con_lock, hilos, por_hilo):8.1f} consultas/s')
+    print(f'{hilos} réplicas:      {rendimiento(con_replicas, hilos, por_hilo):8.1f} consultas/s')
+    pool.cerrar()
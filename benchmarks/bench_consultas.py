@@ -0,0 +1,152 @@
+"""
+Suite de benchmarks de la carga y de las consultas.
+
+Para cada temporada mide las fases de `SetUp` (parseo, normalización, hechos, reglas,
+snapshot), en frío (sin snapshot) y, con Prolog, también generando y cargando el snapshot.
+Cada carga corre en un proceso propio, así ninguna encuentra el módulo de la temporada ya
+cargado por la anterior. Después de la última carga mide cada método público de
+`ConsultasLiga`: la primera llamada (que arma índices y caches) y la mediana de las siguientes.
+
+Los resultados se guardan en JSON (ver resultados.py) para compararlos contra una corrida base.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_consultas.py [--motor prolog|columnar] [--repeticiones N]
+        [--salida resultados.json] [--base base.json] [--umbral 0.2] [archivo.json ...]
+"""
+import argparse
+import inspect
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import resultados
+from resultados import ARCHIVOS, RAIZ, datos_ejemplo, relanzar
+
+# Cargas que se miden, en orden: la primera con snapshot lo genera (si no existía), la segunda lo reutiliza
+FASES = {
+    'prolog': ('frio', 'generar_snapshot', 'snapshot'),
+    'columnar': ('frio',),
+}
+
+# Métodos que no son consultas de lectura
+EXCLUIDOS = {
+    'actualizar_partidos': 'modifica los hechos',
+    'consultar': 'demo que imprime por pantalla',
+    'formato_json': 'no consulta el motor',
+}
+
+# Argumentos de los métodos que los requieren, a partir de los datos de ejemplo de la temporada
+ARGUMENTOS = {
+    'enfrentamiento': lambda d: (d['equipo'], d['rival']),
+    'tabla_grupo': lambda d: (d['grupo'],) if d['grupo'] else None,
+    'tabla_hasta': lambda d: (None, d['fecha']),
+    'partidos_por_ronda': lambda d: (d['ronda'],),
+    'buscar_partido_por_id': lambda d: (d['partido_id'],),
+}
+
+
+def argumentos_de(nombre, metodo, datos):
+    """Argumentos para llamar al método, o None si requiere alguno que no sabemos completar."""
+    if nombre in ARGUMENTOS:
+        return ARGUMENTOS[nombre](datos)
+    requeridos = [p for p in inspect.signature(metodo).parameters.values() if p.default is inspect.Parameter.empty]
+    if not requeridos:
+        return ()
+    # Los métodos por equipo reciben un único argumento: el nombre del equipo
+    if len(requeridos) == 1 and 'equipo' in requeridos[0].name:
+        return (datos['equipo'],)
+    return None
+
+
+def llamar(metodo, args):
+    inicio = time.perf_counter()
+    resultado = metodo(*args)
+    # Los generadores (iterar_partidos) no hacen nada hasta que se recorren
+    if inspect.isgenerator(resultado):
+        list(resultado)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def medir_consultas(consultas, repeticiones):
+    """{metodo: (primera llamada en ms, mediana de las siguientes en ms)} de cada método público."""
+    datos = datos_ejemplo(consultas)
+    tiempos = {}
+    for nombre, metodo in inspect.getmembers(consultas, inspect.ismethod):
+        if nombre.startswith('_') or nombre in EXCLUIDOS:
+            continue
+        args = argumentos_de(nombre, metodo, datos)
+        if args is None:
+            print(f'AVISO: {nombre} sin argumentos de ejemplo, no se mide')
+            continue
+        primera = llamar(metodo, args)
+        siguientes = [llamar(metodo, args) for _ in range(repeticiones)]
+        tiempos[nombre] = (primera, statistics.median(siguientes))
+    return tiempos
+
+
+def medir_archivo(archivo, motor, fase, repeticiones, salida):
+    """
+    Carga una temporada como indica `fase` y escribe sus métricas (JSON) en `salida`. Si es la
+    última fase del motor, también mide las consultas sobre lo cargado.
+    """
+    from setup import SetUp
+
+    os.chdir(RAIZ)
+    metricas = {}
+    inicio = time.perf_counter()
+    setup = SetUp(archivo, tipo_motor=motor, paralelo=False, usar_snapshot=fase != 'frio')
+    metricas[f'setup/{fase}/total_ms'] = (time.perf_counter() - inicio) * 1000
+    for etapa, segundos in next(iter(setup.tiempos.values()), {}).items():
+        metricas[f'setup/{fase}/{etapa}_ms'] = segundos * 1000
+
+    if fase == FASES[motor][-1]:
+        consultas = setup.obtener_acceso_consultas()
+        for nombre, (primera, mediana) in medir_consultas(consultas, repeticiones).items():
+            metricas[f'consultas/{nombre}/primera_ms'] = primera
+            metricas[f'consultas/{nombre}/mediana_ms'] = mediana
+
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(metricas, f)
+
+
+def imprimir(metricas):
+    print(f"\n{'métrica'.ljust(70)}{'ms'.rjust(12)}")
+    for nombre, valor in sorted(metricas.items()):
+        print(f'{nombre.ljust(70)}{valor:12.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks de SetUp y de ConsultasLiga por temporada')
+    parser.add_argument('archivos', nargs='*', default=ARCHIVOS)
+    parser.add_argument('--motor', default='prolog', choices=('prolog', 'columnar'))
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--salida', default='bench_consultas.json')
+    parser.add_argument('--base', help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--umbral', type=float, default=resultados.UMBRAL_REGRESION)
+    # Uso interno: medir una fase de un solo archivo en este proceso y dejar las métricas en ese JSON
+    parser.add_argument('--hijo', help=argparse.SUPPRESS)
+    parser.add_argument('--fase', help=argparse.SUPPRESS)
+    opciones = parser.parse_args()
+
+    if opciones.hijo:
+        medir_archivo(opciones.archivos[0], opciones.motor, opciones.fase, opciones.repeticiones, opciones.hijo)
+        sys.exit(0)
+
+    metricas = {}
+    for archivo in opciones.archivos:
+        nombre = os.path.splitext(os.path.basename(archivo))[0]
+        for fase in FASES[opciones.motor]:
+            with tempfile.TemporaryDirectory() as directorio:
+                parcial = os.path.join(directorio, 'metricas.json')
+                relanzar(__file__, archivo, '--motor', opciones.motor, '--repeticiones', opciones.repeticiones,
+                         '--fase', fase, '--hijo', parcial)
+                with open(parcial, encoding='utf-8') as f:
+                    metricas.update({f'{nombre}/{clave}': valor for clave, valor in json.load(f).items()})
+
+    imprimir(metricas)
+    resultados.guardar(opciones.salida, 'bench_consultas', metricas, motor=opciones.motor,
+                       repeticiones=opciones.repeticiones)
+    resultados.terminar(metricas, opciones.base, opciones.umbral)
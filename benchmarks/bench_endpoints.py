@@ -0,0 +1,134 @@
+"""
+Prueba de carga local de los endpoints de la API.
+
+Levanta la aplicación de `main.py` (con sus temporadas y réplicas) en un servidor HTTP local
+multihilo y, para cada ruta GET registrada en Flask, lanza peticiones desde varios clientes a
+la vez. Muestra las latencias p50/p95/p99, las peticiones por segundo y los errores de cada
+ruta, y los guarda en JSON (ver resultados.py) para compararlos contra una corrida base.
+
+Los parámetros de las rutas (<nombre_equipo>, <partido_id>, ...) se completan con datos reales
+de la temporada por defecto. Con --sin-cache se desactiva la cache de respuestas, así cada
+petición vuelve a consultar el motor.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_endpoints.py [--clientes N] [--peticiones N] [--sin-cache]
+        [--salida resultados.json] [--base base.json] [--umbral 0.2]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import resultados
+from resultados import RAIZ, datos_ejemplo
+
+# Variantes con parámetros de consulta que pasan por caminos distintos de los de la ruta sola
+VARIANTES = [
+    '/api/tabla-posiciones?ronda=10',
+    '/api/tabla-posiciones?fecha={fecha}',
+    '/api/partidos?limite=100',
+    '/api/partidos?equipo={equipo}',
+]
+
+
+def rutas_a_medir(app, datos):
+    """URLs (relativas) de cada ruta GET de la aplicación, con sus parámetros completos."""
+    rutas = []
+    urls = app.url_map.bind('localhost')
+    for regla in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if 'GET' not in regla.methods or regla.endpoint == 'static':
+            continue
+        faltantes = regla.arguments - set(datos)
+        if faltantes:
+            print(f'AVISO: {regla.rule} sin valores de ejemplo para {sorted(faltantes)}, no se mide')
+            continue
+        rutas.append(urls.build(regla.endpoint, {nombre: datos[nombre] for nombre in regla.arguments}, method='GET'))
+    citados = {clave: urllib.parse.quote(str(valor)) for clave, valor in datos.items()}
+    return rutas + [variante.format(**citados) for variante in VARIANTES]
+
+
+def pedir(url):
+    """Hace una petición GET; devuelve (latencia en ms, si fue exitosa)."""
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url) as respuesta:
+            respuesta.read()
+            exito = respuesta.status < 400
+    except OSError:
+        exito = False
+    return (time.perf_counter() - inicio) * 1000, exito
+
+
+def cargar_ruta(url, clientes, peticiones):
+    """Lanza `peticiones` GET a `url` desde `clientes` hilos; devuelve latencias, tiempo total y errores."""
+    pedir(url)  # calentamiento: la primera petición arma caches e índices
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as ejecutor:
+        mediciones = list(ejecutor.map(pedir, [url] * peticiones))
+    duracion = time.perf_counter() - inicio
+    latencias = [latencia for latencia, _ in mediciones]
+    errores = sum(1 for _, exito in mediciones if not exito)
+    return latencias, duracion, errores
+
+
+def percentiles(latencias):
+    """p50, p95 y p99 de una lista de latencias."""
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive')
+    return cortes[49], cortes[94], cortes[98]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga de los endpoints GET de la API')
+    parser.add_argument('--clientes', type=int, default=8, help='peticiones simultáneas')
+    parser.add_argument('--peticiones', type=int, default=200, help='peticiones por ruta')
+    parser.add_argument('--sin-cache', action='store_true', help='no reutilizar respuestas serializadas')
+    parser.add_argument('--salida', default='bench_endpoints.json')
+    parser.add_argument('--base', help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--umbral', type=float, default=resultados.UMBRAL_REGRESION)
+    opciones = parser.parse_args()
+
+    from werkzeug.serving import make_server
+
+    os.chdir(RAIZ)
+    import main
+
+    if not main.consultas_por_temporada:
+        print('❌ El motor no se pudo inicializar')
+        sys.exit(1)
+    if opciones.sin_cache:
+        # Sin lugar en la cache, cada respuesta se descarta apenas se guarda
+        main.cache_respuestas.max_entradas = 0
+
+    # Sin una línea de log por petición
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, main.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{servidor.server_port}'
+
+    datos = datos_ejemplo(main.consultas_por_temporada[main.TEMPORADA_POR_DEFECTO])
+    metricas = {}
+    print(f"\n{'ruta'.ljust(50)}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errores':>9}")
+    for ruta in rutas_a_medir(main.app, datos):
+        latencias, duracion, errores = cargar_ruta(base_url + ruta, opciones.clientes, opciones.peticiones)
+        p50, p95, p99 = percentiles(latencias)
+        rps = len(latencias) / duracion
+        metricas.update({
+            f'GET {ruta}/p50_ms': p50, f'GET {ruta}/p95_ms': p95, f'GET {ruta}/p99_ms': p99,
+            f'GET {ruta}/peticiones_rps': rps, f'GET {ruta}/errores': errores,
+        })
+        print(f'{ruta[:50].ljust(50)}{p50:10.2f}{p95:10.2f}{p99:10.2f}{rps:10.1f}{errores:9d}')
+
+    servidor.shutdown()
+    if main.pool is not None:
+        main.pool.cerrar()
+
+    resultados.guardar(opciones.salida, 'bench_endpoints', metricas, motor=main.TIPO_MOTOR,
+                       replicas=main.REPLICAS, clientes=opciones.clientes, peticiones=opciones.peticiones,
+                       cache=not opciones.sin_cache)
+    resultados.terminar(metricas, opciones.base, opciones.umbral)
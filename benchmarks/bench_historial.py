@@ -0,0 +1,71 @@
+"""
+Benchmark de la tabla a lo largo de la temporada.
+
+Compara armar la tabla al cierre de cada ronda recorriendo de nuevo los partidos
+(una consulta de partido/9 y una suma por ronda, como haría falta sin índice) contra
+ConsultasLiga.tabla_hasta, que busca en el historial de totales acumulados por equipo.
+Verifica que las dos den las mismas tablas.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_historial.py [archivo.json ...]
+"""
+import sys
+import time
+
+from resultados import por_temporada
+
+REPETICIONES = 5
+
+
+def tabla_recorriendo(consultas, ronda):
+    """Tabla hasta `ronda` recorriendo todos los partidos (sin el historial)."""
+    from historial_equipos import numero_ronda
+
+    filas = {}
+    partidos = consultas._consultar_preparada(
+        'partido', ('Id', 'Ronda', 'Fecha', 'Local', 'GL_HT', 'GL_FT', 'Visitante', 'GV_HT', 'GV_FT'))
+    for p in partidos:
+        numero = numero_ronda(p['Ronda'])
+        if numero is None or numero > ronda:
+            continue
+        for equipo, gf, gc in ((p['Local'], p['GL_FT'], p['GV_FT']), (p['Visitante'], p['GV_FT'], p['GL_FT'])):
+            fila = filas.setdefault(equipo, dict.fromkeys(('PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DG', 'Puntos'), 0))
+            fila['PJ'] += 1
+            fila['PG'] += gf > gc
+            fila['PE'] += gf == gc
+            fila['PP'] += gf < gc
+            fila['GF'] += gf
+            fila['GC'] += gc
+            fila['DG'] += gf - gc
+            fila['Puntos'] += 3 if gf > gc else 1 if gf == gc else 0
+    return consultas._ordenar_tabla([consultas._fila_tabla(equipo, fila) for equipo, fila in filas.items()])
+
+
+def medir(funcion, rondas):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        tablas = [funcion(ronda) for ronda in rondas]
+    return tablas, (time.perf_counter() - inicio) / REPETICIONES
+
+
+def medir_archivo(archivo):
+    import contextlib
+    import io
+    from setup import SetUp
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        consultas = SetUp(archivo).obtener_acceso_consultas()
+    rondas = range(1, consultas.historial().ultima_ronda + 1)
+
+    anterior, t_anterior = medir(lambda ronda: tabla_recorriendo(consultas, ronda), rondas)
+    nueva, t_nueva = medir(lambda ronda: consultas.tabla_hasta(ronda=ronda), rondas)
+    if anterior != nueva:
+        print(f'❌ {archivo}: las tablas no coinciden')
+        sys.exit(1)
+
+    print(f'{archivo}: {len(rondas)} rondas | recorriendo {t_anterior * 1000:.1f} ms '
+          f'| historial {t_nueva * 1000:.1f} ms | x{t_anterior / t_nueva:.1f}')
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
@@ -0,0 +1,91 @@
+"""
+Microbenchmark de las reglas por equipo.
+
+Compara cada regla escrita sobre `partido/9` (el equipo en el argumento 4 o 7, con el ID
+del partido como primer argumento) contra la versión actual sobre los hechos índice
+`juega/7`, que tienen al equipo como primer argumento. Las reglas anteriores se cargan en
+un módulo aparte (`sin_indice`) con una copia de los mismos partidos, y para cada regla se
+mide el tiempo de resolverla para todos los equipos de la temporada.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_indices.py [archivo.json ...]
+"""
+import json
+import sys
+import time
+
+from resultados import por_temporada
+
+REPETICIONES = 5
+MODULO_SIN_INDICE = 'sin_indice'
+
+# Definiciones anteriores, que buscan al equipo recorriendo todos los partidos
+REGLAS_SIN_INDICE = [
+    "partido_jugado(Equipo) :- partido(_, _, _, Equipo, _, _, _, _, _)",
+    "partido_jugado(Equipo) :- partido(_, _, _, _, _, _, Equipo, _, _)",
+    "stats_partido(Equipo, 3, GolesF, GolesC) :- partido(_, _, _, Equipo, _, GolesF, _, _, GolesC), GolesF > GolesC",
+    "stats_partido(Equipo, 1, GolesF, GolesC) :- partido(_, _, _, Equipo, _, GolesF, _, _, GolesC), GolesF =:= GolesC",
+    "stats_partido(Equipo, 0, GolesF, GolesC) :- partido(_, _, _, Equipo, _, GolesF, _, _, GolesC), GolesF < GolesC",
+    "stats_partido(Equipo, 3, GolesF, GolesC) :- partido(_, _, _, _, _, GolesC, Equipo, _, GolesF), GolesF > GolesC",
+    "stats_partido(Equipo, 1, GolesF, GolesC) :- partido(_, _, _, _, _, GolesC, Equipo, _, GolesF), GolesF =:= GolesC",
+    "stats_partido(Equipo, 0, GolesF, GolesC) :- partido(_, _, _, _, _, GolesC, Equipo, _, GolesF), GolesF < GolesC",
+    "valla_invicta(Equipo) :- partido(_, _, _, Equipo, _, _, _, _, 0)",
+    "valla_invicta(Equipo) :- partido(_, _, _, _, _, _, Equipo, _, 0)",
+    "remontada_ganada(Equipo) :- partido(_, _, _, Equipo, GL_HT, GL_FT, _, GV_HT, GV_FT), GL_HT < GV_HT, GL_FT > GV_FT",
+    "remontada_ganada(Equipo) :- partido(_, _, _, _, GV_HT, GV_FT, Equipo, GL_HT, GL_FT), GL_HT < GV_HT, GL_FT > GV_FT",
+]
+REEMPLAZADAS = ('partido_jugado(', 'stats_partido(', 'valla_invicta(', 'remontada_ganada(', 'indexar_', 'desindexar_')
+
+# Regla medida -> consulta por equipo (el equipo se completa con format)
+CONSULTAS = {
+    'partidos_jugados': "partidos_jugados({}, N)",
+    'total_ganados': "total_ganados({}, N)",
+    'total_puntos': "total_puntos({}, N)",
+    'total_gf': "total_gf({}, N)",
+    'total_vallas_invictas': "total_vallas_invictas({}, N)",
+    'total_remontadas_ganadas': "total_remontadas_ganadas({}, N)",
+    'tabla_equipo': "tabla_equipo({}, PJ, PG, PE, PP, GF, GC, DG, Puntos)",
+}
+
+
+def cargar_sin_indice(motor):
+    """Copia los partidos del módulo de la temporada a `sin_indice` y carga ahí las reglas anteriores."""
+    list(motor.prolog.query(
+        f"forall({motor.modulo}:partido(A, B, C, D, E, F, G, H, I)), "
+        f"assertz({MODULO_SIN_INDICE}:partido(A, B, C, D, E, F, G, H, I)))"
+    ))
+    with open('json/REGLAS.json', 'r') as f:
+        reglas = json.load(f)['REGLAS_PROLOG']
+    reglas = [r for r in reglas if not r.startswith(':- ') and not r.startswith(REEMPLAZADAS)]
+    for regla in reglas + REGLAS_SIN_INDICE:
+        motor.prolog.assertz(f"{MODULO_SIN_INDICE}:({regla})")
+
+
+def medir(prolog, modulo, consulta, equipos):
+    resultados = []
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultados = [list(prolog.query(f"{modulo}:({consulta.format(repr(e))})")) for e in equipos]
+    return resultados, (time.perf_counter() - inicio) / REPETICIONES
+
+
+def medir_archivo(archivo):
+    from setup import SetUp
+
+    motor = SetUp(archivo).motor
+    cargar_sin_indice(motor)
+    equipos = [r['Equipo'] for r in motor.consultar("setof(E, partido_jugado(E), L), member(Equipo, L)")]
+
+    print(f'{archivo}: {len(equipos)} equipos')
+    for regla, consulta in CONSULTAS.items():
+        anterior, t_anterior = medir(motor.prolog, MODULO_SIN_INDICE, consulta, equipos)
+        nueva, t_nueva = medir(motor.prolog, motor.modulo, consulta, equipos)
+        if anterior != nueva:
+            print(f'❌ {regla}: los resultados no coinciden')
+            sys.exit(1)
+        print(f'  {regla.ljust(26)} sin índice {t_anterior * 1000:8.1f} ms '
+              f'| con juega/7 {t_nueva * 1000:8.1f} ms | x{t_anterior / t_nueva:.1f}')
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
@@ -0,0 +1,50 @@
+"""
+Benchmark de la lectura de los JSON de partidos.
+
+Compara el pico de memoria y el tiempo de leer cada temporada con `json.load`
+(el archivo entero en memoria) contra `procesador.iterar_partidos`, que lo
+recorre por bloques y normaliza los partidos de a uno.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_ingesta.py [archivo.json ...]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from resultados import ARCHIVOS, RAIZ
+from procesador import iterar_partidos, normalizar_partido
+
+
+def con_json_load(archivo):
+    with open(archivo, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return sum(1 for p in data.get('response', []) if normalizar_partido(p))
+
+
+def incremental(archivo):
+    return sum(1 for _ in iterar_partidos(archivo, {}))
+
+
+def medir(funcion, archivo):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    cantidad = funcion(archivo)
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cantidad, duracion, pico
+
+
+if __name__ == '__main__':
+    os.chdir(RAIZ)
+    for archivo in sys.argv[1:] or ARCHIVOS:
+        n1, t1, m1 = medir(con_json_load, archivo)
+        n2, t2, m2 = medir(incremental, archivo)
+        if n1 != n2:
+            print(f'❌ {archivo}: cantidad de partidos distinta ({n1} vs {n2})')
+            sys.exit(1)
+        print(f'{archivo}: {n2} partidos | json.load {t1 * 1000:.1f} ms, pico {m1 / 1024:.0f} KiB '
+              f'| incremental {t2 * 1000:.1f} ms, pico {m2 / 1024:.0f} KiB')
@@ -0,0 +1,71 @@
+"""
+Benchmark comparativo de motores de consulta.
+
+Carga cada temporada con el motor Prolog (MotorLogico) y con el motor columnar
+(MotorColumnar, NumPy), verifica que ConsultasLiga devuelva exactamente los mismos
+resultados con los dos y muestra, lado a lado, el tiempo de carga y el de cada consulta.
+Sirve para elegir el motor de cada despliegue (variable de entorno MOTOR_CONSULTAS).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_motores.py [archivo.json ...]
+"""
+import sys
+import time
+
+from resultados import por_temporada
+
+REPETICIONES = 20
+
+
+def consultas_a_medir(consultas):
+    """Nombre -> función sin argumentos que devuelve un resultado comparable entre motores."""
+    equipos = consultas.equipos_participantes()
+    return {
+        'tabla_completa': consultas.tabla_completa,
+        'estadisticas_generales': consultas.estadisticas_generales,
+        'equipos_con_valla_invicta': lambda: sorted(consultas.equipos_con_valla_invicta()),
+        'materializar_estadisticas': lambda: (consultas.materializar_estadisticas(), consultas.cache.registros)[1],
+        'tabla_equipo (todos)': lambda: [consultas.tabla_equipo(e) for e in equipos],
+        'remontadas_ganadas (todos)': lambda: [consultas.remontadas_ganadas(e) for e in equipos],
+        'partidos_por_ronda': lambda: consultas.partidos_por_ronda('regular season - 1'),
+    }
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) / REPETICIONES
+
+
+def cargar(archivo, tipo_motor):
+    import contextlib
+    import io
+    from setup import SetUp
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Sin snapshot: se compara la carga completa desde el JSON en los dos motores
+        consultas = SetUp(archivo, usar_snapshot=False, tipo_motor=tipo_motor).obtener_acceso_consultas()
+    return consultas, time.perf_counter() - inicio
+
+
+def medir_archivo(archivo):
+    prolog, carga_prolog = cargar(archivo, 'prolog')
+    columnar, carga_columnar = cargar(archivo, 'columnar')
+
+    print(f'{archivo}')
+    print(f'  {"carga".ljust(28)} prolog {carga_prolog * 1000:8.1f} ms | columnar {carga_columnar * 1000:8.1f} ms')
+    consultas_columnar = consultas_a_medir(columnar)
+    for nombre, funcion in consultas_a_medir(prolog).items():
+        esperado, t_prolog = medir(funcion)
+        obtenido, t_columnar = medir(consultas_columnar[nombre])
+        if esperado != obtenido:
+            print(f'❌ {nombre}: los resultados de los motores no coinciden')
+            sys.exit(1)
+        print(f'  {nombre.ljust(28)} prolog {t_prolog * 1000:8.2f} ms | columnar {t_columnar * 1000:8.2f} ms '
+              f'| x{t_prolog / t_columnar:.1f}')
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
@@ -0,0 +1,51 @@
+"""
+Benchmark de consultas preparadas.
+
+Compara, para cada equipo de una temporada, la consulta armada como texto
+(f-string que Prolog vuelve a parsear en cada llamada) contra la misma consulta
+preparada (MotorLogico.preparar: el predicado se resuelve una vez y los valores
+viajan como términos). Verifica que las dos devuelvan lo mismo y muestra el tiempo
+por consulta.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_preparadas.py [archivo.json ...]
+"""
+import sys
+import time
+
+from resultados import por_temporada
+
+REPETICIONES = 50
+# Predicados por equipo de la forma pred(Equipo, N)
+PREDICADOS = ['total_ganados', 'total_empatados', 'total_perdidos', 'total_gf', 'total_remontadas_ganadas']
+
+
+def medir(funcion, equipos):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultados = [funcion(equipo) for equipo in equipos]
+    return resultados, (time.perf_counter() - inicio) / (REPETICIONES * len(equipos))
+
+
+def medir_archivo(archivo):
+    import contextlib
+    import io
+    from setup import SetUp
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        motor = SetUp(archivo).motor
+    equipos = motor.primero_preparada('equipos_participantes', ('Equipos',))['Equipos']
+
+    print(f'{archivo} ({len(equipos)} equipos)')
+    for predicado in PREDICADOS:
+        texto, t_texto = medir(lambda e: motor.primero(f"{predicado}({e}, N)."), equipos)
+        preparada, t_preparada = medir(lambda e: motor.primero_preparada(predicado, ('?', 'N'), (e,)), equipos)
+        if texto != preparada:
+            print(f'❌ {predicado}: los resultados no coinciden')
+            sys.exit(1)
+        print(f'  {predicado.ljust(26)} texto {t_texto * 1e6:8.1f} µs | preparada {t_preparada * 1e6:8.1f} µs '
+              f'| x{t_texto / t_preparada:.1f}')
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
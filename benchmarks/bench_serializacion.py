@@ -0,0 +1,110 @@
+"""
+Benchmark del costo por fila de llevar las soluciones del motor a la respuesta JSON.
+
+Conversión: trae todas las filas de `fila_posiciones/9` y de `partido/9` de tres formas
+y verifica que den los mismos valores:
+  - consulta en texto (conversión de pyswip: objetos Atom que después se normalizan),
+  - consulta preparada, un diccionario por solución,
+  - consulta preparada en filas (`consultar_filas`), una tupla por solución.
+Serialización: `tabla_completa` y todos los partidos con el json de la biblioteca estándar
+(como lo hacía jsonify) y con `serializacion.a_json` (orjson si está instalado).
+Informa microsegundos por fila.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_serializacion.py [--motor prolog|columnar] [archivo.json ...]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+from resultados import ARCHIVOS, RAIZ, relanzar
+
+REPETICIONES = 20
+
+RELACIONES = {
+    'fila_posiciones': ('Equipo', 'PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DG', 'Puntos'),
+    'partido': ('Id', 'Ronda', 'Fecha', 'Local', 'GL_HT', 'GL_FT', 'Visitante', 'GV_HT', 'GV_FT'),
+}
+
+
+def mediana(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, statistics.median(tiempos)
+
+
+def mostrar(nombre, segundos, filas, referencia=None):
+    por_fila = segundos / max(filas, 1) * 1e6
+    comparacion = f' | x{referencia / segundos:.1f}' if referencia else ''
+    print(f'    {nombre.ljust(24)} {segundos * 1000:8.3f} ms  {por_fila:7.2f} µs/fila{comparacion}')
+
+
+def medir_conversion(motor):
+    for predicado, argumentos in RELACIONES.items():
+        texto = f"{predicado}({', '.join(argumentos)})"
+        dicts, t_texto = mediana(lambda: motor.consultar(texto))
+        preparadas, t_preparada = mediana(lambda: motor.consultar_preparada(predicado, argumentos))
+        filas, t_filas = mediana(lambda: motor.consultar_filas(predicado, argumentos))
+
+        esperado = sorted(tuple(d[a] for a in argumentos) for d in dicts)
+        if sorted(tuple(d[a] for a in argumentos) for d in preparadas) != esperado or sorted(filas) != esperado:
+            print(f'❌ {predicado}: las tres conversiones no coinciden')
+            sys.exit(1)
+
+        print(f'  {predicado}/{len(argumentos)} ({len(filas)} filas)')
+        mostrar('texto (pyswip)', t_texto, len(filas))
+        mostrar('preparada (dict)', t_preparada, len(filas), t_texto)
+        mostrar('filas (tuplas)', t_filas, len(filas), t_texto)
+
+
+def medir_serializacion(consultas):
+    from serializacion import a_json, orjson
+
+    print(f"  serialización ({'orjson' if orjson is not None else 'json, orjson no instalado'})")
+    datos = {
+        'tabla_completa': consultas.tabla_completa(),
+        'partidos': consultas.pagina_partidos(limite=100000)[0],
+    }
+    for nombre, valor in datos.items():
+        # Lo que hacía jsonify: claves ordenadas, ASCII escapado y separadores compactos
+        estandar, t_json = mediana(lambda: json.dumps(valor, sort_keys=True, separators=(',', ':')).encode())
+        rapido, t_rapido = mediana(lambda: a_json(valor, ordenar=True))
+        if json.loads(estandar) != json.loads(rapido):
+            print(f'❌ {nombre}: los dos JSON no coinciden')
+            sys.exit(1)
+        print(f'    {nombre} ({len(valor)} filas, {len(rapido)} bytes)')
+        mostrar('  json', t_json, len(valor))
+        mostrar('  a_json', t_rapido, len(valor), t_json)
+
+
+def medir_archivo(archivo, tipo_motor):
+    from setup import SetUp
+
+    os.chdir(RAIZ)
+    with contextlib.redirect_stdout(io.StringIO()):
+        consultas = SetUp(archivo, tipo_motor=tipo_motor).obtener_acceso_consultas()
+    print(f'{archivo} (motor {tipo_motor})')
+    medir_conversion(consultas.motor)
+    medir_serializacion(consultas)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('archivos', nargs='*')
+    parser.add_argument('--motor', choices=('prolog', 'columnar'), default='prolog')
+    parser.add_argument('--hijo', action='store_true', help=argparse.SUPPRESS)
+    opciones = parser.parse_args()
+
+    if opciones.hijo:
+        medir_archivo(opciones.archivos[0], opciones.motor)
+    else:
+        for archivo in opciones.archivos or ARCHIVOS:
+            relanzar(__file__, '--hijo', '--motor', opciones.motor, archivo)
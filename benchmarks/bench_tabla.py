@@ -0,0 +1,68 @@
+"""
+Benchmark de la tabla de posiciones.
+
+Compara el cálculo anterior (una consulta `tabla_equipo` por equipo) contra la
+regla agregada `fila_posiciones`, que recorre los partidos una sola vez, y contra
+`tabla_completa`, que arma la tabla con los resúmenes materializados.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_tabla.py [archivo.json ...]
+"""
+import sys
+import time
+
+from resultados import por_temporada
+
+REPETICIONES = 5
+
+
+def tabla_por_equipo(consultas):
+    """Reproduce el cálculo original: setof de equipos + tabla_equipo por equipo."""
+    tabla = []
+    for equipo in consultas.equipos_participantes():
+        stats = consultas.tabla_equipo(equipo)
+        if stats:
+            equipo_id = consultas.id_equipo(equipo)
+            stats['equipo'] = equipo
+            stats['equipo_id'] = equipo_id
+            stats['logo'] = consultas.logo_map.get(equipo_id)
+            tabla.append(stats)
+    return sorted(tabla, key=lambda x: (-x['Puntos'], -x['DG'], x['equipo']))
+
+
+def tabla_agregada(consultas):
+    """La tabla desde la regla `fila_posiciones`, con una sola consulta."""
+    tabla = [
+        consultas._fila_tabla(equipo_id, dict(zip(consultas.CAMPOS_TABLA, valores)))
+        for equipo_id, *valores in consultas._consultar_filas('fila_posiciones', ('Equipo', *consultas.CAMPOS_TABLA))
+    ]
+    return consultas._ordenar_tabla(tabla)
+
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultado = funcion(*args)
+    return resultado, (time.perf_counter() - inicio) / REPETICIONES
+
+
+def medir_archivo(archivo):
+    from setup import SetUp
+
+    consultas = SetUp(archivo).obtener_acceso_consultas()
+
+    anterior, t_anterior = medir(tabla_por_equipo, consultas)
+    nueva, t_nueva = medir(tabla_agregada, consultas)
+    materializada, t_materializada = medir(consultas.tabla_completa)
+
+    if not anterior == nueva == materializada:
+        print(f'❌ {archivo}: las tablas no coinciden')
+        sys.exit(1)
+
+    print(f'{archivo}: {len(nueva)} equipos | por equipo {t_anterior * 1000:.1f} ms '
+          f'| agregada {t_nueva * 1000:.1f} ms | x{t_anterior / t_nueva:.1f} '
+          f'| materializada {t_materializada * 1000:.1f} ms | x{t_anterior / t_materializada:.1f}')
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
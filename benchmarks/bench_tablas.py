@@ -0,0 +1,138 @@
+"""
+Benchmark de la evaluación tabulada (TABLAS_PROLOG en REGLAS.json).
+
+Carga cada temporada dos veces, en módulos distintos: con los predicados de estadísticas
+tabulados y sin tablas. Verifica que las consultas den lo mismo y compara el tiempo de
+`materializar_estadisticas` (la consulta agregada de la que sale la tabla de posiciones) y de
+`tabla_equipo` de todos los equipos, repetidas (respuestas desde las tablas), desde un hilo nuevo
+en cada llamada (como cada pedido de Flask con REPLICAS_PROLOG=0; las tablas compartidas se
+reutilizan entre hilos) y justo después de actualizar un partido (las tablas incrementales se
+recalculan).
+
+Al final corrige el resultado de un partido desde otro hilo, como un POST, y verifica que la
+tabla leída de las tablas compartidas (desde este hilo y desde uno nuevo) sea la misma que la
+recalculada sin tablas: la invalidación incremental tiene que alcanzar a todos los hilos.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_tablas.py [archivo.json ...]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+from resultados import por_temporada
+
+REPETICIONES = 20
+
+
+def cargar(archivo, usar_tablas):
+    from setup import SetUp
+
+    # Cada variante en su propio módulo (temporada_<nombre>_con_tablas / _sin_tablas)
+    nombre = os.path.splitext(os.path.basename(archivo))[0]
+    temporada = f"{nombre}_{'con' if usar_tablas else 'sin'}_tablas"
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup = SetUp({temporada: archivo}, usar_snapshot=False, usar_tablas=usar_tablas)
+    return setup.obtener_acceso_consultas()
+
+
+def mediana(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, statistics.median(tiempos)
+
+
+def en_hilo_nuevo(funcion):
+    """Llama a `funcion` desde un hilo recién creado y devuelve su resultado."""
+    resultado = []
+    hilo = threading.Thread(target=lambda: resultado.append(funcion()))
+    hilo.start()
+    hilo.join()
+    return resultado[0]
+
+
+def despues_de_actualizar(consultas, partido, funcion):
+    """Tiempo de la primera llamada después de reemplazar un partido (sin cambios en el resultado)."""
+    consultas.actualizar_partidos([partido])
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def tablas_de(consultas):
+    """Tabla de posiciones (`fila_posiciones/9`) y resúmenes (`fila_resumen`) tal como salen del motor."""
+    filas = consultas._consultar_filas('fila_posiciones', ('Equipo', *consultas.CAMPOS_TABLA))
+    consultas.materializar_estadisticas()
+    return sorted(filas), sorted(consultas.cache.todos(), key=lambda r: r['equipo_id'])
+
+
+def verificar_actualizacion_en_otro_hilo(variantes, partido):
+    """
+    Con las tablas ya llenas, cambia el resultado de `partido` desde un hilo nuevo y compara lo que
+    devuelven las tablas compartidas con el recálculo sin tablas. Al final deja el partido como estaba.
+    """
+    sin_tablas, con_tablas = variantes['sin tablas'], variantes['con tablas']
+    tablas_de(con_tablas)
+    en_hilo_nuevo(lambda: tablas_de(con_tablas))
+    corregido = dict(partido, total_local=partido['total_local'] + 2)
+    for consultas in variantes.values():
+        en_hilo_nuevo(lambda: consultas.actualizar_partidos([corregido]))
+
+    esperado = tablas_de(sin_tablas)
+    for lector, obtenido in (('este hilo', tablas_de(con_tablas)),
+                             ('un hilo nuevo', en_hilo_nuevo(lambda: tablas_de(con_tablas)))):
+        if obtenido != esperado:
+            print(f'❌ Después de actualizar desde otro hilo, las tablas leídas desde {lector} no coinciden con el recálculo')
+            sys.exit(1)
+    for consultas in variantes.values():
+        consultas.actualizar_partidos([partido])
+    print('  ✅ Tablas compartidas al día después de actualizar desde otro hilo')
+
+
+def medir_archivo(archivo):
+    from procesador import iterar_partidos
+
+    partido = next(iterar_partidos(archivo))
+    variantes = {'sin tablas': cargar(archivo, False), 'con tablas': cargar(archivo, True)}
+
+    print(archivo)
+    resultados = {}
+    for nombre_variante, consultas in variantes.items():
+        equipos = consultas.equipos_participantes()
+        medidas = {
+            'materializar_estadisticas': lambda: (consultas.materializar_estadisticas(), consultas.cache.todos())[1],
+            'tabla_equipo (todos)': lambda: [consultas.tabla_equipo(e) for e in equipos],
+        }
+        for nombre, funcion in medidas.items():
+            resultado, repetida = mediana(funcion)
+            desde_hilo, en_hilos = mediana(lambda: en_hilo_nuevo(funcion))
+            if desde_hilo != resultado:
+                print(f'❌ {nombre}: el resultado desde otro hilo no coincide ({nombre_variante})')
+                sys.exit(1)
+            actualizada = despues_de_actualizar(consultas, partido, funcion)
+            resultados.setdefault(nombre, {})[nombre_variante] = (resultado, repetida, en_hilos, actualizada)
+
+    for nombre, por_variante in resultados.items():
+        (esperado, sin_rep, sin_hil, sin_act), (obtenido, con_rep, con_hil, con_act) = (por_variante['sin tablas'],
+                                                                                       por_variante['con tablas'])
+        if esperado != obtenido:
+            print(f'❌ {nombre}: los resultados con y sin tablas no coinciden')
+            sys.exit(1)
+        print(f'  {nombre.ljust(26)} repetida: sin {sin_rep * 1000:8.2f} ms | con {con_rep * 1000:8.2f} ms '
+              f'| x{sin_rep / con_rep:.1f}')
+        print(f'  {"".ljust(26)} hilo nuevo: sin {sin_hil * 1000:8.2f} ms | con {con_hil * 1000:8.2f} ms '
+              f'| x{sin_hil / con_hil:.1f}')
+        print(f'  {"".ljust(26)} tras actualizar: sin {sin_act * 1000:8.2f} ms | con {con_act * 1000:8.2f} ms')
+
+    verificar_actualizacion_en_otro_hilo(variantes, partido)
+
+
+if __name__ == '__main__':
+    por_temporada(__file__, medir_archivo)
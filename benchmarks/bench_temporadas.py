@@ -0,0 +1,51 @@
+"""
+Benchmark de aislamiento entre temporadas.
+
+Mide las consultas de la temporada 2021 con sólo esa temporada cargada y
+vuelve a medirlas después de cargar 2022 y 2023 en sus propios módulos.
+Como cada temporada vive en un módulo distinto, los tiempos deberían ser
+los mismos.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_temporadas.py
+"""
+import os
+import sys
+import time
+
+from resultados import RAIZ
+
+REPETICIONES = 20
+
+
+def medir(consultas):
+    tiempos = {}
+    for nombre, funcion in (('tabla_completa', consultas.tabla_completa),
+                            ('materializar_estadisticas', consultas.materializar_estadisticas),
+                            ('equipos_con_valla_invicta', consultas.equipos_con_valla_invicta),
+                            ('estadisticas_generales', consultas.estadisticas_generales)):
+        inicio = time.perf_counter()
+        for _ in range(REPETICIONES):
+            funcion()
+        tiempos[nombre] = (time.perf_counter() - inicio) / REPETICIONES
+    return tiempos
+
+
+if __name__ == '__main__':
+    from setup import SetUp
+
+    os.chdir(RAIZ)
+    consultas_2021 = SetUp({2021: 'json/primera2021.json'}).obtener_acceso_consultas(2021)
+    antes = medir(consultas_2021)
+    tabla_antes = consultas_2021.tabla_completa()
+
+    SetUp({2022: 'json/primera2022.json', 2023: 'json/primera2023.json'})
+    despues = medir(consultas_2021)
+
+    if consultas_2021.tabla_completa() != tabla_antes:
+        print('❌ La tabla de 2021 cambió al cargar otras temporadas')
+        sys.exit(1)
+
+    print('Consultas de 2021 (ms) | sólo 2021 | 2021-2023 cargadas')
+    for nombre in antes:
+        print(f'{nombre:28} | {antes[nombre] * 1000:9.2f} | {despues[nombre] * 1000:9.2f}')
@@ -0,0 +1,145 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Importar este módulo agrega la raíz del proyecto (RAIZ) a sys.path, así los scripts pueden
+importar setup, consultas, etc. `por_temporada` y `relanzar` corren cada temporada en un proceso
+propio, y `datos_ejemplo` da valores reales de la temporada para los parámetros de las consultas.
+
+Los resultados se guardan en formato JSON, para comparar una corrida contra otra. Cada archivo
+guarda el nombre del benchmark, la fecha, el entorno (Python, sistema, núcleos, motor) y un
+diccionario plano de métricas {nombre: valor}. Los nombres terminan en la unidad: `_ms` (menos
+es mejor) o `_rps` (peticiones por segundo, más es mejor); las demás métricas (conteos, errores)
+se guardan pero no se comparan.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+# Temporadas que se miden si no se pasan archivos
+ARCHIVOS = ['json/primera2021.json', 'json/primera2022.json', 'json/primera2023.json']
+
+# Variación relativa a partir de la cual una métrica se considera regresión (0.2 = 20%)
+UMBRAL_REGRESION = 0.2
+# Diferencia mínima en ms para comparar: por debajo, el cambio relativo es ruido de medición
+MINIMO_MS = 0.5
+
+
+def relanzar(script, *argumentos, **opciones):
+    """
+    Corre `script` (el __file__ del benchmark) con `argumentos` en un proceso nuevo, desde la raíz
+    del proyecto. Cada temporada se mide en un proceso propio porque todas las instancias de pyswip
+    comparten la misma base de conocimiento (y así la carga en frío tampoco aprovecha la anterior).
+    Las `opciones` se pasan a subprocess.run.
+    """
+    return subprocess.run([sys.executable, os.path.abspath(script), *map(str, argumentos)],
+                          check=True, cwd=RAIZ, **opciones)
+
+
+def por_temporada(script, medir_archivo):
+    """
+    Punto de entrada de los benchmarks que reciben archivos por línea de comandos: con un solo
+    archivo llama a `medir_archivo(archivo)` en este proceso; si no, relanza el script una vez por
+    cada archivo (ARCHIVOS si no se pasó ninguno).
+    """
+    if len(sys.argv) == 2:
+        os.chdir(RAIZ)
+        medir_archivo(sys.argv[1])
+    else:
+        for archivo in sys.argv[1:] or ARCHIVOS:
+            relanzar(script, archivo)
+
+
+def datos_ejemplo(consultas):
+    """
+    Valores reales de la temporada cargada para completar parámetros: equipo y rival (también como
+    nombre_equipo), ronda y ID del primer partido, una fecha de mitad de temporada y el primer grupo.
+    """
+    equipos = consultas.equipos_participantes()
+    partidos, _ = consultas.pagina_partidos(limite=1000)
+    fechas = sorted(p['Fecha'] for p in partidos)
+    grupos = consultas.grupos()
+    return {
+        'equipo': equipos[0],
+        'nombre_equipo': equipos[0],
+        'rival': equipos[1],
+        'ronda': partidos[0]['Ronda'],
+        'partido_id': partidos[0]['Id'],
+        'fecha': fechas[len(fechas) // 2],
+        'grupo': grupos[0] if grupos else None,
+    }
+
+
+def entorno(**extra):
+    """Datos de la máquina y de la configuración en la que se midió."""
+    return {
+        'python': platform.python_version(),
+        'sistema': platform.platform(),
+        'nucleos': os.cpu_count(),
+        **extra,
+    }
+
+
+def guardar(ruta, benchmark, metricas, **extra):
+    """Escribe las métricas de una corrida en `ruta` (JSON)."""
+    datos = {
+        'benchmark': benchmark,
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'entorno': entorno(**extra),
+        'metricas': metricas,
+    }
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f'Resultados guardados en {ruta}')
+
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def comparar(metricas, ruta_base, umbral=UMBRAL_REGRESION):
+    """
+    Compara las métricas de esta corrida con las de un archivo base y muestra las que cambiaron
+    más que `umbral`. Las métricas que están en una sola de las dos corridas se ignoran, y las
+    de tiempo que difieren menos de MINIMO_MS también.
+
+    Returns:
+        list: nombres de las métricas que empeoraron más que el umbral
+    """
+    base = cargar(ruta_base)['metricas']
+    regresiones = []
+    print(f'\nComparación contra {ruta_base} (umbral {umbral:.0%}):')
+    for nombre in sorted(set(metricas) & set(base)):
+        actual, anterior = metricas[nombre], base[nombre]
+        if nombre.endswith('_ms'):
+            if abs(actual - anterior) < MINIMO_MS:
+                continue
+            cambio = (actual - anterior) / anterior if anterior else 0.0
+        elif nombre.endswith('_rps'):
+            cambio = (anterior - actual) / anterior if anterior else 0.0
+        else:
+            continue
+        if abs(cambio) < umbral:
+            continue
+        estado = 'PEOR ' if cambio > 0 else 'MEJOR'
+        print(f'  {estado} {nombre}: {anterior:.2f} -> {actual:.2f} ({cambio:+.0%})')
+        if cambio > 0:
+            regresiones.append(nombre)
+    if regresiones:
+        print(f'❌ {len(regresiones)} métricas empeoraron más de {umbral:.0%}')
+    else:
+        print('✅ Sin regresiones')
+    return regresiones
+
+
+def terminar(metricas, ruta_base, umbral):
+    """Si hay archivo base, compara y termina con código 1 cuando hay regresiones (para usar en CI)."""
+    if ruta_base and comparar(metricas, ruta_base, umbral):
+        sys.exit(1)
@@ -0,0 +1,111 @@
+import threading
+
+
+class CacheEstadisticas:
+    """
+    Guarda en memoria un registro materializado por equipo (el resumen que devuelve
+    ConsultasLiga.resumen_equipo), asociado a la versión de la base de conocimiento
+    con la que fue calculado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.registros = {}
+        # Versión del MotorLogico con la que se materializaron los registros (None = vacío)
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.cargas = 0
+        self.actualizaciones = 0
+
+    def vigente(self, version):
+        """Indica si los registros corresponden a la versión actual del motor."""
+        return self.version == version
+
+    def cargar(self, registros, version):
+        """Reemplaza todos los registros por los recién materializados.
+
+        Args:
+            registros (dict): id_equipo -> resumen
+            version (int): versión del motor con la que se calcularon
+        """
+        with self._lock:
+            self.registros = registros
+            self.version = version
+            self.cargas += 1
+
+    def aplicar(self, deltas, version_anterior, version, registro_vacio, valores=None):
+        """Suma diferencias a los registros de los equipos afectados por un cambio de hechos,
+        sin recalcular los demás, y los asocia a la nueva versión del motor.
+        Sólo si los registros son los de la versión anterior al cambio: si mientras tanto se
+        materializaron de nuevo (ya con el cambio), sumar las diferencias las contaría dos veces,
+        así que la cache se descarta y se recalcula en el próximo acceso.
+
+        Args:
+            deltas (dict): id_equipo -> {campo: diferencia}
+            version_anterior (int): versión del motor antes del cambio (la de los registros a ajustar)
+            version (int): versión del motor después del cambio
+            registro_vacio (callable): arma el registro inicial de un equipo que no estaba
+            valores (dict, opcional): id_equipo -> {campo: valor} que se reemplazan en vez de sumarse (p.ej. el logo)
+
+        Returns:
+            bool: False si los registros no eran los de `version_anterior` (y se descartaron)
+        """
+        with self._lock:
+            if self.version != version_anterior:
+                self.registros = {}
+                self.version = None
+                return False
+            for equipo, campos in (valores or {}).items():
+                if equipo in self.registros:
+                    self.registros[equipo].update(campos)
+            for equipo, delta in deltas.items():
+                registro = self.registros.get(equipo) or registro_vacio(equipo)
+                for campo, diferencia in delta.items():
+                    registro[campo] += diferencia
+                # Igual que al materializar: sólo hay registro para equipos con partidos
+                if registro['partidos_jugados'] > 0:
+                    self.registros[equipo] = registro
+                else:
+                    self.registros.pop(equipo, None)
+            self.version = version
+            self.actualizaciones += 1
+            return True
+
+    def invalidar(self):
+        """Descarta los registros; se recalculan en el próximo acceso."""
+        with self._lock:
+            self.registros = {}
+            self.version = None
+
+    def obtener(self, equipo):
+        """Devuelve una copia del registro del equipo, o None si no está materializado.
+
+        Args:
+            equipo (int): ID del equipo
+        """
+        with self._lock:
+            registro = self.registros.get(equipo)
+            if registro is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Copia para que quien llama no modifique el registro materializado
+            return dict(registro)
+
+    def todos(self):
+        """Copias de todos los registros materializados (no cuentan como hits)."""
+        with self._lock:
+            return [dict(registro) for registro in self.registros.values()]
+
+    def estadisticas(self):
+        """Contadores de uso de la cache."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'cargas': self.cargas,
+                'actualizaciones': self.actualizaciones,
+                'equipos': len(self.registros),
+                'version': self.version,
+            }
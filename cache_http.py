@@ -0,0 +1,104 @@
+import collections
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from flask import Response, make_response, request
+
+
+class CacheRespuestas:
+    """
+    Guarda el JSON ya serializado de cada respuesta (por ruta y argumentos) junto con la
+    versión de la base de conocimiento con la que se generó. Mientras la versión no cambie
+    se devuelven los mismos bytes, con un ETag fuerte, y los clientes que ya los tienen
+    reciben un 304 sin cuerpo.
+    """
+
+    def __init__(self, max_age=0, max_entradas=1024):
+        """
+        Args:
+            max_age (int): segundos de `Cache-Control: max-age` (0 = el cliente revalida siempre)
+            max_entradas (int): cantidad de respuestas guardadas; se descartan las menos usadas
+        """
+        self._lock = threading.Lock()
+        self._entradas = collections.OrderedDict()
+        self.max_age = max_age
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self.no_modificadas = 0
+
+    def _clave(self):
+        """Ruta y argumentos de la petición actual (el orden de los argumentos no importa)."""
+        return request.path, tuple(sorted(request.args.items(multi=True)))
+
+    def _buscar(self, clave, version):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada['version'] != version:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return entrada
+
+    def _guardar(self, clave, version, respuesta):
+        cuerpo = respuesta.get_data()
+        entrada = {
+            'version': version,
+            'cuerpo': cuerpo,
+            'mimetype': respuesta.mimetype,
+            'etag': f'{version}-{hashlib.sha256(cuerpo).hexdigest()[:16]}',
+            'modificado': datetime.now(timezone.utc).replace(microsecond=0),
+        }
+        with self._lock:
+            self._entradas[clave] = entrada
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return entrada
+
+    def responder(self, version, generar):
+        """
+        Devuelve la respuesta de la petición actual desde la cache, o la genera con `generar()`
+        si no está o fue calculada con otra versión. Sólo se guardan las respuestas 200.
+
+        Args:
+            version: versión de los datos de los que depende la respuesta (p.ej. (módulo, versión del motor))
+            generar (callable): arma la respuesta como lo haría la vista de Flask
+        """
+        clave = self._clave()
+        entrada = self._buscar(clave, version)
+        if entrada is None:
+            respuesta = make_response(generar())
+            if respuesta.status_code != 200:
+                return respuesta
+            entrada = self._guardar(clave, version, respuesta)
+
+        respuesta = Response(entrada['cuerpo'], mimetype=entrada['mimetype'])
+        respuesta.set_etag(entrada['etag'])
+        respuesta.last_modified = entrada['modificado']
+        respuesta.cache_control.public = True
+        respuesta.cache_control.max_age = self.max_age
+        respuesta.cache_control.must_revalidate = True
+        # Responde 304 sin cuerpo si coincide If-None-Match (o If-Modified-Since)
+        respuesta.make_conditional(request)
+        if respuesta.status_code == 304:
+            with self._lock:
+                self.no_modificadas += 1
+        return respuesta
+
+    def invalidar(self):
+        """Descarta todas las respuestas guardadas (p.ej. al recargar la base de conocimiento)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """Contadores de uso de la cache."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'no_modificadas': self.no_modificadas,
+                'respuestas': len(self._entradas),
+            }
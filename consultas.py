@@ -1,58 +1,165 @@
 import json
 import threading
+import time
+from collections import defaultdict
+from cache_estadisticas import CacheEstadisticas
+from historial_equipos import HistorialEquipos
+from indice_equipos import IndiceEquipos
+from matriz_enfrentamientos import MatrizEnfrentamientos
+from pool_motores import SinReplicas
+from procesador import formatear_partido, establecer_formato_logos, establecer_formato_equipos, equipos_partido
 
 class ConsultasLiga:
     """Clase para realizar consultas sobre los partidos de la liga usando el motor lógico"""
+
+    # Columnas de una fila de la tabla de posiciones, en el orden de `fila_posiciones` y `fila_grupo`
+    CAMPOS_TABLA = ('PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DG', 'Puntos')
+    # Campo del resumen materializado de cada columna de la tabla
+    RESUMEN_TABLA = {'PJ': 'partidos_jugados', 'PG': 'victorias', 'PE': 'empates', 'PP': 'derrotas',
+                     'GF': 'goles_favor', 'GC': 'goles_contra', 'DG': 'diferencia_goles', 'Puntos': 'puntos'}
+
+    # Lock para serializar acceso al motor Prolog (no thread-safe) cuando no hay réplicas.
+    # Es de la clase porque pyswip comparte un único motor entre todas las instancias (una por temporada)
+    _lock = threading.Lock()
+    # Serializa las actualizaciones de hechos (leer el partido anterior, reemplazarlo y ajustar la cache)
+    _lock_escritura = threading.Lock()
     
-    def __init__(self, motor, archivo_primera=None):
+    def __init__(self, motor, pool=None, metricas=None):
         """
         Inicializa la clase con el motor lógico cargado
         
         Args:
             motor (MotorLogico): el motor lógico con hechos y reglas cargadas
+            pool (PoolMotores, opcional): réplicas del motor para ejecutar las consultas en paralelo
+            metricas (RegistroMetricas, opcional): donde registrar el costo de cada consulta al motor
         """
         self.motor = motor
-        # Lock para serializar acceso al motor Prolog (no thread-safe)
-        self._lock = threading.Lock()
-        # Mapeo nombre_equipo.lower() -> logo_url extraído desde el JSON de partidos (si se proporciona)
-        self.logo_map = {}
-        if archivo_primera:
-            try:
-                with open(archivo_primera, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for item in data.get('response', []):
-                    teams = item.get('teams', {})
-                    home = teams.get('home', {})
-                    away = teams.get('away', {})
-                    # Normalizar nombres a minúsculas (el motor también usa .lower())
-                    if home.get('name') and home.get('logo'):
-                        self.logo_map[str(home.get('name')).lower()] = home.get('logo')
-                    if away.get('name') and away.get('logo'):
-                        self.logo_map[str(away.get('name')).lower()] = away.get('logo')
-            except FileNotFoundError:
-                # No interrumpe el funcionamiento de la API si el archivo no existe
-                print(f"Aviso: no se encontró '{archivo_primera}' para extraer logos.")
-            except Exception as e:
-                print(f"Error al leer '{archivo_primera}' para extraer logos: {e}")
+        self.pool = pool
+        self.metricas = metricas
+        # Mapeo id_equipo -> logo_url, cargado junto con los partidos como hechos logo_equipo/2
+        self.logo_map = dict(self._consultar_filas('logo_equipo', ('Equipo', 'Logo')))
+        # Los hechos identifican a los equipos por ID; el índice traduce nombres y códigos (hechos equipo/3)
+        self.indice_equipos = IndiceEquipos()
+        for equipo_id, nombre, codigo in self._consultar_filas('equipo', ('Id', 'Nombre', 'Codigo')):
+            self.indice_equipos.agregar(equipo_id, nombre, codigo)
+
+        # Índice de totales acumulados por equipo en el tiempo (ver `historial`); se arma en el primer uso
+        self._historial = None
+        # Resultados de cada equipo contra cada otro (ver `matriz_enfrentamientos`); se arma en el primer uso
+        self._matriz = None
+
+        # Resúmenes por equipo materializados al cargar; se recalculan sólo si cambia la versión del motor
+        self.cache = CacheEstadisticas()
+        self.materializar_estadisticas()
     
+    def _ejecutar(self, operacion, *args):
+        """
+        Único camino por el que se consulta al motor Prolog: si hay un pool de réplicas la operación
+        corre en la primera réplica libre (en paralelo con otras); si no, o si ya no queda ninguna
+        réplica viva, se serializa con el lock sobre el motor principal (que siempre está al día).
+        Con métricas, además se registra su duración, la espera, las inferencias y las soluciones.
+        """
+        if self.metricas is None:
+            if self.pool is not None:
+                try:
+                    return self.pool.ejecutar(self.motor.modulo, operacion, *args)
+                except SinReplicas:
+                    pass
+            with self._lock:
+                return getattr(self.motor, operacion)(*args)
+
+        inicio = time.perf_counter()
+        en_pool = self.pool is not None
+        if en_pool:
+            try:
+                (resultado, inferencias), espera = self.pool.ejecutar_medido(self.motor.modulo, 'medir', operacion, *args)
+            except SinReplicas:
+                en_pool = False
+        if not en_pool:
+            with self._lock:
+                espera = time.perf_counter() - inicio
+                resultado, inferencias = self.motor.medir(operacion, *args)
+        duracion = time.perf_counter() - inicio
+
+        if isinstance(resultado, list):
+            soluciones = len(resultado)
+        else:
+            soluciones = int(resultado is not None and resultado is not False)
+        predicado, valores = _predicado_de(operacion, args)
+        self.metricas.registrar_consulta(predicado, duracion, espera, inferencias, soluciones, valores)
+        return resultado
+
     def _safe_consultar(self, consulta):
-        """Wrapper que serializa las consultas al motor Prolog."""
-        with self._lock:
-            return self.motor.consultar(consulta)
+        """Todas las soluciones de la consulta."""
+        return self._ejecutar('consultar', consulta)
+
+    def _primero(self, consulta):
+        """Sólo la primera solución (o None): Prolog no sigue buscando las demás."""
+        return self._ejecutar('primero', consulta)
+
+    def _consultar_preparada(self, predicado, argumentos, *valores):
+        """
+        Todas las soluciones de una consulta preparada (ver MotorLogico.preparar): los valores
+        viajan como átomos/enteros, sin armar ni parsear texto Prolog en cada llamada.
+        """
+        return self._ejecutar('consultar_preparada', predicado, argumentos, valores)
+
+    def _primero_preparada(self, predicado, argumentos, *valores):
+        """Primera solución (o None) de una consulta preparada."""
+        return self._ejecutar('primero_preparada', predicado, argumentos, valores)
+
+    def _consultar_filas(self, predicado, argumentos, *valores):
+        """
+        Como `_consultar_preparada`, pero cada solución llega como tupla (salidas en el orden de los
+        argumentos): para consultas de muchas filas, que después se arman con sus propias claves.
+        """
+        return self._ejecutar('consultar_filas', predicado, argumentos, valores)
+
+    def id_equipo(self, equipo):
+        """
+        Devuelve el ID de un equipo, o None si no se conoce (o el nombre/código es ambiguo).
+
+        Args:
+            equipo (int | string): ID, código (ej: 'BEL') o nombre, con cualquier combinación de mayúsculas y tildes
+        """
+        return self.indice_equipos.buscar(equipo)
+
+    def _nombre(self, equipo_id):
+        """Nombre (en minúsculas, como se cargó) del equipo con ese ID."""
+        nombre = self.indice_equipos.nombre(equipo_id)
+        return nombre if nombre is not None else str(equipo_id)
+
+    def _contar(self, predicado, equipo):
+        """Resultado de un predicado por equipo de la forma `predicado(Equipo, N)` (0 si el equipo no se conoce)."""
+        equipo_id = self.id_equipo(equipo)
+        if equipo_id is None:
+            return 0
+        resultado = self._primero_preparada(predicado, ('?', 'N'), equipo_id)
+        return resultado['N'] if resultado else 0
+
+    def _con_nombres(self, partido):
+        """Reemplaza los IDs de los equipos de un partido por sus nombres (los IDs quedan en LocalId y VisitanteId)."""
+        partido = dict(partido)
+        partido['LocalId'] = partido['Local']
+        partido['VisitanteId'] = partido['Visitante']
+        partido['Local'] = self._nombre(partido['Local'])
+        partido['Visitante'] = self._nombre(partido['Visitante'])
+        return partido
     
     def tabla_equipo(self, equipo_nombre):
         """
         Obtiene las estadísticas completas de un equipo en la tabla
         
         Args:
-            equipo_nombre (string): nombre del equipo a consultar
+            equipo_nombre (int | string): ID, código o nombre del equipo a consultar
             
         Returns:
             dict: estadísticas del equipo o None si no existe
         """
-        consulta = f"tabla_equipo('{equipo_nombre}', PJ, PG, PE, PP, GF, GC, DG, Puntos)."
-        resultados = self._safe_consultar(consulta)
-        return resultados[0] if resultados else None
+        equipo_id = self.id_equipo(equipo_nombre)
+        if equipo_id is None:
+            return None
+        return self._primero_preparada('tabla_equipo', ('?', 'PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DG', 'Puntos'), equipo_id)
 
     def equipos_participantes(self):
         """ 
@@ -61,156 +168,342 @@ class ConsultasLiga:
         Returns:
             list: lista de nombres de equipos
         """
-        consulta_equipos = "setof(Equipo, partido_jugado(Equipo), Equipos)."
-        resultado_equipos = self._safe_consultar(consulta_equipos)
-        return resultado_equipos[0]['Equipos'] if resultado_equipos else []
+        resultado_equipos = self._primero_preparada('equipos_participantes', ('Equipos',))
+        # setof los devuelve ordenados por ID: se ordenan por nombre, como antes
+        return sorted(self._nombre(equipo_id) for equipo_id in resultado_equipos['Equipos']) if resultado_equipos else []
 
     def remontadas_ganadas(self, equipo_nombre):
         """
         Devuelve cantidad de remontadas realizadas por un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo a consultar
+            equipo_nombre (int | string): ID, código o nombre del equipo a consultar
 
         Returns:
             int: cantidad de remontadas ganadas por el equipo
         """
-        resultado_remontada = self._safe_consultar(f"total_remontadas_ganadas('{equipo_nombre}', N).")
-        return resultado_remontada[0]['N'] if resultado_remontada else 0
+        return self._contar('total_remontadas_ganadas', equipo_nombre)
 
     def tabla_completa(self):
         """
-        Obtiene la tabla completa de posiciones de la liga
-        
+        Obtiene la tabla completa de posiciones de la liga.
+        Sale de los resúmenes materializados (ver `materializar_estadisticas`), que `actualizar_partidos`
+        mantiene sumando sólo la diferencia de cada partido: después de una actualización no se vuelve
+        a recorrer la temporada, sólo se ordenan las filas.
+
         Returns:
             list: lista de diccionarios con estadísticas de todos los equipos
         """
-        equipos = self.equipos_participantes()
-        tabla = []
-        
-        for equipo in equipos:
-            stats = self.tabla_equipo(equipo)
-            if stats:
-                stats['equipo'] = equipo
-                # Añadir logo si está disponible en el mapping
-                stats['logo'] = self.logo_map.get(equipo)
-                tabla.append(stats)
-        
-        # Ordenar por puntos (descendente) y diferencia de goles (descendente)
-        tabla_ordenada = sorted(tabla, key=lambda x: (x['Puntos'], x['DG']), reverse=True)
-        return tabla_ordenada
+        self._asegurar_cache()
+        tabla = [
+            self._fila_tabla(resumen['equipo_id'], {campo: resumen[clave] for campo, clave in self.RESUMEN_TABLA.items()})
+            for resumen in self.cache.todos()
+        ]
+        return self._ordenar_tabla(tabla)
+
+    def _fila_tabla(self, equipo_id, stats):
+        """Completa una fila de la tabla de posiciones con el nombre, el ID y el logo del equipo."""
+        stats['equipo'] = self._nombre(equipo_id)
+        stats['equipo_id'] = equipo_id
+        # Añadir logo si está disponible en el mapping
+        stats['logo'] = self.logo_map.get(equipo_id)
+        return stats
+
+    def _ordenar_tabla(self, tabla):
+        """Ordena por puntos (descendente) y diferencia de goles (descendente); a igualdad, por nombre."""
+        return sorted(tabla, key=lambda x: (-x['Puntos'], -x['DG'], x['equipo']))
+
+    def historial(self):
+        """
+        Devuelve el HistorialEquipos (totales acumulados por equipo, partido a partido) de la versión
+        actual del motor. Se arma con una sola consulta de todos los partidos la primera vez que se
+        usa y de nuevo sólo cuando cambian los hechos.
+        """
+        historial = self._historial
+        if historial is None or historial.version != self.motor.version:
+            version = self.motor.version
+            historial = self._historial = HistorialEquipos(self._todos_los_partidos(), version)
+        return historial
+
+    def _todos_los_partidos(self):
+        """Todos los partidos tal como están en los hechos (equipos por ID), en una sola consulta."""
+        argumentos = ('Id', 'Ronda', 'Fecha', 'Local', 'GL_HT', 'GL_FT', 'Visitante', 'GV_HT', 'GV_FT')
+        return [dict(zip(argumentos, fila)) for fila in self._consultar_filas('partido', argumentos)]
+
+    def matriz_enfrentamientos(self):
+        """
+        Devuelve la MatrizEnfrentamientos (equipo x equipo) de la versión actual del motor. Se arma con
+        una sola consulta de todos los partidos la primera vez; `actualizar_partidos` la mantiene al día.
+        """
+        matriz = self._matriz
+        if matriz is None or matriz.version != self.motor.version:
+            version = self.motor.version
+            matriz = self._matriz = MatrizEnfrentamientos(self._todos_los_partidos(), version)
+        return matriz
+
+    def enfrentamiento(self, equipo_nombre, rival_nombre):
+        """
+        Resultados de un equipo contra otro (desde el punto de vista del primero) y sus partidos.
+
+        Args:
+            equipo_nombre / rival_nombre (int | string): ID, código o nombre de cada equipo
+
+        Returns:
+            dict: nombres, IDs, PJ, PG, PE, PP, GF, GC, GF_HT, GC_HT y la lista de partidos,
+            o None si alguno de los equipos no se conoce
+        """
+        equipo_id, rival_id = self.id_equipo(equipo_nombre), self.id_equipo(rival_nombre)
+        if equipo_id is None or rival_id is None:
+            return None
+        celda = self.matriz_enfrentamientos().celda(equipo_id, rival_id)
+        valores, partidos = celda if celda else (dict.fromkeys(MatrizEnfrentamientos.CAMPOS, 0), [])
+        return {
+            'equipo': self._nombre(equipo_id), 'equipo_id': equipo_id,
+            'rival': self._nombre(rival_id), 'rival_id': rival_id,
+            **valores,
+            'partidos': [self._con_nombres(partido) for partido in partidos],
+        }
+
+    def matriz_resultados(self):
+        """
+        Matriz completa de resultados entre todos los equipos con partidos.
+
+        Returns:
+            dict: 'equipos' (nombre e ID, en el orden de filas y columnas), 'campos' y 'valores', donde
+            valores[i][j] son los totales (en el orden de 'campos') del equipo i contra el equipo j
+        """
+        matriz = self.matriz_enfrentamientos()
+        return {
+            'equipos': [{'equipo': self._nombre(equipo_id), 'equipo_id': equipo_id} for equipo_id in matriz.equipos],
+            'campos': list(MatrizEnfrentamientos.CAMPOS),
+            'valores': matriz.filas(),
+        }
+
+    def grupos(self):
+        """
+        Fases o zonas de la temporada con rondas numeradas (ej: 'regular season', o 'group a' y
+        'group b' en una temporada con zonas), según el índice `partido_grupo/2`.
+
+        Returns:
+            list: nombres de los grupos ordenados (vacía si no hay rondas numeradas)
+        """
+        resultado = self._primero_preparada('grupos', ('Grupos',))
+        return list(resultado['Grupos']) if resultado else []
+
+    def tablas_por_grupo(self):
+        """
+        Tabla de posiciones de cada fase o zona, con sólo los partidos de ese grupo.
+        Usa la regla `fila_grupo`, que arma cada tabla recorriendo una sola vez los partidos del grupo.
+
+        Returns:
+            dict: grupo -> lista de filas (mismo formato que `tabla_completa`)
+        """
+        tablas = {grupo: [] for grupo in self.grupos()}
+        for grupo, equipo_id, *valores in self._consultar_filas('fila_grupo', ('Grupo', 'Equipo', *self.CAMPOS_TABLA)):
+            tablas.setdefault(grupo, []).append(self._fila_tabla(equipo_id, dict(zip(self.CAMPOS_TABLA, valores))))
+        return {grupo: self._ordenar_tabla(tabla) for grupo, tabla in tablas.items()}
+
+    def tabla_grupo(self, grupo):
+        """
+        Tabla de posiciones de una fase o zona.
+
+        Args:
+            grupo (string): nombre del grupo (ej: 'group a'; sin distinguir mayúsculas)
+
+        Returns:
+            list: filas ordenadas (mismo formato que `tabla_completa`); vacía si el grupo no existe
+        """
+        tabla = [
+            self._fila_tabla(equipo_id, dict(zip(self.CAMPOS_TABLA, valores)))
+            for equipo_id, *valores in self._consultar_filas('fila_grupo', ('?', 'Equipo', *self.CAMPOS_TABLA), grupo.lower())
+        ]
+        return self._ordenar_tabla(tabla)
+
+    def tabla_hasta(self, ronda=None, fecha=None, grupo=None):
+        """
+        Tabla de posiciones (mismo formato que `tabla_completa`) contando sólo los partidos hasta
+        una ronda o hasta un día. Cada fila es una búsqueda en el historial, no un nuevo recorrido.
+
+        Args:
+            ronda (int, opcional): número de ronda (las rondas sin número, como los play-offs, no cuentan)
+            fecha (string, opcional): 'AAAA-MM-DD', inclusive (se usa si no se indica ronda)
+            grupo (string, opcional): sólo los equipos de esa fase o zona y sus partidos de rondas numeradas
+
+        Returns:
+            list: lista de diccionarios con estadísticas de los equipos con partidos hasta ese momento
+        """
+        tabla = [
+            self._fila_tabla(equipo_id, {campo: fila[campo] for campo in self.CAMPOS_TABLA})
+            for equipo_id, fila in self.historial().tabla(ronda, fecha, grupo.lower() if grupo else None).items()
+        ]
+        return self._ordenar_tabla(tabla)
+
+    def evolucion_posiciones(self, grupo=None):
+        """
+        Posición y puntos de cada equipo al cierre de cada ronda numerada de la temporada
+        (con `grupo`, posiciones dentro de esa fase o zona).
+
+        Returns:
+            dict: 'rondas' (lista de números) y 'equipos' (nombre, ID, y listas 'posiciones' y 'puntos'
+            alineadas con 'rondas'; None en las rondas en que el equipo todavía no había jugado)
+        """
+        rondas = list(range(1, self.historial().ultima_ronda + 1))
+        evolucion = {}
+        for indice, ronda in enumerate(rondas):
+            for posicion, fila in enumerate(self.tabla_hasta(ronda=ronda, grupo=grupo), start=1):
+                equipo = evolucion.setdefault(fila['equipo_id'], {
+                    'equipo': fila['equipo'], 'equipo_id': fila['equipo_id'],
+                    'posiciones': [None] * len(rondas), 'puntos': [None] * len(rondas),
+                })
+                equipo['posiciones'][indice] = posicion
+                equipo['puntos'][indice] = fila['Puntos']
+        return {'rondas': rondas, 'equipos': sorted(evolucion.values(), key=lambda e: e['equipo'])}
+
+    def forma_equipo(self, equipo_nombre, n=5, fecha=None):
+        """
+        Últimos `n` partidos de un equipo (hasta `fecha`, si se indica) y su racha.
+
+        Args:
+            equipo_nombre (int | string): ID, código o nombre del equipo
+            n (int): cantidad de partidos
+            fecha (string, opcional): 'AAAA-MM-DD', inclusive
+
+        Returns:
+            dict: partidos (del más viejo al más nuevo), racha ('G'/'E'/'P' por partido) y puntos obtenidos,
+            o None si el equipo no se conoce
+        """
+        equipo_id = self.id_equipo(equipo_nombre)
+        if equipo_id is None:
+            return None
+        partidos = []
+        for p in self.historial().forma(equipo_id, n, fecha):
+            resultado = 'G' if p['GF'] > p['GC'] else 'E' if p['GF'] == p['GC'] else 'P'
+            partidos.append({
+                'Id': p['Id'], 'Ronda': p['Ronda'], 'Fecha': p['Fecha'], 'Rival': self._nombre(p['Rival']),
+                'RivalId': p['Rival'], 'Local': p['Local'], 'GF': p['GF'], 'GC': p['GC'], 'Resultado': resultado,
+            })
+        return {
+            'equipo': self._nombre(equipo_id),
+            'equipo_id': equipo_id,
+            'partidos': partidos,
+            'racha': ''.join(p['Resultado'] for p in partidos),
+            'puntos': sum(3 if p['Resultado'] == 'G' else 1 if p['Resultado'] == 'E' else 0 for p in partidos),
+        }
+
+    def progresion_equipo(self, equipo_nombre):
+        """
+        Puntos acumulados (y partidos jugados y diferencia de gol) de un equipo después de cada partido.
+
+        Args:
+            equipo_nombre (int | string): ID, código o nombre del equipo
+
+        Returns:
+            dict: nombre, ID y lista 'progresion' en orden de fecha, o None si el equipo no se conoce
+        """
+        equipo_id = self.id_equipo(equipo_nombre)
+        if equipo_id is None:
+            return None
+        progresion = [
+            {'Id': p['Id'], 'Ronda': p['Ronda'], 'Fecha': p['Fecha'], 'PJ': fila['PJ'], 'DG': fila['DG'], 'Puntos': fila['Puntos']}
+            for p, fila in self.historial().progresion(equipo_id)
+        ]
+        return {'equipo': self._nombre(equipo_id), 'equipo_id': equipo_id, 'progresion': progresion}
 
     def partidos_jugados_por_equipo(self, equipo_nombre):
         """
         Devuelve la cantidad de partidos jugados por un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de partidos jugados
         """
-        consulta = f"partidos_jugados('{equipo_nombre}', PJ)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['PJ'] if resultado else 0
+        return self._contar('partidos_jugados', equipo_nombre)
 
     def victorias_equipo(self, equipo_nombre):
         """
         Devuelve la cantidad de victorias de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de victorias
         """
-        consulta = f"total_ganados('{equipo_nombre}', PG)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['PG'] if resultado else 0
+        return self._contar('total_ganados', equipo_nombre)
 
     def empates_equipo(self, equipo_nombre):
         """
         Devuelve la cantidad de empates de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de empates
         """
-        consulta = f"total_empatados('{equipo_nombre}', PE)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['PE'] if resultado else 0
+        return self._contar('total_empatados', equipo_nombre)
 
     def derrotas_equipo(self, equipo_nombre):
         """
         Devuelve la cantidad de derrotas de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de derrotas
         """
-        consulta = f"total_perdidos('{equipo_nombre}', PP)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['PP'] if resultado else 0
+        return self._contar('total_perdidos', equipo_nombre)
 
     def goles_favor_equipo(self, equipo_nombre):
         """
         Devuelve la cantidad de goles a favor de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de goles a favor
         """
-        consulta = f"total_gf('{equipo_nombre}', GF)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['GF'] if resultado else 0
+        return self._contar('total_gf', equipo_nombre)
 
     def goles_contra_equipo(self, equipo_nombre):
         """
         Devuelve la cantidad de goles en contra de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de goles en contra
         """
-        consulta = f"total_gc('{equipo_nombre}', GC)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['GC'] if resultado else 0
+        return self._contar('total_gc', equipo_nombre)
 
     def diferencia_goles_equipo(self, equipo_nombre):
         """
         Devuelve la diferencia de goles de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: diferencia de goles (GF - GC)
         """
-        consulta = f"diferencia_goles('{equipo_nombre}', DG)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['DG'] if resultado else 0
+        return self._contar('diferencia_goles', equipo_nombre)
 
     def puntos_equipo(self, equipo_nombre):
         """
         Devuelve los puntos totales de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: puntos totales
         """
-        consulta = f"total_puntos('{equipo_nombre}', Puntos)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['Puntos'] if resultado else 0
+        return self._contar('total_puntos', equipo_nombre)
 
     def estadisticas_generales(self):
         """
@@ -219,17 +512,17 @@ class ConsultasLiga:
         Returns:
             dict: estadísticas generales (victorias locales, visitantes, empates)
         """
-        victorias_locales = self.motor.consultar("total_victorias_locales(N).")
-        victorias_visitantes = self.motor.consultar("total_victorias_visitantes(N).")
-        empates = self.motor.consultar("total_empates(N).")
+        victorias_locales = self._primero_preparada('total_victorias_locales', ('N',))
+        victorias_visitantes = self._primero_preparada('total_victorias_visitantes', ('N',))
+        empates = self._primero_preparada('total_empates', ('N',))
         
         return {
-            'victorias_locales': victorias_locales[0]['N'] if victorias_locales else 0,
-            'victorias_visitantes': victorias_visitantes[0]['N'] if victorias_visitantes else 0,
-            'empates': empates[0]['N'] if empates else 0,
-            'total_partidos': (victorias_locales[0]['N'] if victorias_locales else 0) + 
-                             (victorias_visitantes[0]['N'] if victorias_visitantes else 0) + 
-                             (empates[0]['N'] if empates else 0)
+            'victorias_locales': victorias_locales['N'] if victorias_locales else 0,
+            'victorias_visitantes': victorias_visitantes['N'] if victorias_visitantes else 0,
+            'empates': empates['N'] if empates else 0,
+            'total_partidos': (victorias_locales['N'] if victorias_locales else 0) + 
+                             (victorias_visitantes['N'] if victorias_visitantes else 0) + 
+                             (empates['N'] if empates else 0)
         }
 
     def vallas_invictas_equipo(self, equipo_nombre):
@@ -237,14 +530,12 @@ class ConsultasLiga:
         Devuelve la cantidad de vallas invictas de un equipo
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
             int: cantidad de vallas invictas
         """
-        consulta = f"total_vallas_invictas('{equipo_nombre}', N)."
-        resultado = self._safe_consultar(consulta)
-        return resultado[0]['N'] if resultado else 0
+        return self._contar('total_vallas_invictas', equipo_nombre)
 
     def equipos_con_valla_invicta(self):
         """
@@ -257,16 +548,14 @@ class ConsultasLiga:
         equipos_valla = set()
         
         # Buscar en partidos como local
-        consulta_local = "partido(_, _, _, Equipo, _, _, _, _, 0)."
-        resultados_local = self.motor.consultar(consulta_local)
+        resultados_local = self._consultar_preparada('partido', ('_', '_', '_', 'Equipo', '_', '_', '_', '_', '?'), 0)
         for resultado in resultados_local:
-            equipos_valla.add(resultado['Equipo'])
+            equipos_valla.add(self._nombre(resultado['Equipo']))
         
         # Buscar en partidos como visitante
-        consulta_visitante = "partido(_, _, _, _, _, _, Equipo, _, 0)."
-        resultados_visitante = self.motor.consultar(consulta_visitante)
+        resultados_visitante = self._consultar_preparada('partido', ('_', '_', '_', '_', '_', '_', 'Equipo', '_', '?'), 0)
         for resultado in resultados_visitante:
-            equipos_valla.add(resultado['Equipo'])
+            equipos_valla.add(self._nombre(resultado['Equipo']))
         
         return list(equipos_valla)
 
@@ -280,8 +569,8 @@ class ConsultasLiga:
         Returns:
             list: lista de partidos de esa ronda
         """
-        consulta = f"partido(Id, '{ronda}', Fecha, Local, GL_HT, GL_FT, Visitante, GV_HT, GV_FT)."
-        return self.motor.consultar(consulta)
+        partidos = self._consultar_preparada('partido', ('Id', '?', 'Fecha', 'Local', 'GL_HT', 'GL_FT', 'Visitante', 'GV_HT', 'GV_FT'), ronda)
+        return [self._con_nombres(partido) for partido in partidos]
 
     def buscar_partido_por_id(self, partido_id):
         """
@@ -294,37 +583,288 @@ class ConsultasLiga:
         Returns:
             dict: información del partido o None si no existe
         """
-        consulta = f"partido({partido_id}, Ronda, Fecha, Local, GL_HT, GL_FT, Visitante, GV_HT, GV_FT)."
-        resultados = self.motor.consultar(consulta)
-        return resultados[0] if resultados else None
+        partido = self._partido(partido_id)
+        return self._con_nombres(partido) if partido else None
+
+    def _partido(self, partido_id):
+        """El partido tal como está en los hechos (equipos por ID), o None."""
+        return self._primero_preparada('partido', ('?', 'Ronda', 'Fecha', 'Local', 'GL_HT', 'GL_FT', 'Visitante', 'GV_HT', 'GV_FT'), partido_id)
+
+    # Cantidad de partidos que se traen de Prolog por consulta al recorrer listados
+    TAMANIO_PAGINA = 100
+
+    def pagina_partidos(self, cursor=0, limite=TAMANIO_PAGINA, ronda=None, equipo=None, desde=None, hasta=None):
+        """
+        Devuelve una página de partidos ordenados por ID, con paginación por cursor: la página
+        siguiente empieza después del último ID devuelto, así no se saltean ni repiten partidos
+        aunque se agreguen otros entre una página y la siguiente.
+
+        Args:
+            cursor (int): ID del último partido ya recibido (0 = desde el principio)
+            limite (int): cantidad máxima de partidos de la página
+            ronda (string, opcional): nombre de la ronda (ej: 'regular season - 1')
+            equipo (int | string, opcional): partidos de ese equipo (ID, código o nombre), como local o visitante
+            desde / hasta (string, opcional): rango de fechas 'AAAA-MM-DD' (inclusive)
+
+        Returns:
+            tuple: (lista de partidos, cursor de la página siguiente o None si no hay más)
+        """
+        equipo_id = None
+        if equipo is not None:
+            equipo_id = self.id_equipo(equipo)
+            if equipo_id is None:
+                return [], None
+        # Los filtros que valen None quedan libres; la ronda, si no se fija, se devuelve como Ronda
+        argumentos = ('?', '?', '?', '?', '?', 'Id', '?Ronda', 'Fecha', 'Local', 'GL_HT', 'GL_FT', 'Visitante', 'GV_HT', 'GV_FT')
+        resultados = self._consultar_preparada('pagina_partidos', argumentos, cursor, limite, equipo_id, desde, hasta, ronda)
+        # Con la ronda fija no vuelve como variable: se completa para que todas las filas tengan los mismos campos
+        partidos = [
+            self._con_nombres({'Id': p['Id'], 'Ronda': p.get('Ronda', ronda),
+                               **{k: v for k, v in p.items() if k not in ('Id', 'Ronda')}})
+            for p in resultados
+        ]
+        siguiente = partidos[-1]['Id'] if len(partidos) == limite else None
+        return partidos, siguiente
+
+    def iterar_partidos(self, ronda=None, equipo=None, desde=None, hasta=None, cursor=0):
+        """
+        Generador que recorre los partidos (con los mismos filtros que `pagina_partidos`) de a una
+        página por vez: cada página se pide recién cuando se terminó de consumir la anterior, así el
+        motor no queda tomado entre páginas y la memoria no crece con la cantidad de partidos.
+        """
+        while cursor is not None:
+            partidos, cursor = self.pagina_partidos(cursor, self.TAMANIO_PAGINA, ronda, equipo, desde, hasta)
+            yield from partidos
 
     def resumen_equipo(self, equipo_nombre):
         """
         Devuelve un resumen completo de las estadísticas de un equipo retorna su informacion en formato lista 
-        (se recomienda pasar a formato JSON)
+        (se recomienda pasar a formato JSON).
+        Se sirve desde la cache materializada, sin consultar a Prolog.
         
         Args:
-            equipo_nombre (string): nombre del equipo
+            equipo_nombre (int | string): ID, código o nombre del equipo
             
         Returns:
-            dict: resumen completo del equipo
-        """
-        resumen = {
-            'equipo': equipo_nombre,
-            'partidos_jugados': self.partidos_jugados_por_equipo(equipo_nombre),
-            'victorias': self.victorias_equipo(equipo_nombre),
-            'empates': self.empates_equipo(equipo_nombre),
-            'derrotas': self.derrotas_equipo(equipo_nombre),
-            'goles_favor': self.goles_favor_equipo(equipo_nombre),
-            'goles_contra': self.goles_contra_equipo(equipo_nombre),
-            'diferencia_goles': self.diferencia_goles_equipo(equipo_nombre),
-            'puntos': self.puntos_equipo(equipo_nombre),
-            'remontadas_ganadas': self.remontadas_ganadas(equipo_nombre),
-            'vallas_invictas': self.vallas_invictas_equipo(equipo_nombre)
-        }
-        # Agregar logo si existe
-        resumen['logo'] = self.logo_map.get(equipo_nombre)
+            dict: resumen completo del equipo, o None si el equipo no se conoce
+        """
+        equipo_id = self.id_equipo(equipo_nombre)
+        if equipo_id is None:
+            return None
+        self._asegurar_cache()
+
+        resumen = self.cache.obtener(equipo_id)
+        if resumen is None:
+            # Todos los equipos con partidos están materializados: uno sin partidos tiene todo en 0
+            resumen = self._resumen_vacio(equipo_id)
+        return resumen
+
+    def resumenes_equipos(self, equipos=None):
+        """
+        Devuelve el resumen (mismo formato que `resumen_equipo`) de varios equipos a la vez,
+        servidos desde la cache materializada.
+
+        Args:
+            equipos (list, opcional): IDs, códigos o nombres de los equipos; por defecto, todos los que tienen partidos
+
+        Returns:
+            list: un resumen por equipo (None para los que no se conocen), en el orden pedido (o por nombre si se piden todos)
+        """
+        self._asegurar_cache()
+        if equipos is None:
+            equipos = sorted(self.cache.registros, key=self._nombre)
+        return [self.resumen_equipo(equipo) for equipo in equipos]
+
+    def _asegurar_cache(self):
+        """Materializa los resúmenes si se agregaron hechos o reglas desde la última materialización."""
+        if not self.cache.vigente(self.motor.version):
+            with self._lock_escritura:
+                # Mientras se esperaba el lock, una actualización u otro hilo pudo haberla dejado al día
+                if not self.cache.vigente(self.motor.version):
+                    self._materializar()
+
+    def materializar_estadisticas(self):
+        """
+        Calcula el resumen de todos los equipos y lo guarda en la cache, asociado a la
+        versión actual del motor. Todos los resúmenes (incluidas remontadas y vallas invictas)
+        salen de una sola consulta agregada, `fila_resumen`, que recorre los partidos una vez.
+        Se hace con el lock de escritura: si una actualización de partidos pudiera correr en el medio,
+        la cache tendría el partido nuevo y después se le sumaría otra vez su diferencia.
+        """
+        with self._lock_escritura:
+            self._materializar()
+
+    def _materializar(self):
+        """Cuerpo de `materializar_estadisticas` (con el lock de escritura ya tomado)."""
+        version = self.motor.version
+        argumentos = ('Equipo', 'PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DG', 'Puntos', 'Remontadas', 'Vallas')
+        registros = {}
+
+        for equipo_id, pj, pg, pe, pp, gf, gc, dg, puntos, remontadas, vallas in self._consultar_filas('fila_resumen', argumentos):
+            registros[equipo_id] = {
+                'equipo': self._nombre(equipo_id),
+                'equipo_id': equipo_id,
+                'partidos_jugados': pj,
+                'victorias': pg,
+                'empates': pe,
+                'derrotas': pp,
+                'goles_favor': gf,
+                'goles_contra': gc,
+                'diferencia_goles': dg,
+                'puntos': puntos,
+                'remontadas_ganadas': remontadas,
+                'vallas_invictas': vallas,
+                'logo': self.logo_map.get(equipo_id)
+            }
+
+        self.cache.cargar(registros, version)
+
+    def actualizar_partidos(self, partidos, logos=None):
+        """
+        Agrega o corrige partidos ya cargados (upsert por ID). Sólo se reemplazan los hechos
+        `partido/9` de esos partidos (en el motor y en todas las réplicas) y los resúmenes
+        materializados de los equipos involucrados se ajustan sumando la diferencia, sin recalcular
+        la temporada. Un partido que llega como no jugado (cancelado, postergado, sin resultado) se
+        quita si estaba cargado: se restan sus aportes y deja de contar en la tabla y en los cruces.
+
+        Args:
+            partidos (list): partidos normalizados (ver procesador.normalizar_partido)
+            logos (dict, opcional): id_equipo -> logo_url de equipos nuevos o con logo nuevo
+
+        Returns:
+            dict: cantidad de partidos insertados, actualizados, eliminados y descartados (no jugados que
+                no estaban cargados), y versión resultante del motor
+        """
+        with self._lock_escritura:
+            version_anterior = self.motor.version
+            cache_vigente = self.cache.vigente(version_anterior)
+            matriz = self._matriz if self._matriz is not None and self._matriz.version == version_anterior else None
+            # Pares (anterior, actual) de cada partido, para ajustar la matriz de enfrentamientos
+            cambios = []
+            deltas = defaultdict(lambda: defaultdict(int))
+            # Último estado conocido de cada partido del lote (por si un ID viene repetido; None si se quita),
+            # el estado que tenía en los hechos antes del lote y la última versión recibida
+            vistos = {}
+            originales = {}
+            ultimos = {}
+
+            for partido in partidos:
+                partido_id = partido['partido_id']
+                if partido_id not in originales:
+                    originales[partido_id] = self._partido(partido_id)
+                anterior = vistos[partido_id] if partido_id in vistos else originales[partido_id]
+                if anterior:
+                    anterior['Id'] = partido_id
+                    self._sumar_aportes(deltas, anterior['Local'], anterior['GL_HT'], anterior['GL_FT'],
+                                        anterior['Visitante'], anterior['GV_HT'], anterior['GV_FT'], -1)
+                actual = None
+                if partido['jugado']:
+                    actual = {
+                        'Id': partido_id, 'Ronda': partido['ronda'].lower(), 'Fecha': partido['fecha'].lower(),
+                        'Local': partido['local_id'], 'GL_HT': partido['entretiempo_local'], 'GL_FT': partido['total_local'],
+                        'Visitante': partido['visitante_id'], 'GV_HT': partido['entretiempo_visitante'], 'GV_FT': partido['total_visitante'],
+                    }
+                    self._sumar_aportes(deltas, actual['Local'], actual['GL_HT'], actual['GL_FT'],
+                                        actual['Visitante'], actual['GV_HT'], actual['GV_FT'], 1)
+                vistos[partido_id] = actual
+                ultimos[partido_id] = partido
+                if anterior or actual:
+                    cambios.append((anterior, actual))
+
+            # Al motor sólo va el estado final de cada ID: los jugados se reemplazan y los demás se quitan
+            jugados = [ultimos[partido_id] for partido_id, actual in vistos.items() if actual]
+            eliminados = [partido_id for partido_id, actual in vistos.items() if not actual and originales[partido_id]]
+            insertados = sum(1 for partido_id, actual in vistos.items() if actual and not originales[partido_id])
+
+            logos_nuevos = {
+                equipo: logo for equipo, logo in (logos or {}).items() if self.logo_map.get(equipo) != logo
+            }
+            # Los equipos que no estaban en el índice se agregan como hechos equipo/3 (sin código)
+            equipos_nuevos = {}
+            for partido in jugados:
+                for equipo_id, nombre in equipos_partido(partido).items():
+                    if equipo_id not in self.indice_equipos:
+                        equipos_nuevos[equipo_id] = (nombre, None)
+            if equipos_nuevos:
+                self._modificar('equipo', establecer_formato_equipos(equipos_nuevos))
+                for equipo_id, (nombre, codigo) in equipos_nuevos.items():
+                    self.indice_equipos.agregar(equipo_id, nombre.lower(), codigo)
+            if jugados:
+                self._modificar('partido', [formatear_partido(p) for p in jugados])
+            if eliminados:
+                self._eliminar('partido', eliminados)
+            if logos_nuevos:
+                self._modificar('logo_equipo', establecer_formato_logos(logos_nuevos), minusculas=False)
+                self.logo_map.update(logos_nuevos)
+
+            if cache_vigente:
+                logos_registros = {equipo: {'logo': logo} for equipo, logo in logos_nuevos.items()}
+                self.cache.aplicar(deltas, version_anterior, self.motor.version, self._resumen_vacio, logos_registros)
+            # La matriz se ajusta cruce por cruce; si aparece un equipo nuevo se rearma en el próximo uso
+            if matriz is not None and not matriz.aplicar(cambios, self.motor.version):
+                self._matriz = None
+
+            return {
+                'insertados': insertados,
+                'actualizados': len(jugados) - insertados,
+                'eliminados': len(eliminados),
+                'descartados': len(vistos) - len(jugados) - len(eliminados),
+                'version': self.motor.version,
+            }
+
+    def _modificar(self, tipo, hechos, minusculas=True):
+        """
+        Reemplaza hechos en todas las réplicas (si hay) y recién después en el motor principal. La versión
+        del motor, con la que se guardan las caches, cambia cuando todas las réplicas ya tienen el cambio:
+        ninguna respuesta con datos viejos puede quedar guardada como de la versión nueva.
+        """
+        if self.pool is not None:
+            self.pool.difundir(self.motor.modulo, 'actualizar_hechos', tipo, hechos, minusculas)
+        with self._lock:
+            self.motor.actualizar_hechos(tipo, hechos, minusculas)
+
+    def _eliminar(self, tipo, claves):
+        """Quita hechos por su clave, como `_modificar`: primero en las réplicas y después en el motor principal."""
+        if self.pool is not None:
+            self.pool.difundir(self.motor.modulo, 'eliminar_hechos', tipo, claves)
+        with self._lock:
+            self.motor.eliminar_hechos(tipo, claves)
+
+    def _sumar_aportes(self, deltas, local, gl_ht, gl_ft, visitante, gv_ht, gv_ft, signo):
+        """Suma (signo=1) o resta (signo=-1) lo que aporta un partido al resumen de cada equipo."""
+        for equipo, ht_f, gf, ht_c, gc in ((local, gl_ht, gl_ft, gv_ht, gv_ft), (visitante, gv_ht, gv_ft, gl_ht, gl_ft)):
+            aporte = {
+                'partidos_jugados': 1,
+                'victorias': int(gf > gc),
+                'empates': int(gf == gc),
+                'derrotas': int(gf < gc),
+                'goles_favor': gf,
+                'goles_contra': gc,
+                'diferencia_goles': gf - gc,
+                'puntos': 3 if gf > gc else 1 if gf == gc else 0,
+                'remontadas_ganadas': int(ht_f < ht_c and gf > gc),
+                'vallas_invictas': int(gc == 0),
+            }
+            for campo, valor in aporte.items():
+                deltas[equipo][campo] += signo * valor
+
+    def _resumen_vacio(self, equipo_id):
+        """Resumen de un equipo sin partidos cargados."""
+        resumen = {'equipo': self._nombre(equipo_id), 'equipo_id': equipo_id}
+        for clave in ('partidos_jugados', 'victorias', 'empates', 'derrotas', 'goles_favor',
+                      'goles_contra', 'diferencia_goles', 'puntos', 'remontadas_ganadas', 'vallas_invictas'):
+            resumen[clave] = 0
+        resumen['logo'] = self.logo_map.get(equipo_id)
         return resumen
+
+    def estado_cache(self):
+        """
+        Devuelve los contadores de la cache de resúmenes por equipo
+        
+        Returns:
+            dict: hits, misses, cargas, equipos materializados y versión
+        """
+        return self.cache.estadisticas()
         
         
     def formato_json(self, datos):
@@ -345,7 +885,7 @@ class ConsultasLiga:
         """
         
         print('\n[Consulta 1] Estadisticas de Tigre:')
-        resultado_tigre = self.tabla_equipo(self.motor, 'tigre')
+        resultado_tigre = self.tabla_equipo('tigre')
         if resultado_tigre:
             print(self.formato_json([resultado_tigre]))
         else:
@@ -354,9 +894,9 @@ class ConsultasLiga:
         # ------------- Otras consultas de ejemplo -------------
 
         print("\n[Consulta 2] Total de victorias locales:")
-        resultado_locales = self.motor.consultar("total_victorias_locales(N).")
+        resultado_locales = self._primero_preparada('total_victorias_locales', ('N',))
         if resultado_locales:
-            print(f"Hubo {resultado_locales[0]['N']} victorias locales.")
+            print(f"Hubo {resultado_locales['N']} victorias locales.")
             
         # -----------------------------------------------------
         lista_de_equipos = self.equipos_participantes()
@@ -373,4 +913,14 @@ class ConsultasLiga:
             for equipo in lista_de_equipos:
                 print(equipo)
         else:
-            print("No se pudieron encontrar equipos.")
\ No newline at end of file
+            print("No se pudieron encontrar equipos.")
+
+
+def _predicado_de(operacion, args):
+    """Predicado consultado y valores de una operación del motor, para etiquetar sus métricas."""
+    if operacion in ('consultar_preparada', 'primero_preparada', 'consultar_filas'):
+        return args[0], tuple(args[2]) if len(args) > 2 else ()
+    if operacion == 'listar_hechos':
+        return args[0], ()
+    # Consultas en texto: el nombre del primer objetivo ('tabla_equipo(tigre, ...)' -> 'tabla_equipo')
+    return str(args[0]).split('(', 1)[0].strip(), ()
@@ -0,0 +1,125 @@
+from bisect import bisect_right
+from collections import defaultdict
+from procesador import grupo_ronda, numero_ronda
+
+
+class _HistorialEquipo:
+    """
+    Partidos de un equipo y sus totales acumulados: todos por fecha, y los de rondas numeradas
+    (fase regular o de grupos) por número de ronda y por fecha.
+    """
+
+    def __init__(self, partidos):
+        # Por fecha (y a igual fecha, por ID del partido)
+        partidos.sort(key=lambda p: (p['Fecha'], p['Id']))
+        self.partidos = partidos
+        self.fechas = [p['Fecha'] for p in partidos]
+        self.acumulados = _prefijos(partidos)
+
+        # Por ronda, sólo los partidos de rondas numeradas (las de eliminación directa no cuentan)
+        numerados = [p for p in partidos if p['Numero'] is not None]
+        self.fechas_numeradas = [p['Fecha'] for p in numerados]
+        self.acumulados_numerados = _prefijos(numerados)
+        numerados = sorted(numerados, key=lambda p: (p['Numero'], p['Fecha'], p['Id']))
+        self.rondas = [p['Numero'] for p in numerados]
+        self.acumulados_ronda = _prefijos(numerados)
+
+    def hasta_fecha(self, fecha, solo_numeradas=False):
+        """Totales de los partidos jugados hasta `fecha` inclusive (None = todos); opcionalmente sólo los de rondas numeradas."""
+        fechas, acumulados = ((self.fechas_numeradas, self.acumulados_numerados) if solo_numeradas
+                              else (self.fechas, self.acumulados))
+        return acumulados[len(fechas) if fecha is None else bisect_right(fechas, fecha)]
+
+    def hasta_ronda(self, ronda):
+        """Totales de los partidos de las rondas 1 a `ronda`."""
+        return self.acumulados_ronda[bisect_right(self.rondas, ronda)]
+
+
+def _prefijos(partidos):
+    """Lista de n+1 tuplas (PJ, PG, PE, PP, GF, GC, Puntos): la i-ésima suma los primeros i partidos."""
+    acumulado = (0, 0, 0, 0, 0, 0, 0)
+    prefijos = [acumulado]
+    for p in partidos:
+        gf, gc = p['GF'], p['GC']
+        aporte = (1, int(gf > gc), int(gf == gc), int(gf < gc), gf, gc, 3 if gf > gc else 1 if gf == gc else 0)
+        acumulado = tuple(a + b for a, b in zip(acumulado, aporte))
+        prefijos.append(acumulado)
+    return prefijos
+
+
+class HistorialEquipos:
+    """
+    Índice de la temporada en el tiempo: para cada equipo, sus partidos ordenados por fecha con las
+    sumas acumuladas (prefijos) de partidos, resultados, goles y puntos después de cada uno. Así la
+    tabla "a la fecha K" o "al día X" es una búsqueda binaria por equipo, sin volver a recorrer los partidos.
+    Se arma con una sola consulta de `partido/9` y queda asociado a la versión del motor con la que se armó.
+    """
+
+    CAMPOS = ('PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'Puntos')
+
+    def __init__(self, partidos, version):
+        """
+        Args:
+            partidos (iterable): diccionarios Id, Ronda, Fecha, Local, GL_HT, GL_FT, Visitante, GV_HT, GV_FT (equipos por ID)
+            version (int): versión del motor con la que se consultaron los partidos
+        """
+        self.version = version
+        por_equipo = defaultdict(list)
+        # Fase o zona -> IDs de los equipos que jugaron en ella (ej: 'group a')
+        self.grupos = defaultdict(set)
+        for p in partidos:
+            numero = numero_ronda(p['Ronda'])
+            grupo = grupo_ronda(p['Ronda'])
+            if grupo is not None:
+                self.grupos[grupo].update((p['Local'], p['Visitante']))
+            for equipo, rival, gf, gc, local in ((p['Local'], p['Visitante'], p['GL_FT'], p['GV_FT'], True),
+                                                 (p['Visitante'], p['Local'], p['GV_FT'], p['GL_FT'], False)):
+                por_equipo[equipo].append({
+                    'Id': p['Id'], 'Ronda': p['Ronda'], 'Numero': numero, 'Fecha': p['Fecha'],
+                    'Rival': rival, 'Local': local, 'GF': gf, 'GC': gc,
+                })
+        self.equipos = {equipo: _HistorialEquipo(lista) for equipo, lista in por_equipo.items()}
+        # Última ronda numerada de la temporada (0 si no hay)
+        self.ultima_ronda = max((r for h in self.equipos.values() for r in h.rondas[-1:]), default=0)
+
+    def _fila(self, acumulado):
+        fila = dict(zip(self.CAMPOS, acumulado))
+        fila['DG'] = fila['GF'] - fila['GC']
+        return fila
+
+    def tabla(self, ronda=None, fecha=None, grupo=None):
+        """
+        Totales de cada equipo con al menos un partido hasta la ronda `ronda` (si se indica) o hasta
+        el día `fecha` ('AAAA-MM-DD', inclusive; None = toda la temporada). Con `grupo`, sólo los
+        equipos de esa fase o zona y sólo sus partidos de rondas numeradas.
+
+        Returns:
+            dict: id_equipo -> {PJ, PG, PE, PP, GF, GC, Puntos, DG}
+        """
+        tabla = {}
+        for equipo, historial in self.equipos.items():
+            if grupo is not None and equipo not in self.grupos.get(grupo, ()):
+                continue
+            if ronda is not None:
+                acumulado = historial.hasta_ronda(ronda)
+            else:
+                acumulado = historial.hasta_fecha(fecha, solo_numeradas=grupo is not None)
+            if acumulado[0]:
+                tabla[equipo] = self._fila(acumulado)
+        return tabla
+
+    def forma(self, equipo, n, fecha=None):
+        """Últimos `n` partidos del equipo hasta `fecha` (None = los últimos de la temporada), del más viejo al más nuevo."""
+        historial = self.equipos.get(equipo)
+        if historial is None:
+            return []
+        hasta = len(historial.partidos) if fecha is None else bisect_right(historial.fechas, fecha)
+        return historial.partidos[max(0, hasta - n):hasta]
+
+    def progresion(self, equipo):
+        """Totales acumulados del equipo después de cada partido, en orden de fecha."""
+        historial = self.equipos.get(equipo)
+        if historial is None:
+            return []
+        return [(partido, self._fila(acumulado))
+                for partido, acumulado in zip(historial.partidos, historial.acumulados[1:])]
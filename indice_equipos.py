@@ -0,0 +1,66 @@
+import threading
+import unicodedata
+
+# Marca de una variante que corresponde a más de un equipo (p.ej. dos equipos con el código 'MAR')
+_AMBIGUO = object()
+
+
+def normalizar_nombre(texto):
+    """Forma de comparación de un nombre: sin tildes, en minúsculas y con los espacios colapsados."""
+    descompuesto = unicodedata.normalize('NFKD', str(texto))
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_tildes.lower().split())
+
+
+class IndiceEquipos:
+    """
+    Índice nombre <-> ID de los equipos. Los hechos de Prolog identifican a cada equipo por el
+    ID entero de API-Football; este índice traduce lo que llega por la API (ID, código como 'BEL'
+    o el nombre con cualquier combinación de mayúsculas y tildes) a ese ID, y el ID al nombre.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id -> nombre y id -> código, tal como están en los hechos equipo/3
+        self.nombres = {}
+        self.codigos = {}
+        # Variante normalizada (nombre o código) -> id, o _AMBIGUO si corresponde a varios equipos
+        self._variantes = {}
+
+    def agregar(self, equipo_id, nombre, codigo=None):
+        """Registra (o actualiza) un equipo con su nombre y, si tiene, su código de tres letras."""
+        with self._lock:
+            self.nombres[equipo_id] = nombre
+            if codigo:
+                self.codigos[equipo_id] = codigo
+            for variante in (nombre, codigo):
+                if variante:
+                    clave = normalizar_nombre(variante)
+                    anterior = self._variantes.get(clave, equipo_id)
+                    self._variantes[clave] = equipo_id if anterior == equipo_id else _AMBIGUO
+
+    def buscar(self, equipo):
+        """
+        Devuelve el ID del equipo, o None si no se conoce o es ambiguo.
+
+        Args:
+            equipo (int | string): ID (también como texto), código o nombre del equipo
+        """
+        if isinstance(equipo, int) or str(equipo).isdecimal():
+            return int(equipo) if int(equipo) in self.nombres else None
+        equipo_id = self._variantes.get(normalizar_nombre(equipo))
+        return None if equipo_id is _AMBIGUO else equipo_id
+
+    def nombre(self, equipo_id):
+        """Nombre del equipo con ese ID (None si no está en el índice)."""
+        return self.nombres.get(equipo_id)
+
+    def codigo(self, equipo_id):
+        """Código del equipo con ese ID (None si no tiene)."""
+        return self.codigos.get(equipo_id)
+
+    def __contains__(self, equipo_id):
+        return equipo_id in self.nombres
+
+    def __len__(self):
+        return len(self.nombres)
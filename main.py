@@ -1,54 +1,183 @@
-import json
+import functools
+import os
+import time
 from setup import SetUp
-from motor_logico import MotorLogico
-from procesador import procesar_partidos, establecer_formato_partidos
+from pool_motores import PoolMotores
+from procesador import normalizar_partido, validar_partido, logos_partido
 from consultas import ConsultasLiga 
+from cache_http import CacheRespuestas
+from metricas import RegistroMetricas
+from serializacion import ProveedorJSON, a_json
 
 # Importamos CORS
 from flask_cors import CORS 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 
 # --- INICIALIZACIÓN DE FLASK ---
 app = Flask(__name__)
+# Las respuestas JSON se serializan con orjson si está instalado (ver serializacion.py)
+app.json = ProveedorJSON(app)
 # 🟢 SOLUCIÓN CORS: Habilitar CORS para permitir solicitudes desde cualquier origen (*)
 CORS(app)
 
-# Intentar inicializar el motor globalmente
-archivo = 'json/primera2021.json'
-setup = SetUp(archivo)
-consultas_liga = setup.obtener_acceso_consultas()
+# Temporadas disponibles: cada una se carga en su propio módulo de Prolog
+ARCHIVOS_TEMPORADAS = {
+    2021: 'json/primera2021.json',
+    2022: 'json/primera2022.json',
+    2023: 'json/primera2023.json',
+}
+# Temporada que se consulta cuando la URL no indica ?temporada=
+TEMPORADA_POR_DEFECTO = 2021
+# Cantidad de réplicas del motor lógico que atienden consultas en paralelo (por defecto, una por núcleo)
+REPLICAS = int(os.environ.get('REPLICAS_PROLOG', os.cpu_count() or 1))
+# Motor que resuelve las consultas: 'prolog' (SWI-Prolog) o 'columnar' (NumPy, sin Prolog ni réplicas)
+TIPO_MOTOR = os.environ.get('MOTOR_CONSULTAS', 'prolog')
+# Segundos que un cliente puede reutilizar una respuesta sin revalidarla (0 = revalida siempre, con 304 si no cambió)
+CACHE_MAX_AGE = int(os.environ.get('CACHE_MAX_AGE', 0))
+# Máximo de partidos por página en /api/partidos
+MAXIMO_PAGINA = 1000
+# Ronda más alta que se acepta en /api/tabla-posiciones?ronda=
+MAXIMO_RONDA = 1000
+
+# Consultas al motor que tarden al menos estos ms se registran como lentas (sin definir = no se registran)
+CONSULTA_LENTA_MS = float(os.environ['CONSULTA_LENTA_MS']) if os.environ.get('CONSULTA_LENTA_MS') else None
+# Archivo donde se agregan las consultas lentas, una línea JSON por consulta (sin definir = se imprimen)
+ARCHIVO_CONSULTAS_LENTAS = os.environ.get('ARCHIVO_CONSULTAS_LENTAS') or None
+
+# Respuestas ya serializadas de los endpoints de consulta, por ruta y argumentos
+cache_respuestas = CacheRespuestas(max_age=CACHE_MAX_AGE)
+# Costo de cada consulta al motor y de cada petición, expuesto en /metrics
+metricas = RegistroMetricas(umbral_lenta_ms=CONSULTA_LENTA_MS, archivo_lentas=ARCHIVO_CONSULTAS_LENTAS)
+
+# Intentar inicializar el motor globalmente.
+# Los procesos hijos que usa SetUp para leer temporadas en paralelo (multiprocessing con 'spawn')
+# reimportan este archivo como '__mp_main__': en ellos no hay que levantar el sistema
+consultas_por_temporada = {}
+if __name__ != '__mp_main__':
+    setup = SetUp(ARCHIVOS_TEMPORADAS, tipo_motor=TIPO_MOTOR)
+    # Las consultas se reparten entre réplicas del motor (procesos con su propio Prolog);
+    # con REPLICAS_PROLOG=0 se usa un único motor protegido por un lock
+    usar_replicas = TIPO_MOTOR == 'prolog' and REPLICAS and setup.motores
+    pool = PoolMotores(setup.archivos, cantidad=REPLICAS) if usar_replicas else None
+    consultas_por_temporada = setup.obtener_consultas_temporadas(pool, metricas)
 
 
 # ------------------------------------------------------
 #                    ENDPOINTS API
 # ------------------------------------------------------
 
-def verificar_motor():
-    """ Función auxiliar para chequear si el motor está listo. """
+def obtener_consultas():
+    """ 
+    Función auxiliar que chequea si el motor está listo y devuelve las consultas de la temporada
+    pedida con ?temporada= (o la temporada por defecto). Retorna (consultas, None) o (None, respuesta_error).
+    """
+    if not consultas_por_temporada:
+        return None, (jsonify({"error": "Error interno: El motor lógico no pudo inicializarse. Revise los archivos JSON."}), 500)
+    
+    temporada = request.args.get('temporada', str(TEMPORADA_POR_DEFECTO))
+    consultas_liga = consultas_por_temporada.get(int(temporada)) if temporada.isdecimal() else None
     if consultas_liga is None:
-        return jsonify({"error": "Error interno: El motor lógico no pudo inicializarse. Revise los archivos JSON."}), 500
-    return None
+        return None, (jsonify({"error": f"Temporada '{temporada}' no disponible.",
+                               "temporadas": sorted(consultas_por_temporada)}), 404)
+    return consultas_liga, None
+
+def con_cache(vista):
+    """
+    Decorador para endpoints de sólo lectura: guarda el JSON serializado de la respuesta y lo
+    reutiliza (con ETag y 304) mientras no cambie la versión de la base de la temporada pedida.
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        consultas_liga, error_response = obtener_consultas()
+        if error_response:
+            return error_response
+        # La versión del motor cambia cada vez que se cargan o modifican hechos
+        version = f"{consultas_liga.motor.modulo}.{consultas_liga.motor.version}"
+        return cache_respuestas.responder(version, lambda: vista(*args, **kwargs))
+    return envoltura
+
+@app.before_request
+def iniciar_medicion():
+    g.inicio_peticion = time.perf_counter()
+
+@app.after_request
+def registrar_peticion(respuesta):
+    """ Registra la duración de cada petición, por regla de ruta (no por URL) y código de estado. """
+    inicio = g.pop('inicio_peticion', None)
+    if inicio is not None:
+        ruta = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+        metricas.registrar_peticion(ruta, request.method, respuesta.status_code, time.perf_counter() - inicio)
+    return respuesta
+
+@app.route('/metrics', methods=['GET'])
+def get_metricas():
+    """ Retorna las métricas de consultas y peticiones en el formato de texto de Prometheus. """
+    return Response(metricas.formato_prometheus(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def inicio():
     """ Página de inicio simple para verificar que el API está corriendo. """
     return "API de Consultas de Liga con SWI-Prolog (pyswip) está funcionando."
 
+@app.route('/api/temporadas', methods=['GET'])
+def get_temporadas():
+    """ Retorna las temporadas cargadas y la que se usa por defecto. """
+    return jsonify({"temporadas": sorted(consultas_por_temporada), "por_defecto": TEMPORADA_POR_DEFECTO})
+
 @app.route('/api/tabla-posiciones', methods=['GET'])
+@con_cache
 def get_tabla_completa():
-    """ Retorna la tabla de posiciones completa. """
-    error_response = verificar_motor()
+    """
+    Retorna la tabla de posiciones completa, o al cierre de una ronda (?ronda=K) o de un día (?fecha=AAAA-MM-DD).
+    Con ?grupo=, la tabla de esa fase o zona (ej: ?grupo=Group A), combinable con ronda o fecha.
+    """
+    consultas_liga, error_response = obtener_consultas()
     if error_response:
         return error_response
+
+    grupo = request.args.get('grupo')
+    if grupo is not None and grupo.lower() not in consultas_liga.grupos():
+        return jsonify({"error": f"Grupo '{grupo}' no encontrado. Disponibles: {consultas_liga.grupos()}"}), 404
+
+    if 'ronda' in request.args:
+        ronda, error_response = parametro_entero('ronda', 1, 1, MAXIMO_RONDA)
+        if error_response:
+            return error_response
+        return jsonify(consultas_liga.tabla_hasta(ronda=ronda, grupo=grupo))
+    if 'fecha' in request.args:
+        return jsonify(consultas_liga.tabla_hasta(fecha=request.args['fecha'], grupo=grupo))
+    if grupo is not None:
+        return jsonify(consultas_liga.tabla_grupo(grupo))
     
     # Llama al método de la clase ConsultasLiga
     tabla = consultas_liga.tabla_completa()
     return jsonify(tabla)
 
+@app.route('/api/tabla-posiciones/evolucion', methods=['GET'])
+@con_cache
+def get_evolucion_posiciones():
+    """ Retorna la posición y los puntos de cada equipo al cierre de cada ronda (opcionalmente dentro de un ?grupo=). """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    return jsonify(consultas_liga.evolucion_posiciones(request.args.get('grupo')))
+
+@app.route('/api/tabla-posiciones/grupos', methods=['GET'])
+@con_cache
+def get_tablas_por_grupo():
+    """ Retorna la tabla de posiciones de cada fase o zona de la temporada (una por grupo). """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    return jsonify(consultas_liga.tablas_por_grupo())
+
 @app.route('/api/estadisticas-generales', methods=['GET'])
+@con_cache
 def get_estadisticas_generales():
     """ Retorna el resumen de victorias/empates. """
-    error_response = verificar_motor()
+    consultas_liga, error_response = obtener_consultas()
     if error_response:
         return error_response
     
@@ -56,28 +185,197 @@ def get_estadisticas_generales():
     return jsonify(stats)
 
 @app.route('/api/equipo/<string:nombre_equipo>', methods=['GET'])
+@con_cache
 def get_resumen_equipo(nombre_equipo):
-    """ Retorna el resumen completo de un equipo específico por su nombre. """
-    error_response = verificar_motor()
+    """ Retorna el resumen completo de un equipo específico por su ID, código o nombre (sin importar mayúsculas ni tildes). """
+    consultas_liga, error_response = obtener_consultas()
     if error_response:
         return error_response
     
-    # Nota: Los nombres de equipo deben pasarse en minúsculas en la URL si el Prolog usa minúsculas
-    equipo = nombre_equipo.lower()
-    
     # Se obtienen todos los datos en una sola consulta
-    resumen_datos = consultas_liga.resumen_equipo(equipo)
+    resumen_datos = consultas_liga.resumen_equipo(nombre_equipo)
     
     if not resumen_datos:
-         return jsonify({"error": f"Equipo '{equipo}' no encontrado o sin datos."}), 404
+         return jsonify({"error": f"Equipo '{nombre_equipo}' no encontrado o sin datos."}), 404
          
     # La consulta ya retorna los datos formateados
     return jsonify(resumen_datos)
 
+@app.route('/api/equipo/<string:nombre_equipo>/forma', methods=['GET'])
+@con_cache
+def get_forma_equipo(nombre_equipo):
+    """ Retorna los últimos partidos de un equipo y su racha (?n=5, y ?fecha=AAAA-MM-DD para verla a ese día). """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    n, error_response = parametro_entero('n', 5, 1, 100)
+    if error_response:
+        return error_response
+    forma = consultas_liga.forma_equipo(nombre_equipo, n, request.args.get('fecha'))
+    if forma is None:
+        return jsonify({"error": f"Equipo '{nombre_equipo}' no encontrado."}), 404
+    return jsonify(forma)
+
+@app.route('/api/equipo/<string:nombre_equipo>/progresion', methods=['GET'])
+@con_cache
+def get_progresion_equipo(nombre_equipo):
+    """ Retorna los puntos acumulados de un equipo después de cada partido. """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    progresion = consultas_liga.progresion_equipo(nombre_equipo)
+    if progresion is None:
+        return jsonify({"error": f"Equipo '{nombre_equipo}' no encontrado."}), 404
+    return jsonify(progresion)
+
+@app.route('/api/h2h/<string:equipo>/<string:rival>', methods=['GET'])
+@con_cache
+def get_enfrentamiento(equipo, rival):
+    """ Retorna los resultados de un equipo contra otro (desde el punto de vista del primero) y sus partidos. """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    enfrentamiento = consultas_liga.enfrentamiento(equipo, rival)
+    if enfrentamiento is None:
+        return jsonify({"error": f"Equipo '{equipo}' o '{rival}' no encontrado."}), 404
+    return jsonify(enfrentamiento)
+
+@app.route('/api/matriz', methods=['GET'])
+@con_cache
+def get_matriz_resultados():
+    """ Retorna la matriz de resultados equipo x equipo de la temporada. """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    return jsonify(consultas_liga.matriz_resultados())
+
+@app.route('/api/equipos', methods=['GET'])
+@con_cache
+def get_resumenes_equipos():
+    """ Retorna el resumen de varios equipos (?nombres=a,b,c, por ID, código o nombre) o de todos (sin nombres o ?nombres=all). """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    nombres = request.args.get('nombres', 'all')
+    equipos = None if nombres == 'all' else [n.strip() for n in nombres.split(',') if n.strip()]
+    return jsonify(consultas_liga.resumenes_equipos(equipos))
+
+@app.route('/api/cache-estadisticas', methods=['GET'])
+def get_estado_cache():
+    """ Retorna los contadores (hits/misses) de la cache de resúmenes por equipo. """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+    
+    estado = consultas_liga.estado_cache()
+    estado['respuestas_http'] = cache_respuestas.estadisticas()
+    return jsonify(estado)
+
+def filtros_partidos():
+    """ Lee los filtros de los listados de partidos (?ronda=&equipo=&desde=&hasta=). Los textos van en minúsculas; el equipo puede ser ID, código o nombre. """
+    filtros = {}
+    for parametro in ('ronda', 'equipo', 'desde', 'hasta'):
+        valor = request.args.get(parametro)
+        if valor:
+            filtros[parametro] = valor.lower()
+    return filtros
+
+def parametro_entero(nombre, por_defecto, minimo, maximo):
+    """ Lee un parámetro entero de la URL; retorna (valor, None) o (None, respuesta_error). """
+    valor = request.args.get(nombre, str(por_defecto))
+    if not valor.isdecimal() or not minimo <= int(valor) <= maximo:
+        return None, (jsonify({"error": f"El parámetro '{nombre}' debe ser un entero entre {minimo} y {maximo}."}), 400)
+    return int(valor), None
+
+@app.route('/api/partidos', methods=['GET'])
+@con_cache
+def get_partidos():
+    """ Retorna una página de partidos ordenados por ID (?cursor=&limite=, más los filtros de ronda, equipo y fechas). """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    cursor, error_response = parametro_entero('cursor', 0, 0, 2 ** 62)
+    if error_response:
+        return error_response
+    limite, error_response = parametro_entero('limite', ConsultasLiga.TAMANIO_PAGINA, 1, MAXIMO_PAGINA)
+    if error_response:
+        return error_response
+
+    partidos, siguiente = consultas_liga.pagina_partidos(cursor, limite, **filtros_partidos())
+    # 'siguiente' es el cursor para pedir la página que sigue (null si no hay más)
+    return jsonify({"partidos": partidos, "siguiente": siguiente})
+
+@app.route('/api/partidos/exportar', methods=['GET'])
+def get_partidos_exportar():
+    """ Exporta los partidos (con los mismos filtros) como NDJSON: una línea JSON por partido, enviadas a medida que se leen. """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    partidos = consultas_liga.iterar_partidos(**filtros_partidos())
+    lineas = (a_json(partido) + b'\n' for partido in partidos)
+    return Response(lineas, mimetype='application/x-ndjson')
+
+@app.route('/api/partidos/<int:partido_id>', methods=['GET'])
+@con_cache
+def get_partido(partido_id):
+    """ Retorna un partido por su ID. """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    partido = consultas_liga.buscar_partido_por_id(partido_id)
+    if partido is None:
+        return jsonify({"error": f"Partido {partido_id} no encontrado."}), 404
+    partido['Id'] = partido_id
+    return jsonify(partido)
+
+@app.route('/api/partidos', methods=['POST'])
+def post_partidos():
+    """
+    Agrega o corrige partidos de la temporada (upsert por ID del fixture). Acepta un partido con el
+    formato de API-Football, una lista de partidos o la respuesta completa ({"response": [...]}).
+    Un partido ya cargado que llega como no jugado (CANC, PST, ABD, sin resultado) se quita.
+    """
+    consultas_liga, error_response = obtener_consultas()
+    if error_response:
+        return error_response
+
+    datos = request.get_json(silent=True)
+    if isinstance(datos, dict):
+        crudos = datos['response'] if 'response' in datos else [datos]
+    else:
+        crudos = datos
+    if not isinstance(crudos, list) or not crudos or not all(isinstance(c, dict) for c in crudos):
+        return jsonify({"error": "Se esperaba un partido o una lista de partidos en formato API-Football (JSON)."}), 400
+
+    partidos = []
+    logos = {}
+    for crudo in crudos:
+        try:
+            partido = normalizar_partido(crudo)
+            # También los no jugados necesitan ID y equipos: con ellos se ubica el partido a quitar
+            validar_partido(partido)
+        except (AttributeError, ValueError) as e:
+            return jsonify({"error": f"Partido inválido: {e}"}), 400
+        partidos.append(partido)
+        if partido['jugado']:
+            logos.update(logos_partido(crudo))
+
+    # Los no jugados se quitan si estaban cargados (y se cuentan como descartados si no)
+    return jsonify(consultas_liga.actualizar_partidos(partidos, logos))
+
 @app.route('/api/vallas-invictas', methods=['GET'])
+@con_cache
 def get_equipos_valla_invicta():
     """ Retorna la lista de equipos con al menos una valla invicta. """
-    error_response = verificar_motor()
+    consultas_liga, error_response = obtener_consultas()
     if error_response:
         return error_response
     
@@ -86,7 +384,7 @@ def get_equipos_valla_invicta():
 
 
 if __name__ == "__main__":
-    if consultas_liga:
+    if consultas_por_temporada:
         print("✅ Motor lógico inicializado correctamente.")
         print("🚀 Iniciando servidor Flask en http://127.0.0.1:5000")
         # El host '0.0.0.0' es a veces necesario para el acceso externo en contenedores/entornos específicos
@@ -0,0 +1,93 @@
+import threading
+
+
+class MatrizEnfrentamientos:
+    """
+    Resultados de cada equipo contra cada otro, precalculados en una matriz densa equipo x equipo:
+    la celda [i][j] acumula los partidos del equipo i contra el equipo j vistos desde i (partidos,
+    ganados, empatados, perdidos, goles y goles al entretiempo). Consultar un cruce es leer una
+    celda, sin recorrer los partidos. Se arma con una sola consulta de `partido/9`, queda asociada
+    a la versión del motor y se ajusta partido por partido cuando se actualizan hechos (ver `aplicar`).
+    """
+
+    CAMPOS = ('PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'GF_HT', 'GC_HT')
+
+    def __init__(self, partidos, version):
+        """
+        Args:
+            partidos (list): diccionarios Id, Ronda, Fecha, Local, GL_HT, GL_FT, Visitante, GV_HT, GV_FT (equipos por ID)
+            version (int): versión del motor con la que se consultaron los partidos
+        """
+        self._lock = threading.Lock()
+        self.version = version
+        # IDs ordenados: la fila/columna de un equipo es su posición
+        self.equipos = sorted({p['Local'] for p in partidos} | {p['Visitante'] for p in partidos})
+        self.posiciones = {equipo: i for i, equipo in enumerate(self.equipos)}
+        n = len(self.equipos)
+        self.valores = [[[0] * len(self.CAMPOS) for _ in range(n)] for _ in range(n)]
+        # Partidos de cada cruce por ID; [i][j] y [j][i] comparten el mismo diccionario
+        self.partidos = [[None] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i, n):
+                self.partidos[i][j] = self.partidos[j][i] = {}
+        for partido in partidos:
+            self._sumar(partido, 1)
+
+    def _sumar(self, p, signo):
+        """Suma (signo=1) o resta (signo=-1) un partido en las dos celdas de su cruce."""
+        i, j = self.posiciones[p['Local']], self.posiciones[p['Visitante']]
+        for fila, columna, gf, gc, hf, hc in ((i, j, p['GL_FT'], p['GV_FT'], p['GL_HT'], p['GV_HT']),
+                                              (j, i, p['GV_FT'], p['GL_FT'], p['GV_HT'], p['GL_HT'])):
+            aporte = (1, int(gf > gc), int(gf == gc), int(gf < gc), gf, gc, hf, hc)
+            celda = self.valores[fila][columna]
+            for k, valor in enumerate(aporte):
+                celda[k] += signo * valor
+        if signo > 0:
+            self.partidos[i][j][p['Id']] = p
+        else:
+            self.partidos[i][j].pop(p['Id'], None)
+
+    def aplicar(self, cambios, version):
+        """
+        Reemplaza partidos ya contados, agrega nuevos o quita los eliminados ajustando sólo las celdas de sus cruces.
+
+        Args:
+            cambios (list): pares (anterior, actual) con el formato de los partidos; anterior es None si el partido
+                es nuevo y actual es None si se eliminó
+            version (int): versión del motor después del cambio
+
+        Returns:
+            bool: False si hay que rearmar la matriz (algún partido trae un equipo que no está en ella, o un equipo
+                se quedó sin partidos y ya no tiene que aparecer); True si se aplicó
+        """
+        with self._lock:
+            if any(p[e] not in self.posiciones for par in cambios for p in par if p for e in ('Local', 'Visitante')):
+                return False
+            for anterior, actual in cambios:
+                if anterior:
+                    self._sumar(anterior, -1)
+                if actual:
+                    self._sumar(actual, 1)
+            quitados = {anterior[e] for anterior, actual in cambios if anterior and not actual for e in ('Local', 'Visitante')}
+            if any(not any(celda[0] for celda in self.valores[self.posiciones[e]]) for e in quitados):
+                return False
+            self.version = version
+            return True
+
+    def celda(self, equipo, rival):
+        """
+        Resultados de `equipo` contra `rival` (IDs) y sus partidos ordenados por fecha,
+        o None si alguno no tiene partidos.
+        """
+        i, j = self.posiciones.get(equipo), self.posiciones.get(rival)
+        if i is None or j is None:
+            return None
+        with self._lock:
+            valores = dict(zip(self.CAMPOS, self.valores[i][j]))
+            partidos = sorted(self.partidos[i][j].values(), key=lambda p: (p['Fecha'], p['Id']))
+        return valores, partidos
+
+    def filas(self):
+        """Copia de la matriz completa: lista de filas, cada una con los valores (en el orden de CAMPOS) contra cada equipo."""
+        with self._lock:
+            return [[list(celda) for celda in fila] for fila in self.valores]
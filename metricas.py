@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# Límites (en segundos) de los buckets de los histogramas de duración
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Histograma:
+    """Conteo acumulado por bucket, suma y cantidad de observaciones (como un histograma de Prometheus)."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(BUCKETS):
+            if valor <= limite:
+                self.buckets[i] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+
+def _etiquetas(**etiquetas):
+    """Texto de las etiquetas de una serie: {a="x",b="y"}, con los valores escapados."""
+    partes = []
+    for nombre, valor in etiquetas.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nombre}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+class RegistroMetricas:
+    """
+    Métricas de las consultas al motor y de las peticiones a la API, acumuladas en memoria desde
+    que arrancó el proceso. Por predicado: cantidad de consultas, tiempo total (histograma), tiempo
+    esperando el lock o una réplica libre, inferencias de Prolog y soluciones devueltas. Por ruta:
+    duración de las peticiones y cantidad por código de estado. `formato_prometheus` las expone
+    en el formato de texto de Prometheus.
+
+    Opcionalmente registra las consultas lentas (las que superan `umbral_lenta_ms`): una línea JSON
+    por consulta en `archivo_lentas`, o por pantalla si no se indica archivo.
+    """
+
+    def __init__(self, umbral_lenta_ms=None, archivo_lentas=None):
+        """
+        Args:
+            umbral_lenta_ms (float, opcional): duración a partir de la cual una consulta se registra como lenta (None = no se registran)
+            archivo_lentas (string, opcional): archivo donde se agregan las consultas lentas (JSON por línea)
+        """
+        self._lock = threading.Lock()
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self.archivo_lentas = archivo_lentas
+        self.inicio = time.time()
+        # predicado -> totales de sus consultas
+        self._consultas = defaultdict(lambda: {'duracion': _Histograma(), 'espera': 0.0, 'inferencias': 0, 'soluciones': 0})
+        self._lentas = 0
+        # (ruta, método) -> histograma de duración; (ruta, método, estado) -> cantidad
+        self._peticiones = defaultdict(_Histograma)
+        self._estados = defaultdict(int)
+
+    def registrar_consulta(self, predicado, duracion, espera, inferencias, soluciones, valores=()):
+        """
+        Args:
+            predicado (string): predicado consultado (p.ej. 'fila_posiciones')
+            duracion (float): segundos desde que se pidió la consulta hasta tener el resultado, espera incluida
+            espera (float): segundos esperando el lock del motor o una réplica libre
+            inferencias (int | None): inferencias de Prolog de la consulta (None si el motor no las informa)
+            soluciones (int): cantidad de soluciones devueltas
+            valores (tuple): parámetros de la consulta, sólo para el registro de consultas lentas
+        """
+        with self._lock:
+            totales = self._consultas[predicado]
+            totales['duracion'].observar(duracion)
+            totales['espera'] += espera
+            totales['inferencias'] += inferencias or 0
+            totales['soluciones'] += soluciones
+            lenta = self.umbral_lenta_ms is not None and duracion * 1000 >= self.umbral_lenta_ms
+            if lenta:
+                self._lentas += 1
+        if lenta:
+            self._registrar_lenta(predicado, duracion, espera, inferencias, soluciones, valores)
+
+    def _registrar_lenta(self, predicado, duracion, espera, inferencias, soluciones, valores):
+        registro = {
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'predicado': predicado,
+            'ms': round(duracion * 1000, 3),
+            'espera_ms': round(espera * 1000, 3),
+            'inferencias': inferencias,
+            'soluciones': soluciones,
+            'valores': [v if isinstance(v, (int, str)) or v is None else str(v) for v in valores],
+        }
+        if self.archivo_lentas is None:
+            print(f"Consulta lenta: {predicado} {registro['ms']} ms (espera {registro['espera_ms']} ms, "
+                  f"{inferencias} inferencias, {soluciones} soluciones) valores={registro['valores']}")
+            return
+        linea = json.dumps(registro, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.archivo_lentas, 'a', encoding='utf-8') as f:
+                f.write(linea)
+
+    def registrar_peticion(self, ruta, metodo, estado, duracion):
+        """
+        Args:
+            ruta (string): regla de la ruta (p.ej. '/api/equipo/<string:nombre_equipo>'), no la URL, para no abrir una serie por equipo
+            metodo (string): método HTTP
+            estado (int): código de estado de la respuesta
+            duracion (float): segundos que tardó la petición
+        """
+        with self._lock:
+            self._peticiones[(ruta, metodo)].observar(duracion)
+            self._estados[(ruta, metodo, estado)] += 1
+
+    def formato_prometheus(self):
+        """Todas las métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        lineas = []
+
+        def histograma(nombre, serie, h):
+            for limite, cantidad in zip(BUCKETS, h.buckets):
+                lineas.append(f'{nombre}_bucket{_etiquetas(**serie, le=limite)} {cantidad}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(**serie, le="+Inf")} {h.cantidad}')
+            lineas.append(f'{nombre}_sum{_etiquetas(**serie)} {h.suma}')
+            lineas.append(f'{nombre}_count{_etiquetas(**serie)} {h.cantidad}')
+
+        with self._lock:
+            consultas = sorted(self._consultas.items())
+            peticiones = sorted(self._peticiones.items())
+            estados = sorted(self._estados.items())
+            lentas = self._lentas
+
+            lineas.append('# HELP liga_consulta_segundos Duración de las consultas al motor, espera incluida.')
+            lineas.append('# TYPE liga_consulta_segundos histogram')
+            for predicado, totales in consultas:
+                histograma('liga_consulta_segundos', {'predicado': predicado}, totales['duracion'])
+
+            for clave, descripcion in (
+                ('espera', 'Segundos esperando el lock del motor o una réplica libre.'),
+                ('inferencias', 'Inferencias de Prolog (statistics/2).'),
+                ('soluciones', 'Soluciones devueltas.'),
+            ):
+                nombre = 'liga_consulta_espera_segundos_total' if clave == 'espera' else f'liga_consulta_{clave}_total'
+                lineas.append(f'# HELP {nombre} {descripcion}')
+                lineas.append(f'# TYPE {nombre} counter')
+                for predicado, totales in consultas:
+                    lineas.append(f"{nombre}{_etiquetas(predicado=predicado)} {totales[clave]}")
+
+            lineas.append('# HELP liga_consultas_lentas_total Consultas que superaron el umbral de consulta lenta.')
+            lineas.append('# TYPE liga_consultas_lentas_total counter')
+            lineas.append(f'liga_consultas_lentas_total {lentas}')
+
+            lineas.append('# HELP liga_peticion_segundos Duración de las peticiones HTTP por ruta.')
+            lineas.append('# TYPE liga_peticion_segundos histogram')
+            for (ruta, metodo), h in peticiones:
+                histograma('liga_peticion_segundos', {'ruta': ruta, 'metodo': metodo}, h)
+
+            lineas.append('# HELP liga_peticiones_total Peticiones HTTP por ruta y código de estado.')
+            lineas.append('# TYPE liga_peticiones_total counter')
+            for (ruta, metodo, estado), cantidad in estados:
+                lineas.append(f'liga_peticiones_total{_etiquetas(ruta=ruta, metodo=metodo, estado=estado)} {cantidad}')
+
+        lineas.append('# HELP liga_inicio_segundos Momento (epoch) en que arrancó el proceso.')
+        lineas.append('# TYPE liga_inicio_segundos gauge')
+        lineas.append(f'liga_inicio_segundos {self.inicio}')
+        return '\n'.join(lineas) + '\n'
@@ -0,0 +1,561 @@
+import itertools
+import re
+import numpy as np
+from procesador import grupo_ronda
+
+
+class MotorColumnar:
+    """
+    Alternativa a MotorLogico que no usa Prolog: guarda los partidos como columnas de NumPy
+    (equipos por su ID, codificados como posiciones, goles de entretiempo y finales, ronda y fecha) y resuelve
+    con agrupaciones vectorizadas las mismas consultas que hace ConsultasLiga.
+
+    `consultar` recibe el mismo texto de consulta que MotorLogico y devuelve el mismo formato
+    (lista de diccionarios Variable -> valor), así ConsultasLiga funciona igual con cualquiera de
+    los dos motores. Sólo entiende los predicados de REGLAS.json que usan las consultas (ver PREDICADOS).
+    """
+
+    def __init__(self, modulo=None):
+        self.modulo = modulo
+        # Misma semántica que MotorLogico.version: aumenta cada vez que cambian los datos
+        self.version = 0
+        # IDs de los equipos con partidos, ordenados: el código de un equipo en las columnas es su índice
+        self.equipos = []
+        # ID de equipo -> código (posición en `self.equipos`), para no buscar en la lista
+        self.codigos = {}
+        # Hechos equipo/3: id -> (nombre, código), en minúsculas como los átomos de Prolog
+        self.datos_equipos = {}
+        self.logos = {}
+        self.columnas = {}
+        # ID de partido -> posición en las columnas (se arma en la primera actualización)
+        self._posiciones = None
+        # Arreglos propios (con lugar de sobra) de los que las columnas son vistas, una vez que se
+        # actualizó algún partido; None mientras las columnas sean las de la carga (p.ej. de sólo lectura sobre un almacen)
+        self._buffers = None
+        # Relaciones ya calculadas para la versión actual: nombre/aridad -> lista de tuplas
+        self._relaciones = {}
+        self._version_relaciones = None
+
+    def cargar_partidos(self, partidos, logos=None, equipos=None):
+        """
+        Carga los partidos normalizados (ver procesador.iterar_partidos) como columnas.
+
+        Args:
+            partidos (iterable): diccionarios con el formato de `normalizar_partido`
+            logos (dict, opcional): id_equipo -> logo_url
+            equipos (dict, opcional): id_equipo -> (nombre, código), como los hechos equipo/3
+        """
+        # Los textos se guardan en minúsculas, igual que MotorLogico.generar_hechos
+        filas = {
+            p['partido_id']: (str(p['ronda']).lower(), str(p['fecha']).lower(), p['local_id'],
+                              p['entretiempo_local'], p['total_local'], p['visitante_id'],
+                              p['entretiempo_visitante'], p['total_visitante'])
+            for p in partidos
+        }
+        if logos is not None:
+            self.logos = dict(logos)
+        if equipos is not None:
+            self.datos_equipos = {
+                equipo_id: (str(nombre).lower(), str(codigo or '').lower())
+                for equipo_id, (nombre, codigo) in equipos.items()
+            }
+        self._construir_columnas(filas)
+        print(f'Cargados {len(filas)} partidos en columnas ({len(self.equipos)} equipos)\n')
+
+    def cargar_almacen(self, almacen, equipos=None):
+        """
+        Carga los partidos de un AlmacenPartidos (ver almacen_partidos.py). Las columnas numéricas
+        (ID y goles) son vistas de sólo lectura sobre el archivo mapeado en memoria, sin copia;
+        sólo se arman las columnas chicas de equipos (posiciones), rondas y fechas.
+
+        Args:
+            almacen (AlmacenPartidos): partidos de la temporada
+            equipos (dict, opcional): id_equipo -> (nombre, código), como los hechos equipo/3
+        """
+        self.logos = dict(almacen.logos)
+        if equipos is not None:
+            self.datos_equipos = {
+                equipo_id: (str(nombre).lower(), str(codigo or '').lower())
+                for equipo_id, (nombre, codigo) in equipos.items()
+            }
+        locales = np.frombuffer(almacen.columna('local'), dtype=np.int32)
+        visitantes = np.frombuffer(almacen.columna('visitante'), dtype=np.int32)
+        ids_equipos = np.union1d(locales, visitantes)
+        self.equipos = ids_equipos.tolist()
+        self.codigos = {equipo: i for i, equipo in enumerate(self.equipos)}
+        rondas = np.array([str(r).lower() for r in almacen.rondas], dtype=object)
+        fechas = np.array([str(f).lower() for f in almacen.fechas], dtype=object)
+
+        self.columnas = {
+            'id': np.frombuffer(almacen.columna('id'), dtype=np.int64),
+            'ronda': rondas[np.frombuffer(almacen.columna('ronda'), dtype=np.int32)],
+            'fecha': fechas[np.frombuffer(almacen.columna('fecha'), dtype=np.int32)],
+            'local': np.searchsorted(ids_equipos, locales),
+            'visitante': np.searchsorted(ids_equipos, visitantes),
+        }
+        for columna in ('entretiempo_local', 'total_local', 'entretiempo_visitante', 'total_visitante'):
+            self.columnas[columna] = np.frombuffer(almacen.columna(columna), dtype=np.int16)
+        self.columnas['grupo'] = np.array([grupo_ronda(ronda) for ronda in self.columnas['ronda']], dtype=object)
+        self._posiciones = None
+        self._buffers = None
+        self.version += 1
+        print(f'Cargados {len(almacen)} partidos desde {almacen.ruta} ({len(self.equipos)} equipos)\n')
+
+    def _construir_columnas(self, filas_por_id):
+        """Arma las columnas de NumPy a partir de las filas id -> (ronda, fecha, local, ...), en ese orden."""
+        ids = list(filas_por_id)
+        filas = list(filas_por_id.values())
+        self.equipos = sorted({f[2] for f in filas} | {f[5] for f in filas})
+        self.codigos = codigos = {equipo: i for i, equipo in enumerate(self.equipos)}
+
+        self.columnas = {'id': np.array(ids, dtype=np.int64)}
+        for posicion, columna in enumerate(self.COLUMNAS_PARTIDO[1:]):
+            valores = [f[posicion] for f in filas]
+            if columna in ('ronda', 'fecha'):
+                self.columnas[columna] = np.array(valores, dtype=object)
+            elif columna in ('local', 'visitante'):
+                self.columnas[columna] = np.array([codigos[e] for e in valores], dtype=np.int64)
+            else:
+                self.columnas[columna] = np.array(valores, dtype=np.int64)
+        # Fase o zona de cada partido (None en las rondas de eliminación directa), como partido_grupo/2
+        self.columnas['grupo'] = np.array([grupo_ronda(ronda) for ronda in self.columnas['ronda']], dtype=object)
+        self._posiciones = None
+        self._buffers = None
+        self.version += 1
+
+    def actualizar_hechos(self, tipo, lista_objetos, minusculas=True):
+        """
+        Equivalente a MotorLogico.actualizar_hechos para 'partido', 'logo_equipo' y 'equipo': recibe los hechos
+        con el mismo formato (átomos entre comillas). Cada partido se escribe en su fila de las columnas
+        (o en una fila nueva al final si el ID no estaba), sin rearmar las demás. A diferencia de
+        retract + assertz, un partido corregido conserva su lugar en el orden de las soluciones.
+
+        Returns:
+            int: cantidad de hechos actualizados
+        """
+        if tipo not in ('partido', 'logo_equipo', 'equipo'):
+            raise ValueError(f"Hechos no soportados por el motor columnar: {tipo}")
+        cantidad = 0
+        for obj in lista_objetos:
+            valores = obj.values() if isinstance(obj, dict) else obj
+            _, args = _parsear(f"{tipo}({', '.join(str(v) for v in valores)})")
+            if minusculas:
+                args = [a.lower() if isinstance(a, str) else a for a in args]
+            if tipo == 'logo_equipo':
+                self.logos[args[0]] = args[1]
+            elif tipo == 'equipo':
+                self.datos_equipos[args[0]] = tuple(args[1:])
+            else:
+                self._escribir_partido(args)
+            cantidad += 1
+        self.version += 1
+        return cantidad
+
+    def _escribir_partido(self, args):
+        """Escribe los valores de un hecho partido/9 en la fila de su ID (agregándola si no existe)."""
+        if self._posiciones is None:
+            self._posiciones = {partido_id: i for i, partido_id in enumerate(self.columnas['id'].tolist())}
+        partido_id = args[0]
+        posicion = self._posiciones.get(partido_id)
+        if posicion is None:
+            posicion = self._posiciones[partido_id] = self._agregar_fila()
+        elif self._buffers is None:
+            self._preparar_buffers(len(self.columnas['id']))
+        for equipo in (args[3], args[6]):
+            # Un equipo nuevo toma el código siguiente; `self.equipos` deja de estar ordenado
+            if equipo not in self.codigos:
+                self.codigos[equipo] = len(self.equipos)
+                self.equipos.append(equipo)
+        valores = dict(zip(self.COLUMNAS_PARTIDO, args))
+        valores['local'] = self.codigos[valores['local']]
+        valores['visitante'] = self.codigos[valores['visitante']]
+        valores['grupo'] = grupo_ronda(valores['ronda'])
+        for columna, valor in valores.items():
+            self.columnas[columna][posicion] = valor
+
+    def eliminar_hechos(self, tipo, claves):
+        """
+        Equivalente a MotorLogico.eliminar_hechos para 'partido': quita la fila de cada ID y corre las
+        siguientes un lugar, así los demás partidos conservan su orden (como con retract).
+
+        Returns:
+            int: cantidad de claves procesadas
+        """
+        if tipo != 'partido':
+            raise ValueError(f"Hechos no soportados por el motor columnar: {tipo}")
+        for partido_id in claves:
+            if self._posiciones is None:
+                self._posiciones = {partido_id: i for i, partido_id in enumerate(self.columnas['id'].tolist())}
+            posicion = self._posiciones.get(partido_id)
+            if posicion is None:
+                continue
+            cantidad = len(self.columnas['id'])
+            if self._buffers is None:
+                self._preparar_buffers(cantidad)
+            for buffer in self._buffers.values():
+                buffer[posicion:cantidad - 1] = buffer[posicion + 1:cantidad]
+            self.columnas = {nombre: buffer[:cantidad - 1] for nombre, buffer in self._buffers.items()}
+            # Las filas siguientes cambiaron de posición: el índice se rearma en el próximo uso
+            self._posiciones = None
+        self.version += 1
+        return len(claves)
+
+    def _preparar_buffers(self, capacidad):
+        """Copia las columnas a arreglos propios y escribibles de `capacidad` filas; las columnas pasan a ser vistas sobre ellos."""
+        cantidad = len(self.columnas['id'])
+        buffers = {}
+        for nombre, valores in self.columnas.items():
+            buffers[nombre] = np.empty(capacidad, dtype=valores.dtype)
+            buffers[nombre][:cantidad] = valores
+        self._buffers = buffers
+        self.columnas = {nombre: buffer[:cantidad] for nombre, buffer in buffers.items()}
+
+    def _agregar_fila(self):
+        """
+        Agrega una fila al final de las columnas y devuelve su posición. Los arreglos duplican su
+        capacidad cuando se llenan, así agregar partidos de a uno no copia las columnas cada vez.
+        """
+        cantidad = len(self.columnas['id'])
+        if self._buffers is None or cantidad == len(self._buffers['id']):
+            self._preparar_buffers(max(16, 2 * cantidad))
+        self.columnas = {nombre: buffer[:cantidad + 1] for nombre, buffer in self._buffers.items()}
+        return cantidad
+
+    # ------------------------------------------------------
+    #                 AGRUPACIONES POR EQUIPO
+    # ------------------------------------------------------
+
+    def _totales_equipos(self, mascara=None):
+        """Columnas de la tabla por equipo (en el orden de `self.equipos`), con todos los partidos o sólo los de la máscara."""
+        c = self.columnas if mascara is None else {columna: valores[mascara] for columna, valores in self.columnas.items()}
+        gl, gv = c['total_local'], c['total_visitante']
+        hl, hv = c['entretiempo_local'], c['entretiempo_visitante']
+        unos = np.ones(len(gl))
+        n = len(self.equipos)
+
+        def por_equipo(valores_local, valores_visitante):
+            # Suma por equipo un valor de cada partido visto desde el local y desde el visitante
+            return (np.bincount(c['local'], weights=valores_local, minlength=n)
+                    + np.bincount(c['visitante'], weights=valores_visitante, minlength=n)).astype(np.int64)
+
+        totales = {
+            'PJ': por_equipo(unos, unos),
+            'PG': por_equipo(gl > gv, gv > gl),
+            'PE': por_equipo(gl == gv, gl == gv),
+            'PP': por_equipo(gl < gv, gv < gl),
+            'GF': por_equipo(gl, gv),
+            'GC': por_equipo(gv, gl),
+            'vallas': por_equipo(gv == 0, gl == 0),
+            'remontadas': por_equipo((hl < hv) & (gl > gv), (hv < hl) & (gv > gl)),
+        }
+        totales['DG'] = totales['GF'] - totales['GC']
+        totales['Puntos'] = totales['PG'] * 3 + totales['PE']
+        return {clave: columna.tolist() for clave, columna in totales.items()}
+
+    def _calcular_relaciones(self):
+        """Arma todas las relaciones (salvo partido/9, que se filtra sobre las columnas) de una vez."""
+        t = self._totales_equipos()
+        c = self.columnas
+        gl, gv = c['total_local'], c['total_visitante']
+        # (ID, código) por ID: después de actualizar partidos los códigos nuevos van al final de `self.equipos`
+        orden = sorted((e, i) for i, e in enumerate(self.equipos))
+        # Sólo los equipos con partidos (uno puede quedarse sin partidos al corregir otro)
+        activos = [(e, i) for e, i in orden if t['PJ'][i]]
+        equipos = [e for e, _ in activos]
+
+        def por_equipo(*claves):
+            return [(e, *(t[k][i] for k in claves)) for e, i in orden]
+
+        tabla = [(e, t['PJ'][i], t['PG'][i], t['PE'][i], t['PP'][i], t['GF'][i], t['GC'][i], t['DG'][i], t['Puntos'][i])
+                 for e, i in activos]
+
+        # Una tabla por fase o zona, sólo con sus partidos y sus equipos (los que jugaron en ella)
+        grupos = sorted({g for g in c['grupo'].tolist() if g is not None})
+        filas_grupo = []
+        for grupo in grupos:
+            mascara = c['grupo'] == grupo
+            tg = self._totales_equipos(mascara)
+            filas_grupo.extend(
+                (grupo, e, tg['PJ'][i], tg['PG'][i], tg['PE'][i], tg['PP'][i], tg['GF'][i], tg['GC'][i], tg['DG'][i], tg['Puntos'][i])
+                for e, i in activos if tg['PJ'][i]
+            )
+        return {
+            'tabla_equipo/9': tabla,
+            'fila_posiciones/9': tabla,
+            'fila_resumen/11': [fila + (t['remontadas'][i], t['vallas'][i]) for fila, (_, i) in zip(tabla, activos)],
+            'grupos/1': [(grupos,)] if grupos else [],
+            'fila_grupo/10': filas_grupo,
+            'partidos_jugados/2': por_equipo('PJ'),
+            'total_ganados/2': por_equipo('PG'),
+            'total_empatados/2': por_equipo('PE'),
+            'total_perdidos/2': por_equipo('PP'),
+            'total_gf/2': por_equipo('GF'),
+            'total_gc/2': por_equipo('GC'),
+            'diferencia_goles/2': por_equipo('DG'),
+            'total_puntos/2': por_equipo('Puntos'),
+            'total_vallas_invictas/2': por_equipo('vallas'),
+            'total_remontadas_ganadas/2': por_equipo('remontadas'),
+            'partido_jugado/1': [(e,) for e in equipos],
+            # setof falla si no hay equipos
+            'equipos_participantes/1': [(list(equipos),)] if equipos else [],
+            'total_victorias_locales/1': [(int(np.count_nonzero(gl > gv)),)],
+            'total_victorias_visitantes/1': [(int(np.count_nonzero(gl < gv)),)],
+            'total_empates/1': [(int(np.count_nonzero(gl == gv)),)],
+            'logo_equipo/2': list(self.logos.items()),
+            'equipo/3': [(equipo_id, *datos) for equipo_id, datos in self.datos_equipos.items()],
+        }
+
+    def _relacion(self, indicador):
+        if self._version_relaciones != self.version:
+            self._relaciones = self._calcular_relaciones()
+            self._version_relaciones = self.version
+        return self._relaciones[indicador]
+
+    # Conteos por equipo: en Prolog son findall + length, así que un equipo sin partidos da 0 (no falla)
+    CONTEOS_POR_EQUIPO = {
+        'partidos_jugados/2', 'total_ganados/2', 'total_empatados/2', 'total_perdidos/2', 'total_gf/2',
+        'total_gc/2', 'diferencia_goles/2', 'total_puntos/2', 'total_vallas_invictas/2', 'total_remontadas_ganadas/2',
+    }
+
+    # ------------------------------------------------------
+    #                       CONSULTAS
+    # ------------------------------------------------------
+
+    def _tuplas(self, nombre, args):
+        """Tuplas candidatas de la relación `nombre/len(args)` para los argumentos dados."""
+        indicador = f'{nombre}/{len(args)}'
+        if indicador == 'partido/9':
+            return self._partidos(args)
+        if indicador == 'pagina_partidos/14':
+            return self._pagina_partidos(args)
+        if indicador == 'valla_invicta/1':
+            return self._partidos_por_equipo(args[0], lambda gf, gc, hf, hc: gc == 0)
+        if indicador == 'remontada_ganada/1':
+            return self._partidos_por_equipo(args[0], lambda gf, gc, hf, hc: (hf < hc) & (gf > gc))
+        if indicador not in self.PREDICADOS:
+            raise ValueError(f"Predicado no soportado por el motor columnar: {indicador}")
+
+        tuplas = self._relacion(indicador)
+        equipo = args[0]
+        if indicador in self.CONTEOS_POR_EQUIPO and not isinstance(equipo, _Variable) and equipo not in self.codigos:
+            return [(equipo, 0)]
+        return tuplas
+
+    def _mascara_partidos(self, args):
+        """Máscara de los partidos que coinciden con los argumentos ya instanciados de partido/9."""
+        c = self.columnas
+        mascara = np.ones(len(c['id']), dtype=bool)
+        for columna, arg in zip(self.COLUMNAS_PARTIDO, args):
+            if isinstance(arg, _Variable):
+                continue
+            if columna in ('local', 'visitante'):
+                if arg not in self.codigos:
+                    return mascara & False
+                arg = self.codigos[arg]
+            mascara &= c[columna] == arg
+        return mascara
+
+    def _filas_partidos(self, indices):
+        """Tuplas partido/9 de las posiciones indicadas, en ese orden."""
+        c = self.columnas
+        columnas = [c[columna][indices].tolist() for columna in self.COLUMNAS_PARTIDO]
+        for posicion in (3, 6):
+            columnas[posicion] = [self.equipos[codigo] for codigo in columnas[posicion]]
+        return list(zip(*columnas))
+
+    def _partidos(self, args):
+        """Filtra partido/9 con máscaras sobre las columnas para los argumentos ya instanciados."""
+        return self._filas_partidos(np.flatnonzero(self._mascara_partidos(args)))
+
+    def _pagina_partidos(self, args):
+        """pagina_partidos/14: hasta `Tamanio` partidos con ID mayor a `Cursor`, ordenados por ID."""
+        cursor, tamanio, equipo, desde, hasta = args[:5]
+        c = self.columnas
+        mascara = self._mascara_partidos(args[5:]) & (c['id'] > cursor)
+        if not isinstance(equipo, _Variable):
+            codigo = self.codigos.get(equipo, -1)
+            mascara &= (c['local'] == codigo) | (c['visitante'] == codigo)
+        if isinstance(desde, str):
+            mascara &= c['fecha'] >= desde
+        if isinstance(hasta, str):
+            mascara &= c['fecha'] <= hasta
+
+        indices = np.flatnonzero(mascara)
+        indices = indices[np.argsort(c['id'][indices], kind='stable')][:tamanio]
+        filtros = tuple(a if not isinstance(a, _Variable) else None for a in args[:5])
+        return [filtros + fila for fila in self._filas_partidos(indices)]
+
+    def _partidos_por_equipo(self, equipo, condicion):
+        """Una tupla (equipo,) por cada partido del equipo que cumple `condicion(gf, gc, ht_f, ht_c)`."""
+        c = self.columnas
+        gl, gv = c['total_local'], c['total_visitante']
+        hl, hv = c['entretiempo_local'], c['entretiempo_visitante']
+        locales = c['local'][condicion(gl, gv, hl, hv)]
+        visitantes = c['visitante'][condicion(gv, gl, hv, hl)]
+        tuplas = [(self.equipos[i],) for i in np.concatenate([locales, visitantes]).tolist()]
+        if not isinstance(equipo, _Variable):
+            tuplas = [t for t in tuplas if t[0] == equipo]
+        return tuplas
+
+    def _soluciones(self, objetivo):
+        """Lista de sustituciones {variable: valor} que satisfacen el objetivo."""
+        return list(self._generar_soluciones(objetivo))
+
+    def _generar_soluciones(self, objetivo):
+        """Generador de sustituciones {variable: valor}: cada una se arma recién cuando se pide."""
+        nombre, args = objetivo
+        if nombre == 'setof' and len(args) == 3:
+            plantilla, interno, resultado = args
+            valores = sorted({s[plantilla.nombre] for s in self._generar_soluciones(interno)})
+            if valores and isinstance(resultado, _Variable):
+                yield {resultado.nombre: valores}
+            return
+
+        for tupla in self._tuplas(nombre, args):
+            sustitucion = {}
+            for arg, valor in zip(args, tupla):
+                if isinstance(arg, _Variable):
+                    if arg.anonima:
+                        continue
+                    if sustitucion.setdefault(arg.nombre, valor) != valor:
+                        break
+                elif arg != valor:
+                    break
+            else:
+                yield sustitucion
+
+    def consultar(self, consulta):
+        """
+        Mismo contrato que MotorLogico.consultar: devuelve una lista con un diccionario por solución,
+        con los valores de las variables con nombre (las que empiezan con '_' no se devuelven).
+        """
+        return list(self.iterar(consulta))
+
+    def iterar(self, consulta, limite=None):
+        """
+        Equivalente a MotorLogico.iterar: generador que arma cada solución recién cuando se pide
+        y no sigue después del límite (las relaciones en sí ya están calculadas).
+        """
+        soluciones = self._generar_soluciones(_parsear(consulta))
+        for s in itertools.islice(soluciones, limite):
+            yield {v: s[v] for v in s if not v.startswith('_')}
+
+    def limitar(self, consulta, n):
+        """Equivalente a MotorLogico.limitar."""
+        return list(self.iterar(consulta, n))
+
+    def primero(self, consulta):
+        """Equivalente a MotorLogico.primero."""
+        soluciones = self.limitar(consulta, 1)
+        return soluciones[0] if soluciones else None
+
+    def existe(self, consulta):
+        """Equivalente a MotorLogico.existe."""
+        return bool(self.limitar(consulta, 1))
+
+    def _preparado(self, argumentos, valores):
+        """Argumentos de un objetivo preparado: los parámetros con valor quedan fijos y el resto son variables."""
+        valores = iter(valores)
+        args = []
+        for argumento in argumentos:
+            if argumento.startswith('?'):
+                valor = next(valores)
+                args.append(_Variable(argumento[1:] or '_') if valor is None else valor)
+            else:
+                args.append(_Variable(argumento))
+        return args
+
+    def consultar_preparada(self, predicado, argumentos, valores=(), limite=None):
+        """Equivalente a MotorLogico.consultar_preparada: arma el objetivo directamente, sin texto que parsear."""
+        args = self._preparado(argumentos, valores)
+        soluciones = [{v: s[v] for v in s if not v.startswith('_')} for s in self._soluciones((predicado, args))]
+        return soluciones if limite is None else soluciones[:limite]
+
+    def consultar_filas(self, predicado, argumentos, valores=(), limite=None):
+        """Equivalente a MotorLogico.consultar_filas: una tupla por solución, con las salidas en el orden de los argumentos."""
+        args = self._preparado(argumentos, valores)
+        salidas = [a.nombre for a in args if isinstance(a, _Variable) and not a.nombre.startswith('_')]
+        filas = [tuple(s[v] for v in salidas) for s in self._soluciones((predicado, args))]
+        return filas if limite is None else filas[:limite]
+
+    def primero_preparada(self, predicado, argumentos, valores=()):
+        """Equivalente a MotorLogico.primero_preparada."""
+        soluciones = self.consultar_preparada(predicado, argumentos, valores, limite=1)
+        return soluciones[0] if soluciones else None
+
+    def medir(self, operacion, *args):
+        """Equivalente a MotorLogico.medir; sin Prolog no hay inferencias que contar (None)."""
+        return getattr(self, operacion)(*args), None
+
+    def listar_hechos(self, tipo, aridad, limite=None):
+        """Equivalente a MotorLogico.listar_hechos: un diccionario {X1: valor1, X2: valor2, ...} por hecho."""
+        variables = ", ".join(f"X{i}" for i in range(1, aridad + 1))
+        return list(self.iterar(f"{tipo}({variables})", limite))
+
+    COLUMNAS_PARTIDO = ('id', 'ronda', 'fecha', 'local', 'entretiempo_local', 'total_local',
+                        'visitante', 'entretiempo_visitante', 'total_visitante')
+
+    PREDICADOS = {
+        'tabla_equipo/9', 'fila_posiciones/9', 'fila_resumen/11', 'grupos/1', 'fila_grupo/10', 'partido_jugado/1', 'equipos_participantes/1', 'logo_equipo/2', 'equipo/3',
+        'total_victorias_locales/1', 'total_victorias_visitantes/1', 'total_empates/1',
+    } | CONTEOS_POR_EQUIPO
+
+
+# ------------------------------------------------------
+#          PARSEO DE CONSULTAS (SUBCONJUNTO DE PROLOG)
+# ------------------------------------------------------
+
+class _Variable:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.anonima = nombre == '_'
+
+
+_TOKEN = re.compile(r"\s*(?:(?P<citado>'(?:[^'\\]|\\.|'')*')|(?P<numero>-?\d+)"
+                    r"|(?P<variable>[A-Z_]\w*)|(?P<atomo>[a-z]\w*)|(?P<simbolo>[(),]))")
+
+
+def _tokens(consulta):
+    consulta = consulta.strip().rstrip('.')
+    pos = 0
+    while pos < len(consulta):
+        m = _TOKEN.match(consulta, pos)
+        if not m:
+            raise ValueError(f"No se puede interpretar la consulta: {consulta}")
+        pos = m.end()
+        yield m.lastgroup, m.group(m.lastgroup)
+
+
+def _parsear(consulta):
+    """Convierte 'nombre(arg, ...)' en (nombre, [args]); los argumentos pueden ser átomos, enteros, variables o términos."""
+    tokens = list(_tokens(consulta))
+    pos = 0
+
+    def termino():
+        nonlocal pos
+        tipo, texto = tokens[pos]
+        pos += 1
+        if tipo == 'numero':
+            return int(texto)
+        if tipo == 'variable':
+            return _Variable(texto)
+        if tipo == 'citado':
+            texto = re.sub(r"\\(.)", r"\1", texto[1:-1].replace("''", "'"))
+        elif tipo != 'atomo':
+            raise ValueError(f"No se puede interpretar la consulta: {consulta}")
+        if pos < len(tokens) and tokens[pos] == ('simbolo', '('):
+            pos += 1
+            args = [termino()]
+            while tokens[pos] == ('simbolo', ','):
+                pos += 1
+                args.append(termino())
+            if tokens[pos] != ('simbolo', ')'):
+                raise ValueError(f"No se puede interpretar la consulta: {consulta}")
+            pos += 1
+            return texto, args
+        return texto
+
+    objetivo = termino()
+    if pos != len(tokens) or not isinstance(objetivo, tuple):
+        raise ValueError(f"No se puede interpretar la consulta: {consulta}")
+    return objetivo
@@ -1,4 +1,125 @@
+import contextlib
+import os
+from ctypes import byref, c_char_p, c_long
 from pyswip import Prolog
+from pyswip.core import (
+    PL_ATOM, PL_INTEGER, CVT_ATOM, REP_UTF8, PL_Q_NODEBUG, PL_Q_CATCH_EXCEPTION, PL_open_foreign_frame, PL_discard_foreign_frame,
+    PL_term_type, PL_get_chars, PL_get_long, PL_new_term_refs, PL_put_variable, PL_put_integer, PL_put_chars, PL_new_atom, PL_new_module, PL_pred,
+    PL_open_query, PL_next_solution, PL_cut_query, PL_exception,
+)
+from pyswip.easy import Functor, getTerm
+from pyswip.prolog import NestedQueryError, PrologError, normalize_values
+
+
+def _valor(termino):
+    """
+    Valor Python de un término de salida, igual que `normalize_values(getTerm(termino))`.
+    Los átomos y enteros (casi todo lo que devuelven las consultas) se leen directamente con
+    la API en C, sin crear objetos Atom de pyswip (que además registran y liberan el átomo en Prolog).
+    """
+    tipo = PL_term_type(termino)
+    if tipo == PL_ATOM:
+        texto = c_char_p()
+        if PL_get_chars(termino, byref(texto), CVT_ATOM | REP_UTF8):
+            return texto.value.decode('utf-8')
+    elif tipo == PL_INTEGER:
+        entero = c_long()
+        if PL_get_long(termino, byref(entero)):
+            return entero.value
+    # Listas, términos compuestos, enteros que no entran en un long, etc.
+    return normalize_values(getTerm(termino))
+
+
+class ConsultaPreparada:
+    """
+    Consulta a un predicado que se resuelve una sola vez (functor y procedimiento dentro del módulo)
+    y después se ejecuta cuantas veces haga falta pasando sólo los valores de los parámetros.
+    No se arma ni se parsea texto Prolog en cada llamada, y los valores se cargan directamente como
+    átomos o enteros: un nombre con comillas no puede romper la consulta ni inyectar objetivos.
+    """
+
+    def __init__(self, modulo, predicado, argumentos):
+        """
+        Args:
+            modulo (string): módulo de Prolog donde está definido el predicado (None = 'user')
+            predicado (string): nombre del predicado, p.ej. 'tabla_equipo'
+            argumentos (tuple): uno por argumento del predicado:
+                '?' parámetro, '?Nombre' parámetro que si vale None queda libre y se devuelve como Nombre,
+                '_' variable anónima, cualquier otro texto es una variable de salida con ese nombre
+        """
+        self.predicado = predicado
+        self.argumentos = tuple(argumentos)
+        self.parametros = sum(1 for a in self.argumentos if a.startswith('?'))
+        self._modulo = PL_new_module(PL_new_atom(modulo.encode('utf-8'))) if modulo else None
+        self._procedimiento = PL_pred(Functor(predicado, len(self.argumentos)).handle, self._modulo)
+
+    def iterar(self, *valores, limite=None):
+        """
+        Generador de soluciones (diccionarios variable -> valor, igual que MotorLogico.consultar).
+        Como MotorLogico.iterar: al cerrarlo o al llegar al límite se cierra la consulta en Prolog.
+
+        Args:
+            valores: un valor (str = átomo, int, o None) por cada parámetro, en orden
+            limite (int, opcional): cantidad máxima de soluciones
+        """
+        with contextlib.closing(self._resolver(valores, limite)) as soluciones:
+            for salidas in soluciones:
+                yield {nombre: _valor(termino) for nombre, termino in salidas}
+
+    def filas(self, *valores, limite=None):
+        """
+        Igual que `iterar`, pero cada solución es una tupla con los valores de las variables de
+        salida en el orden de los argumentos: no se arma un diccionario por solución.
+        """
+        with contextlib.closing(self._resolver(valores, limite)) as soluciones:
+            for salidas in soluciones:
+                yield tuple(_valor(termino) for _, termino in salidas)
+
+    def _resolver(self, valores, limite):
+        """
+        Abre la consulta con esos valores y, por cada solución, entrega la lista (nombre, término)
+        de las variables de salida; quien la recorre lee los valores antes de pedir la siguiente.
+        """
+        if len(valores) != self.parametros:
+            raise TypeError(f"{self.predicado} espera {self.parametros} parámetros, se pasaron {len(valores)}")
+        if Prolog._queryIsOpen:
+            raise NestedQueryError("The last query was not closed")
+        Prolog._init_prolog_thread()
+
+        marco = PL_open_foreign_frame()
+        terminos = PL_new_term_refs(len(self.argumentos))
+        salidas = []
+        valores = iter(valores)
+        for posicion, argumento in enumerate(self.argumentos):
+            termino = terminos + posicion
+            valor = next(valores) if argumento.startswith('?') else None
+            nombre = argumento[1:] if argumento.startswith('?') else argumento
+            if valor is None:
+                PL_put_variable(termino)
+                if nombre and not nombre.startswith('_'):
+                    salidas.append((nombre, termino))
+            elif isinstance(valor, int) and not isinstance(valor, bool):
+                PL_put_integer(termino, valor)
+            elif isinstance(valor, str):
+                PL_put_chars(termino, PL_ATOM | REP_UTF8, -1, valor.encode('utf-8'))
+            else:
+                PL_discard_foreign_frame(marco)
+                raise TypeError(f"Tipo de parámetro no soportado en {self.predicado}: {type(valor).__name__}")
+
+        consulta = PL_open_query(self._modulo, PL_Q_NODEBUG | PL_Q_CATCH_EXCEPTION, self._procedimiento, terminos)
+        Prolog._queryIsOpen = True
+        try:
+            restantes = -1 if limite is None else limite
+            while restantes and PL_next_solution(consulta):
+                restantes -= 1
+                yield salidas
+            excepcion = PL_exception(consulta)
+            if excepcion:
+                raise PrologError(f"Caused by: '{self.predicado}/{len(self.argumentos)}'. Returned: '{getTerm(excepcion)}'.")
+        finally:
+            PL_cut_query(consulta)
+            PL_discard_foreign_frame(marco)
+            Prolog._queryIsOpen = False
 
 
 class MotorLogico:
@@ -7,33 +128,128 @@ class MotorLogico:
     """
     
     
-    def __init__(self, comentarios=True):
+    def __init__(self, comentarios=True, modulo=None):
         # Este método se ejecuta automáticamente al crear el objeto
         self.prolog = Prolog()
         self.comentarios = comentarios
+        # Módulo de Prolog donde viven los hechos y reglas de este motor (None = módulo 'user').
+        # pyswip comparte una sola base entre todas las instancias: los módulos la particionan (p.ej. por temporada)
+        self.modulo = modulo
+        # Versión de la base de conocimiento: aumenta cada vez que se agregan hechos o reglas,
+        # así las capas que materializan resultados (p.ej. ConsultasLiga) saben cuándo invalidarlos
+        self.version = 0
+        # Archivo fuente abierto mientras se arma un snapshot (ver iniciar_snapshot)
+        self._fuente_snapshot = None
+        self._ruta_snapshot = None
+        # Consultas preparadas ya resueltas: (predicado, argumentos) -> ConsultaPreparada
+        self._preparadas = {}
+        # Inferencias que cuesta medir una consulta (ver `medir`); se calcula en la primera medición
+        self._costo_medicion = None
         #Se inicializa el motor Prolog, el cual permite llemar a MotorLogico.prolog.funcion() para ejecutar el prolog del popio objeto
 
-    def generar_hechos(self, tipo, lista_objetos):
+    # Cantidad de hechos que se agregan por cada llamada a Prolog en la carga masiva
+    TAMANIO_LOTE = 500
+
+    def generar_hechos(self, tipo, lista_objetos, masivo=True, minusculas=True):
         """
-        Genera "tipo" de hechos Prolog a partir de una lista de diccionarios.
+        Genera "tipo" de hechos Prolog a partir de una lista (o cualquier iterable) de diccionarios.
         tipo: nombre del predicado (por ej. 'persona' o 'curso')
-        lista_objetos: lista de diccionarios con atributos
+        lista_objetos: lista de diccionarios con atributos (o de tuplas con los valores en orden)
+        masivo: si es True los hechos se agregan por lotes, con una sola consulta a Prolog por lote,
+                en lugar de un assertz (y un parseo) por cada hecho. La base resultante es la misma.
+        minusculas: si es False los valores se cargan tal cual (p.ej. URLs)
         """
         print('Cargando hechos...')
         
+        cantidad = 0
+        aridad = 0
+        lote = []
         for obj in lista_objetos:
-            argumentos = ",".join(str(v).lower() for v in obj.values())
-            #Se genera una cadena de argumentos que esté separados por comas, convirtiendo cada valor a minúsculas
-            
-            hecho = f"{tipo}({argumentos})"
+            hecho = f"{tipo}({self._argumentos(obj, minusculas)})"
             #Se crea el hecho en formato Prolog, con el tipo y los argumentos
             
-            self.prolog.assertz(hecho)
-            #Se agrega el hecho al motor Prolog del propio objeto
+            if self._fuente_snapshot is not None:
+                self._escribir_snapshot(hecho)
+            elif masivo:
+                lote.append(hecho)
+                if len(lote) == self.TAMANIO_LOTE:
+                    self._agregar_lote(lote)
+                    lote = []
+            else:
+                self.prolog.assertz(self._en_modulo(hecho))
+                #Se agrega el hecho al motor Prolog del propio objeto
             if self.comentarios is True:
                 print(f"[✔] Hecho cargado: {hecho}")
+            cantidad += 1
+            aridad = len(obj)
+        
+        if lote:
+            self._agregar_lote(lote)
             
-        print(f'Cargados {len(lista_objetos)} hechos de tipo "{tipo}/{len(obj.keys())}"\n\n')
+        self.version += 1
+        print(f'Cargados {cantidad} hechos de tipo "{tipo}/{aridad}"\n\n')
+
+    def _argumentos(self, obj, minusculas=True):
+        """Arma la cadena de argumentos de un hecho (separados por comas) a partir de un diccionario o tupla."""
+        valores = obj.values() if isinstance(obj, dict) else obj
+        #Se genera una cadena de argumentos que esté separados por comas, convirtiendo cada valor a minúsculas
+        return ",".join(str(v).lower() if minusculas else str(v) for v in valores)
+
+    def actualizar_hechos(self, tipo, lista_objetos, minusculas=True):
+        """
+        Agrega o reemplaza hechos de "tipo" ya cargados, con una sola consulta a Prolog.
+        Cada hecho se pasa a la regla `actualizar_<tipo>` (definida en REGLAS.json), que retira
+        la versión anterior y mantiene los hechos derivados (p.ej. los índices juega/7).
+
+        Args:
+            tipo (string): nombre del predicado (p.ej. 'partido')
+            lista_objetos: diccionarios (o tuplas) con el mismo formato que en generar_hechos
+            minusculas (bool): si es False los valores se cargan tal cual
+
+        Returns:
+            int: cantidad de hechos actualizados
+        """
+        objetivos = [f"actualizar_{tipo}({self._argumentos(obj, minusculas)})" for obj in lista_objetos]
+        if not objetivos:
+            return 0
+        list(self.prolog.query(self._en_modulo(", ".join(objetivos))))
+        self.version += 1
+        return len(objetivos)
+
+    def eliminar_hechos(self, tipo, claves):
+        """
+        Quita hechos de "tipo" por su clave (el primer argumento, un entero), con una sola consulta.
+        Cada clave se pasa a la regla `eliminar_<tipo>` (definida en REGLAS.json), que también retira
+        los hechos derivados. Una clave que no está cargada no cambia nada.
+
+        Args:
+            tipo (string): nombre del predicado (p.ej. 'partido')
+            claves (list): claves enteras de los hechos a quitar (p.ej. IDs de partidos)
+
+        Returns:
+            int: cantidad de claves procesadas
+        """
+        objetivos = [f"eliminar_{tipo}({int(clave)})" for clave in claves]
+        if not objetivos:
+            return 0
+        list(self.prolog.query(self._en_modulo(", ".join(objetivos))))
+        self.version += 1
+        return len(objetivos)
+
+    def _agregar_lote(self, hechos):
+        """Agrega una lista de hechos (strings en formato Prolog) con una única consulta.
+
+        Args:
+            hechos (list): hechos ya formateados, por ej. ["persona(ana, 30)", ...]
+        """
+        lista = ",".join(hechos)
+        destino = f"{self.modulo}:Hecho" if self.modulo else "Hecho"
+        list(self.prolog.query(f"forall(member(Hecho, [{lista}]), assertz({destino}))"))
+
+    def _en_modulo(self, objetivo):
+        """Califica un objetivo o cláusula con el módulo del motor (sin punto final)."""
+        objetivo = objetivo.strip().rstrip('.')
+        return f"{self.modulo}:({objetivo})" if self.modulo else objetivo
 
 
     def agregar_regla(self, regla):
@@ -43,7 +259,90 @@ class MotorLogico:
         Args:
             regla (_type_): un string con la regla en formato Prolog
         """
-        self.prolog.assertz(regla)
+        if self._fuente_snapshot is not None:
+            self._escribir_snapshot(regla)
+        else:
+            self.prolog.assertz(self._en_modulo(regla))
+        self.version += 1
+
+    def ejecutar_directiva(self, directiva):
+        """Ejecuta una directiva (lo que va después de ':- ' en un archivo Prolog).
+        Ejemplo: "dynamic(partido/9)"
+
+        Args:
+            directiva (string): la directiva sin ':- ' ni punto final
+        """
+        if self._fuente_snapshot is not None:
+            self._escribir_snapshot(f":- {directiva}")
+        else:
+            list(self.prolog.query(self._en_modulo(directiva)))
+
+    def ejecutar_inicializacion(self, objetivo):
+        """Ejecuta un objetivo que prepara la base una vez cargados hechos y reglas
+        (p.ej. derivar hechos índice). En un snapshot queda como `:- initialization(...)`,
+        así se vuelve a ejecutar cada vez que se carga el .qlf.
+
+        Args:
+            objetivo (string): el objetivo Prolog sin punto final
+        """
+        if self._fuente_snapshot is not None:
+            self._escribir_snapshot(f":- initialization({objetivo})")
+        else:
+            list(self.prolog.query(self._en_modulo(objetivo)))
+
+    def iniciar_snapshot(self, ruta):
+        """A partir de esta llamada las directivas, hechos y reglas no se agregan uno por uno a Prolog:
+        se escriben en un archivo fuente que `guardar_snapshot` compila a `ruta` (.qlf) y carga de una vez.
+
+        Args:
+            ruta (string): ruta del archivo .qlf a generar
+        """
+        self._ruta_snapshot = ruta
+        # Archivo temporal propio del proceso, para que varios procesos no se pisen al generarlo
+        fuente = f"{os.path.splitext(ruta)[0]}_{os.getpid()}.pl"
+        self._fuente_snapshot = open(fuente, 'w', encoding='utf-8')
+        if self.modulo:
+            # El snapshot es un archivo de módulo: al cargarlo todo queda dentro del módulo del motor
+            self._escribir_snapshot(f":- module({self.modulo}, [])")
+
+    def _escribir_snapshot(self, clausula):
+        self._fuente_snapshot.write(f"{clausula}.\n")
+
+    def guardar_snapshot(self):
+        """Compila el archivo fuente armado desde `iniciar_snapshot`, lo carga en Prolog y deja
+        el .qlf resultante en la ruta indicada. Si la compilación falla, igual se carga el fuente.
+        """
+        fuente = self._fuente_snapshot.name
+        self._fuente_snapshot.close()
+        self._fuente_snapshot = None
+        
+        try:
+            # qcompile carga el archivo y además genera <fuente>.qlf
+            list(self.prolog.query(f"qcompile('{fuente}')"))
+            os.replace(f"{os.path.splitext(fuente)[0]}.qlf", self._ruta_snapshot)
+            print(f'Snapshot guardado en {self._ruta_snapshot}')
+        except Exception as e:
+            print(f"Aviso: no se pudo compilar el snapshot '{self._ruta_snapshot}': {e}")
+            list(self.prolog.query(f"consult('{fuente}')"))
+        finally:
+            os.remove(fuente)
+        self.version += 1
+
+    def descartar_snapshot(self):
+        """Abandona el snapshot en curso sin cargar nada de lo escrito."""
+        fuente = self._fuente_snapshot.name
+        self._fuente_snapshot.close()
+        self._fuente_snapshot = None
+        os.remove(fuente)
+
+    def cargar_snapshot(self, ruta):
+        """Carga una base de conocimiento precompilada (.qlf) generada con `guardar_snapshot`.
+
+        Args:
+            ruta (string): ruta del archivo .qlf
+        """
+        list(self.prolog.query(f"load_files('{ruta}', [])"))
+        self.version += 1
 
 
     def consultar(self, consulta):
@@ -55,10 +354,76 @@ class MotorLogico:
         Returns:
             List: lista de hechos que cumplen la consulta 
         """
-        return list(self.prolog.query(consulta))
+        return list(self.prolog.query(self._en_modulo(consulta)))
+
+    def iterar(self, consulta, limite=None):
+        """Igual que `consultar`, pero devuelve un generador: cada solución se pide a Prolog recién
+        cuando se necesita. Al cerrarlo (o al dejar de referenciarlo) se cierra la consulta en Prolog,
+        sin calcular las soluciones que faltan. Mientras está abierto no se puede hacer otra consulta.
+
+        Args:
+            consulta (string): la consulta en formato Prolog
+            limite (int, opcional): cantidad máxima de soluciones
+        """
+        yield from self.prolog.query(self._en_modulo(consulta), maxresult=-1 if limite is None else limite)
+
+    def limitar(self, consulta, n):
+        """Devuelve una lista con, como mucho, las primeras `n` soluciones (no se buscan más)."""
+        return list(self.iterar(consulta, n))
+
+    def primero(self, consulta):
+        """Devuelve la primera solución (diccionario de variables), o None si no hay ninguna."""
+        soluciones = self.limitar(consulta, 1)
+        return soluciones[0] if soluciones else None
+
+    def existe(self, consulta):
+        """Indica si la consulta tiene al menos una solución, sin buscar las demás."""
+        return bool(self.limitar(consulta, 1))
+
+
+    def preparar(self, predicado, *argumentos):
+        """Devuelve la ConsultaPreparada de `predicado` con esos argumentos (se resuelve sólo la primera vez).
+        Ejemplo: motor.preparar('total_ganados', '?', 'PG').iterar('tigre')
+        """
+        clave = (predicado, argumentos)
+        consulta = self._preparadas.get(clave)
+        if consulta is None:
+            consulta = self._preparadas[clave] = ConsultaPreparada(self.modulo, predicado, argumentos)
+        return consulta
+
+    def consultar_preparada(self, predicado, argumentos, valores=(), limite=None):
+        """Todas las soluciones (o hasta `limite`) de una consulta preparada (ver `preparar`)."""
+        return list(self.preparar(predicado, *argumentos).iterar(*valores, limite=limite))
+
+    def primero_preparada(self, predicado, argumentos, valores=()):
+        """Primera solución de una consulta preparada, o None."""
+        soluciones = self.consultar_preparada(predicado, argumentos, valores, limite=1)
+        return soluciones[0] if soluciones else None
+
+    def consultar_filas(self, predicado, argumentos, valores=(), limite=None):
+        """
+        Como `consultar_preparada`, pero cada solución es una tupla con los valores de salida en el
+        orden de los argumentos (ver ConsultaPreparada.filas), más barata de armar y de enviar desde una réplica.
+        """
+        return list(self.preparar(predicado, *argumentos).filas(*valores, limite=limite))
 
+    def _inferencias(self):
+        """Inferencias hechas por este hilo de Prolog hasta ahora (statistics/2)."""
+        return self.primero_preparada('statistics', ('?', 'Inferencias'), ('inferences',))['Inferencias']
 
-    def listar_hechos(self, tipo, aridad):
+    def medir(self, operacion, *args):
+        """
+        Ejecuta una operación de consulta (p.ej. 'consultar_preparada') y devuelve (resultado, inferencias),
+        donde inferencias es lo que Prolog trabajó para resolverla, sin contar la medición en sí.
+        """
+        if self._costo_medicion is None:
+            # Inferencias que suma una medición vacía (las dos llamadas a statistics/2)
+            self._costo_medicion = -self._inferencias() + self._inferencias()
+        antes = self._inferencias()
+        resultado = getattr(self, operacion)(*args)
+        return resultado, max(0, self._inferencias() - antes - self._costo_medicion)
+
+    def listar_hechos(self, tipo, aridad, limite=None):
         """Lista todos los hechos de un tipo y su aridad determinados.
 
         Args:
@@ -69,8 +434,11 @@ class MotorLogico:
         Por ejemplo, persona(Nombre, Edad, Ciudad) tiene aridad 3.
 
 
+        Args:
+            limite (int, opcional): cantidad máxima de hechos a devolver
+
         Returns:
             List: lista de hechos con {X(1): valor1, X(2): valor2, ...} 
         """
         consulta = ",".join([f"X{i}" for i in range(1, aridad + 1)])
-        return list(self.prolog.query(f"{tipo}({consulta})"))
+        return list(self.iterar(f"{tipo}({consulta})", limite))
@@ -0,0 +1,224 @@
+import contextlib
+import io
+import multiprocessing
+import queue
+import threading
+import time
+
+
+class ErrorReplica(Exception):
+    """Error al ejecutar una operación en un proceso réplica."""
+
+
+class SinReplicas(ErrorReplica):
+    """No queda ninguna réplica viva: la operación tiene que resolverse con el motor principal."""
+
+
+# Segundos que una operación espera, como máximo, a que se libere una réplica
+ESPERA_MAXIMA = 30
+
+
+# Operaciones de MotorLogico que una réplica acepta ejecutar ('medir' envuelve a cualquiera de las otras)
+OPERACIONES = ('consultar', 'limitar', 'primero', 'existe', 'consultar_preparada', 'primero_preparada',
+               'consultar_filas', 'listar_hechos', 'actualizar_hechos', 'eliminar_hechos', 'medir')
+
+
+def _atender(conexion, archivos, archivo_reglas):
+    """
+    Cuerpo de cada proceso réplica: carga las temporadas (normalmente desde los snapshots)
+    en su propio SWI-Prolog y responde operaciones hasta que se cierra la conexión.
+    """
+    # Import local: el proceso padre no necesita cargar SetUp para crear el pool
+    from setup import SetUp
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup = SetUp(archivos, archivo_reglas, paralelo=False)
+    motores = {motor.modulo: motor for motor in setup.motores.values()}
+    conexion.send('listo')
+
+    while True:
+        try:
+            mensaje = conexion.recv()
+        except EOFError:
+            break
+        if mensaje is None:
+            break
+
+        operacion, modulo, args = mensaje
+        try:
+            if operacion not in OPERACIONES or operacion == 'medir' and (not args or args[0] not in OPERACIONES):
+                raise ValueError(f"Operación no permitida: {operacion}")
+            resultado = getattr(motores[modulo], operacion)(*args)
+            conexion.send(('ok', resultado))
+        except Exception as e:
+            conexion.send(('error', f"{type(e).__name__}: {e}"))
+
+
+class PoolMotores:
+    """
+    Pool de procesos réplica. Cada réplica tiene su propio SWI-Prolog con las mismas temporadas
+    cargadas, así varias consultas corren en paralelo (una por réplica) en lugar de hacer fila
+    detrás de un único motor. Las modificaciones se difunden a todas las réplicas (ver `difundir`).
+    """
+
+    def __init__(self, archivos, archivo_reglas='json/REGLAS.json', cantidad=None, espera_maxima=ESPERA_MAXIMA):
+        """
+        Args:
+            archivos (dict): {temporada: ruta} igual que en SetUp
+            archivo_reglas (string): JSON con las reglas Prolog
+            cantidad (int): cantidad de réplicas (por defecto, una por núcleo)
+            espera_maxima (float): segundos que se espera una réplica libre antes de fallar con ErrorReplica
+        """
+        self.espera_maxima = espera_maxima
+        # 'spawn': cada réplica arranca un intérprete limpio e inicializa su propio Prolog
+        contexto = multiprocessing.get_context('spawn')
+        cantidad = cantidad or multiprocessing.cpu_count()
+
+        self._procesos = []
+        self._conexiones = []
+        for _ in range(cantidad):
+            padre, hijo = contexto.Pipe()
+            proceso = contexto.Process(target=_atender, args=(hijo, archivos, archivo_reglas), daemon=True)
+            proceso.start()
+            hijo.close()
+            self._procesos.append(proceso)
+            self._conexiones.append(padre)
+
+        # Conexiones de réplicas sin trabajo; quien consulta toma una y la devuelve al terminar
+        self._libres = queue.Queue()
+        for conexion in self._conexiones:
+            conexion.recv()  # 'listo'
+            self._libres.put(conexion)
+        # Conexiones de las réplicas que siguen respondiendo (sólo se modifica con _lock_vivas),
+        # y lock para que dos difusiones no se repartan las réplicas entre sí
+        self._vivas = set(self._conexiones)
+        self._lock_vivas = threading.Lock()
+        self._lock_difusion = threading.Lock()
+        print(f'Pool de {cantidad} réplicas del motor lógico listo')
+
+    def ejecutar(self, modulo, operacion, *args):
+        """
+        Ejecuta una operación de MotorLogico (ver OPERACIONES) en la primera réplica libre.
+
+        Args:
+            modulo (string): módulo de Prolog del motor (temporada) sobre el que se opera
+            operacion (string): nombre del método de MotorLogico
+        """
+        return self.ejecutar_medido(modulo, operacion, *args)[0]
+
+    def _tomar(self):
+        """
+        Toma una réplica libre, esperando como mucho `espera_maxima` segundos.
+
+        Raises:
+            SinReplicas: si no queda ninguna réplica viva (también si se mueren todas mientras se espera)
+            ErrorReplica: si no se libera ninguna a tiempo
+        """
+        limite = time.monotonic() + self.espera_maxima
+        while True:
+            if not self.vivas():
+                raise SinReplicas("No queda ninguna réplica del motor lógico")
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise ErrorReplica(f"Ninguna réplica se liberó en {self.espera_maxima} s")
+            # De a un segundo como mucho, para enterarse si mientras tanto murió la última réplica
+            with contextlib.suppress(queue.Empty):
+                return self._libres.get(timeout=min(restante, 1.0))
+
+    def vivas(self):
+        """Cantidad de réplicas que siguen respondiendo."""
+        with self._lock_vivas:
+            return len(self._vivas)
+
+    def _descartar(self, conexion):
+        """Saca del pool una réplica que dejó de responder (su conexión no vuelve a la fila de libres)."""
+        with self._lock_vivas:
+            self._vivas.discard(conexion)
+            quedan = len(self._vivas)
+        if quedan == 0:
+            print('Aviso: no queda ninguna réplica del motor lógico; las consultas usan el motor principal')
+
+    def ejecutar_medido(self, modulo, operacion, *args):
+        """Como `ejecutar`, pero devuelve (resultado, segundos que se esperó una réplica libre)."""
+        inicio = time.perf_counter()
+        conexion = self._tomar()
+        espera = time.perf_counter() - inicio
+        try:
+            conexion.send((operacion, modulo, args))
+            estado, resultado = conexion.recv()
+        except (EOFError, OSError) as e:
+            self._descartar(conexion)
+            raise ErrorReplica(f"La réplica dejó de responder: {e}")
+        self._libres.put(conexion)
+
+        if estado == 'error':
+            raise ErrorReplica(resultado)
+        return resultado, espera
+
+    def difundir(self, modulo, operacion, *args):
+        """
+        Ejecuta una operación en todas las réplicas (p.ej. actualizar hechos), para que sigan siendo
+        idénticas. Espera a que cada réplica termine lo que está haciendo; mientras tanto las consultas
+        nuevas esperan, así ninguna ve una réplica actualizada y otra no en una misma petición.
+        Las réplicas que mueren en el camino se descartan (el cambio queda en las que siguen vivas).
+
+        Returns:
+            list: el resultado de cada réplica
+
+        Raises:
+            ErrorReplica: si alguna réplica respondió con un error
+        """
+        with self._lock_difusion:
+            # Se espera a las réplicas vivas al empezar; si una muere mientras la usa otra consulta,
+            # se deja de esperarla (nunca va a volver a la fila de libres)
+            with self._lock_vivas:
+                pendientes = set(self._vivas)
+            conexiones = []
+            while True:
+                with self._lock_vivas:
+                    pendientes &= self._vivas
+                if not pendientes:
+                    break
+                try:
+                    conexion = self._libres.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                pendientes.discard(conexion)
+                conexiones.append(conexion)
+
+            resultados, errores = [], []
+            # Se envía a todas primero, así las réplicas aplican la operación en paralelo
+            enviadas = []
+            for conexion in conexiones:
+                try:
+                    conexion.send((operacion, modulo, args))
+                    enviadas.append(conexion)
+                except OSError as e:
+                    print(f"Aviso: una réplica dejó de responder y se descarta: {e}")
+                    self._descartar(conexion)
+            for conexion in enviadas:
+                try:
+                    estado, resultado = conexion.recv()
+                except (EOFError, OSError) as e:
+                    print(f"Aviso: una réplica dejó de responder y se descarta: {e}")
+                    self._descartar(conexion)
+                    continue
+                (errores if estado == 'error' else resultados).append(resultado)
+                # Sólo vuelven al pool las réplicas que siguen respondiendo
+                self._libres.put(conexion)
+
+        if errores:
+            raise ErrorReplica(errores[0])
+        return resultados
+
+    def consultar(self, modulo, consulta):
+        """Equivalente a MotorLogico.consultar, ejecutado en una réplica."""
+        return self.ejecutar(modulo, 'consultar', consulta)
+
+    def cerrar(self):
+        """Termina todas las réplicas."""
+        for conexion in self._conexiones:
+            with contextlib.suppress(OSError):
+                conexion.send(None)
+        for proceso in self._procesos:
+            proceso.join(timeout=5)
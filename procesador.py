@@ -1,17 +1,301 @@
 import json
+import re
+import time
+
+# Cantidad de caracteres que se leen del archivo por vez al recorrerlo en forma incremental
+TAMANIO_BLOQUE = 1 << 16
+
+
+class _LectorJSON:
+    """
+    Lee un archivo JSON por bloques y decodifica valores a medida que se completan,
+    sin cargar nunca el archivo entero en memoria.
+    """
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.fin = False
+
+    def _leer_bloque(self):
+        """Agrega un bloque al buffer descartando lo ya consumido. Devuelve False al final del archivo."""
+        bloque = self.archivo.read(TAMANIO_BLOQUE)
+        if not bloque:
+            self.fin = True
+            return False
+        self.buffer = self.buffer[self.pos:] + bloque
+        self.pos = 0
+        return True
+
+    def proximo_caracter(self):
+        """Saltea espacios y devuelve (sin consumirlo) el próximo caracter, o '' al final del archivo."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._leer_bloque():
+                return ''
+
+    def consumir(self, esperado):
+        if self.proximo_caracter() != esperado:
+            raise json.JSONDecodeError(f"Se esperaba '{esperado}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica el próximo valor JSON completo, leyendo más bloques si hace falta."""
+        self.proximo_caracter()
+        while True:
+            try:
+                valor, fin = self.decoder.raw_decode(self.buffer, self.pos)
+                # Un número al final del buffer podría continuar en el bloque siguiente
+                if fin < len(self.buffer) or self.fin:
+                    self.pos = fin
+                    return valor
+            except json.JSONDecodeError:
+                if self.fin:
+                    raise
+            self._leer_bloque()
+
+
+# Marca de fin para recorrer los partidos con next()
+_FIN = object()
+
+# Estados de API-Football (fixture.status.short) de partidos que no se jugaron o no terminaron:
+# no tienen resultado y no se cargan como hechos
+ESTADOS_NO_JUGADOS = {'TBD', 'NS', 'PST', 'CANC', 'ABD', 'SUSP'}
+
+# Rondas numeradas de una fase de liga o de grupos: '<fase> - <número>' (ej: 'group a - 24')
+_RONDA_NUMERADA = re.compile(r'^(.*?)\s*-\s*(\d+)\s*$')
+
+
+def _partidos_crudos(archivo):
+    """
+    Generador que recorre el objeto principal del JSON de API-Football y devuelve,
+    de a uno, los elementos del arreglo 'response'. El resto de las claves se descarta.
+    """
+    lector = _LectorJSON(archivo)
+    lector.consumir('{')
+    if lector.proximo_caracter() == '}':
+        return
+
+    while True:
+        clave = lector.valor()
+        lector.consumir(':')
+        if clave == 'response':
+            lector.consumir('[')
+            if lector.proximo_caracter() == ']':
+                lector.pos += 1
+            else:
+                while True:
+                    yield lector.valor()
+                    if lector.proximo_caracter() != ',':
+                        break
+                    lector.pos += 1
+                lector.consumir(']')
+        else:
+            lector.valor()
+
+        if lector.proximo_caracter() != ',':
+            break
+        lector.pos += 1
+    lector.consumir('}')
+
+
+def normalizar_partido(partido):
+    """
+    Extrae los datos relevantes de un partido con el formato de API-Football
+    y los devuelve como un diccionario simple.
+    """
+    fixture = partido.get('fixture', {})
+    torneo = partido.get('league', {})
+    equipos = partido.get('teams', {})
+    goles = partido.get('goals', {})
+    resultado = partido.get('score', {})
+    entretiempo = resultado.get('halftime', {})
+
+    equipo_local = equipos.get('home', {})
+    equipo_visitante = equipos.get('away', {})
+    estado = fixture.get('status', {}).get('short')
+
+    # Maneja goles que podrían ser None
+    total_local = goles.get('home')
+    total_visitante = goles.get('away')
+    entretiempo_local = entretiempo.get('home')
+    entretiempo_visitante = entretiempo.get('away')
+
+    # Crea un diccionario simple (hecho) para cada partido
+    return {
+        'partido_id': fixture.get('id'),
+        'fecha': fixture.get('date', '').split('T')[0], # Extraer solo la fecha
+        'ronda': torneo.get('round'),
+        'local': equipo_local.get('name'),
+        'visitante': equipo_visitante.get('name'),
+        'local_id': equipo_local.get('id'),
+        'visitante_id': equipo_visitante.get('id'),
+        'total_local': total_local if total_local is not None else 0,
+        'total_visitante': total_visitante if total_visitante is not None else 0,
+        'entretiempo_local': entretiempo_local if entretiempo_local is not None else 0,
+        'entretiempo_visitante': entretiempo_visitante if entretiempo_visitante is not None else 0,
+        'ganador_local': equipo_local.get('winner'), # (puede ser True, False, o None para empate)
+        'estado': estado,
+        # Sin resultado final (cancelado, postergado, etc.) el partido no se carga: sus goles no son 0
+        'jugado': estado not in ESTADOS_NO_JUGADOS and total_local is not None and total_visitante is not None,
+    }
+
+
+def numero_ronda(ronda):
+    """Número de una ronda de fase regular o de grupos, o None para las que no tienen (p.ej. 'promotion play-offs - final')."""
+    coincidencia = _RONDA_NUMERADA.match(str(ronda))
+    return int(coincidencia.group(2)) if coincidencia else None
+
+
+def grupo_ronda(ronda):
+    """
+    Fase o zona de una ronda numerada, en minúsculas ('regular season - 12' -> 'regular season',
+    'group a - 24' -> 'group a'), o None para las rondas de eliminación directa.
+    """
+    coincidencia = _RONDA_NUMERADA.match(str(ronda))
+    return coincidencia.group(1).lower() if coincidencia else None
+
+
+def logos_partido(partido):
+    """Devuelve {id_equipo: logo_url} con los equipos de un partido de API-Football."""
+    logos = {}
+    for equipo in partido.get('teams', {}).values():
+        if equipo.get('id') is not None and equipo.get('logo'):
+            logos[equipo['id']] = equipo['logo']
+    return logos
+
+
+def equipos_partido(p):
+    """Devuelve {id_equipo: nombre} con los dos equipos de un partido normalizado."""
+    return {p['local_id']: p['local'], p['visitante_id']: p['visitante']}
+
+
+def leer_equipos(archivo_json):
+    """
+    Lee un listado de equipos de API-Football (endpoint 'teams') y devuelve
+    {id_equipo: (nombre, código)}; el código puede ser None.
+
+    Raises:
+        OSError / json.JSONDecodeError: si el archivo no existe o no es un JSON válido
+    """
+    with open(archivo_json, 'r', encoding='utf-8') as f:
+        contenido = json.load(f)
+    return {
+        item['team']['id']: (item['team']['name'], item['team'].get('code'))
+        for item in contenido.get('response', []) if item.get('team', {}).get('id') is not None
+    }
+
+
+def validar_partido(p):
+    """
+    Verifica que un partido normalizado (ver `normalizar_partido`) se pueda cargar como hecho:
+    ID, IDs de equipos y goles enteros, nombres de equipos presentes. Pensada para datos que llegan por la API.
+
+    Raises:
+        ValueError: con la descripción del primer campo inválido
+    """
+    for campo in ('partido_id', 'local_id', 'visitante_id', 'total_local', 'total_visitante',
+                  'entretiempo_local', 'entretiempo_visitante'):
+        if type(p[campo]) is not int:
+            raise ValueError(f"El campo '{campo}' debe ser un entero (partido {p['partido_id']})")
+    for campo in ('local', 'visitante', 'ronda'):
+        if not isinstance(p[campo], str) or not p[campo]:
+            raise ValueError(f"Falta el campo '{campo}' (partido {p['partido_id']})")
+
+
+def iterar_partidos(archivo_json, logos=None, tiempos=None, equipos=None):
+    """
+    Generador que lee el archivo JSON de partidos una sola vez, en forma incremental,
+    y devuelve cada partido ya normalizado (ver `normalizar_partido`) apenas se termina de leer.
+    La memoria usada no depende del tamaño del archivo. Los partidos que no se jugaron
+    (ver ESTADOS_NO_JUGADOS) se descartan acá, así nunca llegan a ser hechos.
+
+    Args:
+        archivo_json (string): ruta del archivo de API-Football
+        logos (dict, opcional): si se pasa, se completa en la misma pasada con id_equipo -> logo_url
+        tiempos (dict, opcional): si se pasa, acumula los segundos de 'parseo' y 'normalizacion'
+        equipos (dict, opcional): si se pasa, se completa en la misma pasada con id_equipo -> nombre
+
+    Raises:
+        OSError / json.JSONDecodeError: si el archivo no existe o no es un JSON válido
+    """
+    print('Extrayendo datos del JSON... ')
+    if tiempos is not None:
+        tiempos.setdefault('parseo', 0.0)
+        tiempos.setdefault('normalizacion', 0.0)
+
+    descartados = 0
+    with open(archivo_json, 'r', encoding='utf-8') as f:
+        crudos = _partidos_crudos(f)
+        while True:
+            inicio = time.perf_counter()
+            partido = next(crudos, _FIN)
+            leido = time.perf_counter()
+            if partido is _FIN:
+                break
+
+            fixture = partido.get('fixture', {})
+            try:
+                partido_simple = normalizar_partido(partido)
+            except Exception as e:
+                # Capturar errores si la estructura de un partido es inesperada
+                print(f"Error procesando partido (ID: {fixture.get('id')}): {e}")
+                continue # Saltar al siguiente partido
+            if not partido_simple['jugado']:
+                descartados += 1
+                continue
+
+            if logos is not None:
+                logos.update(logos_partido(partido))
+            if equipos is not None:
+                equipos.update(equipos_partido(partido_simple))
+
+            if tiempos is not None:
+                tiempos['parseo'] += leido - inicio
+                tiempos['normalizacion'] += time.perf_counter() - leido
+            yield partido_simple
+
+    if descartados:
+        print(f'Descartados {descartados} partidos no jugados')
+    print(f'Procesado {archivo_json}\n')
+
+
+def preparar_temporada(archivo_json, tiempos=None):
+    """
+    Lee y normaliza una temporada completa y la devuelve como un lote compacto de hechos
+    `partido/9` (tuplas con los argumentos ya formateados), junto con los logos y los equipos.
+    Pensada para correr en otro proceso (ver SetUp): sólo devuelve datos simples de Python.
+
+    Args:
+        archivo_json (string): ruta del archivo de API-Football
+        tiempos (dict, opcional): si se pasa, acumula los segundos de 'parseo' y 'normalizacion'
+
+    Returns:
+        tuple: (lista de tuplas, dict id_equipo -> logo_url, dict id_equipo -> nombre)
+    """
+    logos = {}
+    equipos = {}
+    tiempos = {} if tiempos is None else tiempos
+    partidos = []
+    for p in iterar_partidos(archivo_json, logos, tiempos, equipos):
+        inicio = time.perf_counter()
+        partidos.append(tuple(formatear_partido(p).values()))
+        tiempos['normalizacion'] += time.perf_counter() - inicio
+    return partidos, logos, equipos
+
 
 def procesar_partidos(archivo_json):
     """
     Carga un archivo JSON de partidos, extrae los datos relevantes de cada partido
     y los devuelve como una lista de diccionarios simples.
     """
-    print('Extrayendo datos del JSON... ')
-    
-    partidos_extraidos = []
-    
     try:
-        with open(archivo_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        partidos_extraidos = list(iterar_partidos(archivo_json))
     except FileNotFoundError:
         print(f"Error: El archivo '{archivo_json}' no fue encontrado.")
         return None
@@ -22,73 +306,44 @@ def procesar_partidos(archivo_json):
         print(f"Ocurrió un error inesperado al leer el archivo: {e}")
         return None
 
-    # La lista de partidos está en el key 'response'
-    lista_partidos = data.get('response', [])
-    
-    if not lista_partidos:
+    if not partidos_extraidos:
         print("No se encontraron partidos en la clave 'response' del JSON.")
-        return []
-
-    for partido in lista_partidos:
-        try:
-            fixture = partido.get('fixture', {})
-            torneo = partido.get('league', {})
-            equipos = partido.get('teams', {})
-            goles = partido.get('goals', {})
-            resultado = partido.get('score', {})
-            entretiempo = resultado.get('halftime', {})
-            
-            equipo_local = equipos.get('home', {})
-            equipo_visitante = equipos.get('away', {})
-
-            # Maneja goles que podrían ser None
-            total_local = goles.get('home')
-            total_visitante = goles.get('away')
-            entretiempo_local = entretiempo.get('home')
-            entretiempo_visitante = entretiempo.get('away')
-
-            # Crea un diccionario simple (hecho) para cada partido
-            partido_simple = {
-                'partido_id': fixture.get('id'),
-                'fecha': fixture.get('date', '').split('T')[0], # Extraer solo la fecha
-                'ronda': torneo.get('round'),
-                'local': equipo_local.get('name'),
-                'visitante': equipo_visitante.get('name'),
-                'local_id': equipo_local.get('id'),
-                'visitante_id': equipo_visitante.get('id'),
-                'total_local': total_local if total_local is not None else 0,
-                'total_visitante': total_visitante if total_visitante is not None else 0,
-                'entretiempo_local': entretiempo_local if entretiempo_local is not None else 0,
-                'entretiempo_visitante': entretiempo_visitante if entretiempo_visitante is not None else 0,
-                'ganador_local': equipo_local.get('winner') # (puede ser True, False, o None para empate)
-            }
-
-            partidos_extraidos.append(partido_simple)
-
-        except Exception as e:
-            # Capturar errores si la estructura de un partido es inesperada
-            print(f"Error procesando partido (ID: {fixture.get('id')}): {e}")
-            continue # Saltar al siguiente partido
 
-    print(f'Procesado {archivo_json}\n')
     return partidos_extraidos
 
+
+def atomo(texto):
+    """Escribe un texto como átomo Prolog entre comillas simples, escapando comillas y barras."""
+    return "'" + str(texto).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def formatear_partido(p):
+    """Da formato de hecho `partido/9` a un partido normalizado (los equipos van por su ID)."""
+    return {
+        'id': p['partido_id'],
+        'ronda': atomo(p['ronda']),
+        'fecha': atomo(p['fecha']),
+        'local': p['local_id'],
+        'entretiempo_local': p['entretiempo_local'],
+        'total_local': p['total_local'],
+        'visitante': p['visitante_id'],
+        'entretiempo_visitante': p['entretiempo_visitante'],
+        'total_visitante': p['total_visitante'],
+    }
+
+
 def establecer_formato_partidos(partidos_data):
     print('Formateando datos para el motor logico... \n\n')
-    
-    partidos = []
-    for p in partidos_data:
-        hecho = {
-            'id': p['partido_id'],
-            'ronda': f"'{p['ronda']}'",
-            'fecha': f"'{p['fecha']}'",
-            'local': f"'{p['local']}'",
-            'entretiempo_local': p['entretiempo_local'],
-            'total_local': p['total_local'],
-            'visitante': f"'{p['visitante']}'",
-            'entretiempo_visitante': p['entretiempo_visitante'],
-            'total_visitante': p['total_visitante'],
-        }
-        partidos.append(hecho)
-        
-    return partidos
+
+    return [formatear_partido(p) for p in partidos_data]
+
+
+def establecer_formato_logos(logos):
+    """Da formato de hecho `logo_equipo/2` al mapeo id_equipo -> logo_url."""
+    return [{'equipo': equipo, 'logo': atomo(logo)} for equipo, logo in logos.items()]
+
+
+def establecer_formato_equipos(equipos):
+    """Da formato de hecho `equipo/3` (ID, nombre, código) al mapeo id_equipo -> (nombre, código)."""
+    return [{'id': equipo_id, 'nombre': atomo(nombre), 'codigo': atomo(codigo or '')}
+            for equipo_id, (nombre, codigo) in equipos.items()]
@@ -0,0 +1,47 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+# orjson es opcional: si está instalado serializa bastante más rápido; si no, se usa el módulo json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def a_json(datos, ordenar=False, default=None):
+    """
+    JSON compacto (sin espacios, en UTF-8 sin escapar las tildes) de `datos`, como bytes.
+    Usa orjson si está disponible; el resultado es el mismo JSON con cualquiera de los dos.
+
+    Args:
+        datos: listas, diccionarios, textos, números, None (las claves no textuales se pasan a texto)
+        ordenar (bool): ordenar las claves de los diccionarios
+        default (callable, opcional): convierte los valores que no son JSON (ver json.dumps)
+    """
+    if orjson is not None:
+        opciones = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if ordenar else 0)
+        if default is not None:
+            # Las fechas también pasan por `default` (orjson las escribiría en ISO 8601, Flask en formato HTTP)
+            opciones |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(datos, default=default, option=opciones)
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':'), sort_keys=ordenar, default=default).encode('utf-8')
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask que serializa con `a_json`: lo usan `jsonify` y todas las vistas que
+    devuelven listas o diccionarios. En modo debug (o con `compact = False`) se delega en el proveedor
+    de Flask, que indenta la salida para leerla.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return a_json(obj, self.sort_keys, self.default).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        datos = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(a_json(datos, self.sort_keys, self.default) + b'\n', mimetype=self.mimetype)
@@ -1,44 +1,316 @@
+import glob
+import hashlib
 import json
-from motor_logico import MotorLogico
-from procesador import procesar_partidos, establecer_formato_partidos
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from almacen_partidos import obtener_almacen, preparar_almacen
+from procesador import (iterar_partidos, preparar_temporada, formatear_partido, establecer_formato_logos,
+                        establecer_formato_equipos, leer_equipos)
 from consultas import ConsultasLiga
 
-class SetUp:  
-            
-    def __init__(self, archivo):
-        # Guardar ruta del archivo para que otras partes (p.ej. ConsultasLiga) puedan usarla
-        self.archivo = archivo
-        partidos_data = procesar_partidos(archivo)
-        if partidos_data is None:
-            print(f"ERROR: No se pudo cargar la data desde '{archivo}'. Abortando inicialización.")
+# Directorio donde se guardan las bases de conocimiento precompiladas (.qlf)
+DIRECTORIO_SNAPSHOTS = 'snapshots'
+# Cambiar si se modifica la forma de generar hechos, para no reutilizar snapshots viejos
+VERSION_SNAPSHOT = 7
+# Motores de consulta disponibles (ver MotorLogico y MotorColumnar)
+TIPOS_MOTOR = ('prolog', 'columnar')
+
+def _preparar_midiendo(preparar, archivo):
+    """Cuerpo de cada proceso de `SetUp._preparar_en_paralelo`: devuelve (preparar(archivo), tiempos de la lectura)."""
+    tiempos = {}
+    return preparar(archivo, tiempos), tiempos
+
+
+class SetUp:
+
+    def __init__(self, archivos, archivo_reglas='json/REGLAS.json', usar_snapshot=True, paralelo=True, tipo_motor='prolog',
+                 archivo_equipos='json/equipos.json', usar_tablas=True, usar_almacen=True):
+        """
+        Carga una o varias temporadas. Cada temporada vive en su propio módulo de Prolog
+        (`temporada_<año>`), así las consultas de una nunca recorren los hechos de otra.
+
+        Args:
+            archivos (string | dict): ruta de un JSON de partidos, o diccionario {temporada: ruta}
+            archivo_reglas (string): JSON con las reglas Prolog
+            usar_snapshot (bool): reutilizar/generar la base precompilada (.qlf) de cada temporada
+            paralelo (bool): si hay que leer más de un JSON, leerlos y normalizarlos en procesos aparte
+            tipo_motor (string): 'prolog' (MotorLogico, por defecto) o 'columnar' (MotorColumnar, NumPy sin Prolog)
+            archivo_equipos (string): JSON de equipos de API-Football, de donde salen los códigos ('BEL') de los hechos equipo/3
+            usar_tablas (bool): tabular los predicados de `TABLAS_PROLOG` (False = se recalculan en cada llamada, para comparar)
+            usar_almacen (bool): leer los partidos del almacen binario de cada JSON (ver almacen_partidos.py), que se
+                genera la primera vez y después comparten, mapeado en memoria, todos los procesos; False = leer el JSON
+        """
+        if tipo_motor not in TIPOS_MOTOR:
+            raise ValueError(f"Tipo de motor desconocido: {tipo_motor} (opciones: {', '.join(TIPOS_MOTOR)})")
+        if isinstance(archivos, str):
+            archivos = {self._temporada_de(archivos): archivos}
+        # Guardar las rutas para que otras partes puedan usarlas
+        self.archivos = archivos
+        self.motores = {}
+        # Segundos por fase de carga de cada temporada: {temporada: {fase: segundos}}
+        self.tiempos = {}
+        self.archivo_equipos = archivo_equipos
+        self.usar_tablas = usar_tablas
+        self.usar_almacen = usar_almacen
+        # Equipos conocidos de antemano: {id: (nombre, código)}; los nombres de los partidos tienen prioridad
+        try:
+            self.equipos_conocidos = leer_equipos(archivo_equipos)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"AVISO: No se pudo leer el archivo de equipos '{archivo_equipos}' ({e}). Los equipos no tendrán código.")
+            self.equipos_conocidos = {}
+
+        inicio = time.perf_counter()
+        if tipo_motor == 'columnar':
+            # El motor columnar no usa reglas ni snapshots: lee cada JSON y arma las columnas
+            for temporada, archivo in archivos.items():
+                motor = self._cargar_columnar(temporada, archivo)
+                if motor is not None:
+                    self.motores[temporada] = motor
+            self._imprimir_tiempos(time.perf_counter() - inicio)
+            self.motor = next(iter(self.motores.values()), None)
             return
-        
-        # Formatear datos para prolog
-        lista_prolog = establecer_formato_partidos(partidos_data)
-
-        # Cargar hechos
-        self.motor = MotorLogico(comentarios=False)
-        self.motor.generar_hechos('partido',lista_prolog)
-        
-        archivo_reglas = 'json/REGLAS.json'
+
         try:
             with open(archivo_reglas, 'r') as f:
-                REGLAS_PROLOG = json.load(f)['REGLAS_PROLOG']
+                contenido_reglas = json.load(f)
+            REGLAS_PROLOG = contenido_reglas['REGLAS_PROLOG']
+            # Objetivos que se ejecutan después de cargar hechos y reglas (p.ej. derivar índices)
+            INICIALIZACION_PROLOG = contenido_reglas.get('INICIALIZACION_PROLOG', [])
+            # Predicados tabulados: sus respuestas quedan guardadas y, como dependen de hechos dinámicos
+            # incrementales (partido/9, juega/7), se recalculan sólo cuando esos hechos cambian. Son compartidas:
+            # por defecto SWI-Prolog guarda las tablas por hilo y cada pedido de Flask las volvería a calcular
+            TABLAS_PROLOG = contenido_reglas.get('TABLAS_PROLOG', []) if usar_tablas else []
+            REGLAS_PROLOG = REGLAS_PROLOG + [f':- table({tabla} as (incremental, dynamic, shared)).' for tabla in TABLAS_PROLOG]
         except FileNotFoundError:
             print(f"ERROR: Archivo de reglas '{archivo_reglas}' no encontrado.")
-            return 
-        
-        directiva = REGLAS_PROLOG[0].replace(':- ', '').replace('.', '')
-        # La primera línea es una directiva de consulta inicial
+            self.motor = None
+            return
+
+        snapshots = {
+            temporada: self._ruta_snapshot(archivo, archivo_reglas, self._modulo(temporada)) if usar_snapshot else None
+            for temporada, archivo in archivos.items()
+        }
+        # Sólo hay que leer el JSON de las temporadas que no tienen snapshot
+        pendientes = {
+            temporada: archivo for temporada, archivo in archivos.items()
+            if not (snapshots[temporada] and os.path.exists(snapshots[temporada]))
+        }
+        lotes = {}
+        if paralelo and len(pendientes) > 1:
+            # Con almacen, los que falten se generan en paralelo y después cada temporada abre el suyo
+            lotes = self._preparar_en_paralelo(pendientes, preparar_almacen if usar_almacen else preparar_temporada)
+
+        for temporada, archivo in archivos.items():
+            motor = self._cargar_temporada(temporada, archivo, REGLAS_PROLOG, INICIALIZACION_PROLOG,
+                                           snapshots[temporada], lotes.get(temporada))
+            if motor is not None:
+                self.motores[temporada] = motor
+
+        self._imprimir_tiempos(time.perf_counter() - inicio)
+
+        # Con un solo archivo, `motor` es el de esa temporada
+        self.motor = next(iter(self.motores.values()), None)
+
+    def _modulo(self, temporada):
+        return f'temporada_{temporada}'
+
+    def _preparar_en_paralelo(self, archivos, preparar=preparar_temporada):
+        """
+        Lee y normaliza los JSON de varias temporadas a la vez, cada uno en un proceso del pool.
+        Devuelve {temporada: Future}; cada resultado es un par (lo que devuelve `preparar`, tiempos):
+        el lote que arma `preparar_temporada` o, con `preparar_almacen`, la ruta del almacen generado,
+        junto con los segundos de parseo y normalización medidos en el proceso del pool.
+        """
+        print(f'Leyendo {len(archivos)} temporadas en paralelo...')
+        # 'spawn' y no fork: el padre puede tener SWI-Prolog inicializado, y un fork lo copiaría a medias
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(len(archivos), os.cpu_count() or 1), mp_context=contexto) as pool:
+            return {temporada: pool.submit(_preparar_midiendo, preparar, archivo) for temporada, archivo in archivos.items()}
+
+    def _cargar_temporada(self, temporada, archivo, REGLAS_PROLOG, INICIALIZACION_PROLOG, ruta_snapshot, lote=None):
+        """
+        Carga los hechos y reglas de una temporada en su módulo. Devuelve el motor, o None si falla.
+        Si `lote` no es None (Future de `_preparar_en_paralelo`) la temporada ya se leyó en otro proceso: los
+        partidos vienen normalizados (o, con almacen, el almacen ya está generado) y sus tiempos se suman a los de la carga.
+        """
+        # Import local: pyswip (y SWI-Prolog) sólo hace falta si se elige este motor
+        from motor_logico import MotorLogico
+
+        tiempos = self.tiempos[temporada] = {}
+        motor = MotorLogico(comentarios=False, modulo=self._modulo(temporada))
+
+        # Si ya existe un snapshot para este JSON y estas reglas, se carga directo sin procesar nada
+        if ruta_snapshot and os.path.exists(ruta_snapshot):
+            print(f'Cargando base de conocimiento precompilada: {ruta_snapshot}')
+            inicio = time.perf_counter()
+            motor.cargar_snapshot(ruta_snapshot)
+            tiempos['snapshot'] = time.perf_counter() - inicio
+            print('Reglas cargadas\n')
+            return motor
 
-        print(f'Ejecutando directiva: {directiva}')
-        list(self.motor.consultar(directiva))
+        # Las directivas (':- ...') van antes de los hechos para que en el snapshot
+        # los predicados dinámicos queden declarados antes de definir sus cláusulas
+        directivas = [r[3:].rstrip('.') for r in REGLAS_PROLOG if r.startswith(':- ')]
+        reglas = [r for r in REGLAS_PROLOG if not r.startswith(':- ')]
+
+        if ruta_snapshot:
+            os.makedirs(DIRECTORIO_SNAPSHOTS, exist_ok=True)
+            motor.iniciar_snapshot(ruta_snapshot)
+
+        for directiva in directivas:
+            print(f'Ejecutando directiva: {directiva}')
+            motor.ejecutar_directiva(directiva)
+
+        logos = {}
+        equipos = {}
+        try:
+            if lote is not None:
+                resultado, tiempos_lectura = lote.result()
+                tiempos.update(tiempos_lectura)
+            if self.usar_almacen:
+                inicio = time.perf_counter()
+                almacen = obtener_almacen(archivo, tiempos)
+                tiempos['almacen'] = time.perf_counter() - inicio
+                partidos = (formatear_partido(p) for p in almacen.partidos())
+                logos, equipos = almacen.logos, almacen.equipos
+            elif lote is not None:
+                partidos, logos, equipos = resultado
+            else:
+                # Los partidos se leen, normalizan y cargan de a uno, en una sola pasada sobre el archivo,
+                # que además junta los logos y los nombres de los equipos
+                partidos = (formatear_partido(p) for p in iterar_partidos(archivo, logos, tiempos, equipos))
+            inicio = time.perf_counter()
+            motor.generar_hechos('partido', partidos)
+            motor.generar_hechos('logo_equipo', establecer_formato_logos(logos), minusculas=False)
+            motor.generar_hechos('equipo', establecer_formato_equipos(self._equipos_temporada(equipos)))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"ERROR: No se pudo cargar la data desde '{archivo}' ({e}). Abortando inicialización.")
+            if ruta_snapshot:
+                motor.descartar_snapshot()
+            return None
+        # Con lectura incremental, el parseo y la normalización ocurren mientras se cargan los hechos
+        tiempos['hechos'] = time.perf_counter() - inicio
+        if lote is None and not self.usar_almacen:
+            tiempos['hechos'] -= tiempos['parseo'] + tiempos['normalizacion']
 
         # Se cargan las demás reglas
-        for regla in REGLAS_PROLOG[1:]:
-            self.motor.agregar_regla(regla)
+        inicio = time.perf_counter()
+        for regla in reglas:
+            motor.agregar_regla(regla)
+        # Con hechos y reglas cargados se derivan los hechos índice (juega/7, por equipo)
+        for objetivo in INICIALIZACION_PROLOG:
+            motor.ejecutar_inicializacion(objetivo)
+        tiempos['reglas'] = time.perf_counter() - inicio
+
+        if ruta_snapshot:
+            inicio = time.perf_counter()
+            motor.guardar_snapshot()
+            self._borrar_snapshots_viejos(ruta_snapshot)
+            tiempos['snapshot'] = time.perf_counter() - inicio
         print('Reglas cargadas\n')
-        
-    def obtener_acceso_consultas(self):
-        # Pasar la ruta del archivo original para que ConsultasLiga pueda extraer metadatos (logos)
-        return ConsultasLiga(self.motor, self.archivo)
+        return motor
+
+    def _cargar_columnar(self, temporada, archivo):
+        """Carga una temporada en un MotorColumnar. Devuelve el motor, o None si falla."""
+        # Import local: NumPy sólo hace falta si se elige este motor
+        from motor_columnar import MotorColumnar
+
+        tiempos = self.tiempos[temporada] = {}
+        motor = MotorColumnar(modulo=self._modulo(temporada))
+        logos = {}
+        equipos = {}
+        try:
+            if self.usar_almacen:
+                inicio = time.perf_counter()
+                almacen = obtener_almacen(archivo, tiempos)
+                tiempos['almacen'] = time.perf_counter() - inicio
+            else:
+                partidos = list(iterar_partidos(archivo, logos, tiempos, equipos))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"ERROR: No se pudo cargar la data desde '{archivo}' ({e}). Abortando inicialización.")
+            return None
+        inicio = time.perf_counter()
+        if self.usar_almacen:
+            # Las columnas numéricas quedan como vistas sobre el almacen mapeado, sin copiarlas
+            motor.cargar_almacen(almacen, self._equipos_temporada(almacen.equipos))
+        else:
+            motor.cargar_partidos(partidos, logos, self._equipos_temporada(equipos))
+        tiempos['hechos'] = time.perf_counter() - inicio
+        return motor
+
+    def _equipos_temporada(self, equipos):
+        """
+        Completa los equipos que jugaron la temporada ({id: nombre}) con su código del archivo de equipos.
+        Devuelve {id: (nombre, código)}; el nombre es el de los partidos, que es el que se usó siempre.
+        """
+        return {
+            equipo_id: (nombre, self.equipos_conocidos.get(equipo_id, (None, None))[1])
+            for equipo_id, nombre in equipos.items()
+        }
+
+    def _imprimir_tiempos(self, total):
+        """Muestra cuánto tardó cada fase de la carga de cada temporada (en ms)."""
+        fases = ('parseo', 'normalizacion', 'almacen', 'hechos', 'reglas', 'snapshot')
+        print('Tiempos de carga (ms):')
+        print('temporada'.ljust(12) + ''.join(fase.rjust(15) for fase in fases))
+        for temporada, tiempos in self.tiempos.items():
+            columnas = ''.join(
+                (f'{tiempos[fase] * 1000:.1f}' if fase in tiempos else '-').rjust(15) for fase in fases
+            )
+            print(str(temporada).ljust(12) + columnas)
+        print(f'Total: {total * 1000:.1f} ms\n')
+
+    def _temporada_de(self, archivo):
+        """Deduce la temporada del nombre del archivo (p.ej. 'primera2021.json' -> 2021)."""
+        nombre = os.path.splitext(os.path.basename(archivo))[0]
+        anio = re.search(r'\d{4}', nombre)
+        return int(anio.group()) if anio else nombre
+
+    def _ruta_snapshot(self, archivo, archivo_reglas, modulo):
+        """
+        Devuelve la ruta del snapshot que corresponde al contenido actual del JSON de partidos,
+        del archivo de reglas y del de equipos; si cambia cualquiera de ellos, cambia la ruta y se regenera.
+        Devuelve None si alguno de los archivos no se puede leer.
+        """
+        huella = hashlib.sha256(f'{VERSION_SNAPSHOT}:{modulo}'.encode())
+        if not self.usar_tablas:
+            # Sin tablas se compila otro snapshot: las directivas `table` quedan dentro del .qlf
+            huella.update(b':sin_tablas')
+        try:
+            for ruta in (archivo, archivo_reglas, self.archivo_equipos):
+                with open(ruta, 'rb') as f:
+                    for bloque in iter(lambda: f.read(1 << 16), b''):
+                        huella.update(bloque)
+        except OSError:
+            return None
+
+        nombre = os.path.splitext(os.path.basename(archivo))[0]
+        return os.path.join(DIRECTORIO_SNAPSHOTS, f'kb_{nombre}_{huella.hexdigest()[:16]}.qlf')
+
+    def _borrar_snapshots_viejos(self, ruta_snapshot):
+        """Elimina los snapshots del mismo archivo generados con versiones anteriores de los datos."""
+        prefijo = ruta_snapshot.rsplit('_', 1)[0]
+        for ruta in glob.glob(f'{prefijo}_*.qlf'):
+            # Los temporales de otros procesos (<prefijo>_<hash>_<pid>) no se tocan
+            if ruta != ruta_snapshot and '_' not in ruta[len(prefijo) + 1:]:
+                os.remove(ruta)
+
+    def obtener_acceso_consultas(self, temporada=None, pool=None, metricas=None):
+        """
+        Devuelve las consultas de una temporada (por defecto, la primera cargada),
+        o None si esa temporada no se pudo cargar.
+        Si se pasa un PoolMotores, las consultas se ejecutan en sus réplicas; si se pasa un
+        RegistroMetricas, cada consulta al motor queda registrada en él.
+        """
+        motor = self.motor if temporada is None else self.motores.get(temporada)
+        # Los logos ya están en la base de conocimiento (logo_equipo/2), no hace falta releer el JSON
+        if motor is None:
+            return None
+        return ConsultasLiga(motor, pool, metricas)
+
+    def obtener_consultas_temporadas(self, pool=None, metricas=None):
+        """Devuelve un diccionario {temporada: ConsultasLiga} con todas las temporadas cargadas."""
+        return {temporada: ConsultasLiga(motor, pool, metricas) for temporada, motor in self.motores.items()}